@@ -1,6 +1,8 @@
 import streamlit as st
+import assets
 import auth
-auth.require_login()
+import metrics
+auth.require_login("Home")
 
 
 # -------- Page config --------
@@ -42,7 +44,7 @@ with col_hero:
 
 with col_side:
     # Main hero image
-    st.image("softball_3.jpeg", caption="Team photo", use_container_width=True)
+    st.image(assets.sized_image("softball_3.jpeg", 480), caption="Team photo", use_container_width=True)
 
 st.markdown("---")
 
@@ -82,7 +84,9 @@ with top_col:
         st.caption("Sidebar page: *season history*")
 
 with img_col:
-    st.image("kellys.jpeg", caption="Postgame", use_container_width=True)
+    st.image(assets.sized_image("kellys.jpeg", 480), caption="Postgame", use_container_width=True)
 
 st.markdown("---")
-st.caption("Tip: use the left sidebar to navigate between pages.")
\ No newline at end of file
+st.caption("Tip: use the left sidebar to navigate between pages.")
+
+metrics.render_admin_panel()
@@ -0,0 +1,74 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+import storage
+
+ASSET_CACHE_DIR = Path(".asset_cache")
+
+# Variants are rendered at this multiple of the displayed width so they
+# stay sharp on high-density phone screens
+PIXEL_DENSITY = 2
+WEBP_QUALITY = 80
+
+# (resolved path, mtime_ns, size) -> content hash, so a 2 MB source isn't
+# re-hashed on every rerun
+_digests = {}
+_lock = threading.Lock()
+
+
+def source_digest(path) -> str:
+    path = Path(path)
+    info = path.stat()
+    key = (path.resolve(), info.st_mtime_ns, info.st_size)
+    with _lock:
+        digest = _digests.get(key)
+    if digest is None:
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+        with _lock:
+            _digests[key] = digest
+    return digest
+
+
+def _render(src: Path, dest: Path, max_px: int) -> None:
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+        if im.width > max_px:
+            height = round(im.height * max_px / im.width)
+            im = im.resize((max_px, height), Image.LANCZOS)
+
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        # Per-thread temp name: two sessions can render the same variant at once
+        tmp = storage.temp_path(dest)
+        try:
+            im.save(tmp, "WEBP", quality=WEBP_QUALITY, method=6)
+            os.replace(tmp, dest)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+
+def sized_image(path, width: int) -> str:
+    """
+    Path of a WebP copy of an image for display at `width` CSS pixels.
+
+    Variants are keyed by the source's content hash and pixel width, built
+    the first time they're asked for and reused after that. The original
+    path is returned if it can't be converted or is already the smaller file.
+    """
+    src = Path(path)
+    max_px = width * PIXEL_DENSITY
+    try:
+        dest = ASSET_CACHE_DIR / f"{src.stem}-{source_digest(src)}-{max_px}w.webp"
+        if not dest.exists():
+            _render(src, dest, max_px)
+        if dest.stat().st_size >= src.stat().st_size:
+            return str(src)
+    except OSError:
+        return str(src)
+    return str(dest)
@@ -1,13 +1,100 @@
+import hashlib
+import json
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 import streamlit as st
-from db import get_conn
+import metrics
+from db import create_session, delete_session, fetch_user, session_user
+
+# Work factor for new hashes; existing hashes keep the cost they were made with
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+
+# Password checks run on this pool instead of the script thread. bcrypt
+# releases the GIL, so this also caps how many cores a login rush can take.
+LOGIN_WORKERS = int(os.environ.get("LOGIN_WORKERS", 4))
+_login_pool = ThreadPoolExecutor(max_workers=LOGIN_WORKERS, thread_name_prefix="login")
 
-def hash_password(plain: str) -> str:
-    return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+# Random token kept in a browser cookie, so a refresh doesn't need the
+# password again; the session itself lives in the database, so logout ends it.
+# Long enough for a game night; the cookie is readable by page scripts (see
+# _set_cookie), so a stolen token should not stay useful for long.
+SESSION_COOKIE = "ltp_session"
+SESSION_TTL = 4 * 3600
+
+
+def hash_password(plain: str, rounds: int = None) -> str:
+    salt = bcrypt.gensalt(rounds or BCRYPT_ROUNDS)
+    return bcrypt.hashpw(plain.encode("utf-8"), salt).decode("utf-8")
 
 def verify_password(plain: str, hashed: str) -> bool:
     return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
 
+@metrics.timed
+def check_password(plain: str, hashed: str) -> bool:
+    """verify_password on the login pool; the caller waits but holds no CPU."""
+    return _login_pool.submit(verify_password, plain, hashed).result()
+
+
+# ---------- Sessions ----------
+def _token_hash(token: str) -> str:
+    # Only the hash is stored, so a leaked database can't be replayed as cookies
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def issue_token(user) -> str:
+    token = secrets.token_urlsafe(32)
+    create_session(_token_hash(token), user["user_id"], int(time.time()) + SESSION_TTL)
+    return token
+
+@metrics.timed
+def user_from_token(token: str):
+    """The account a session token belongs to, or None if it's missing, expired or revoked."""
+    if not token:
+        return None
+    return session_user(_token_hash(token))
+
+def _cookie_token():
+    token = st.context.cookies.get(SESSION_COOKIE)
+    # Headless runs (AppTest) have no browser behind them and no real cookies
+    return token if isinstance(token, str) else None
+
+def _set_cookie(value: str, max_age: int) -> None:
+    """
+    Set (max_age 0: clear) the session cookie; st.context.cookies is read-only.
+
+    Streamlit gives the script no way to add a Set-Cookie header, so the
+    cookie is written by JavaScript and therefore can't be HttpOnly: any
+    script running on the page can read it. What limits the damage is that
+    it is only a random token (the database keeps its hash), SameSite=Strict
+    and Secure over https, short-lived (SESSION_TTL), rotated at every
+    login, and revoked by logout and by a password change.
+    """
+    cookie = f"{SESSION_COOKIE}={value}; Max-Age={max_age}; Path=/; SameSite=Strict"
+    st.iframe(
+        f"""<script>
+        const doc = window.parent.document;
+        const secure = window.parent.location.protocol === "https:" ? "; Secure" : "";
+        doc.cookie = {json.dumps(cookie)} + secure;
+        </script>""",
+        height="content",
+    )
+
+
+def _sign_in(user, token: str) -> None:
+    st.session_state["user"] = {
+        "user_id": user["user_id"],
+        "name": user["name"],
+        "username": user["username"],
+        "team_id": user["team_id"],
+        "role": user["role"],
+    }
+    st.session_state["session_token"] = token
+
+
+# ---------- UI ----------
 def login_form():
     st.subheader("Team Login")
 
@@ -15,29 +102,58 @@ def login_form():
     password = st.text_input("Password", type="password")
 
     if st.button("Login"):
-        conn = get_conn()
-        user = conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
-        conn.close()
-
-        if user and verify_password(password, user["password_hash"]):
-            st.session_state["user"] = {
-                "user_id": user["user_id"],
-                "name": user["name"],
-                "username": user["username"],
-                "team_id": user["team_id"],
-                "role": user["role"],
-            }
+        user = fetch_user(username=username)
+
+        if user and check_password(password, user["password_hash"]):
+            # Rotate: whatever token this browser held before stops working
+            old_token = st.session_state.get("session_token") or _cookie_token()
+            if old_token:
+                delete_session(_token_hash(old_token))
+            _sign_in(user, issue_token(user))
+            st.session_state.pop("session_cookie_set", None)
             st.success(f"Welcome, {user['name']}!")
             st.rerun()
         else:
             st.error("Invalid username or password")
 
-def require_login():
+def require_login(page: str = ""):
+    """
+    Stop the page at the login form unless someone is signed in. page names
+    the page in the timing metrics; the label goes on before the login check
+    so the form and password check are counted too.
+    """
+    metrics.label_rerun(page)
     if "user" not in st.session_state:
-        login_form()
-        st.stop()
+        token = _cookie_token()
+        user = user_from_token(token)
+        if user is None:
+            if token:
+                _set_cookie("", 0)   # expired or logged out elsewhere
+            login_form()
+            st.stop()
+        _sign_in(user, token)
+        st.session_state["session_cookie_set"] = True
+    metrics.label_rerun(page, current_team_id())
+
+    # Hand a new login's token to the browser once (the login run reruns
+    # before a cookie could be written)
+    token = st.session_state.get("session_token")
+    if token and not st.session_state.get("session_cookie_set"):
+        _set_cookie(token, SESSION_TTL)
+        st.session_state["session_cookie_set"] = True
+
+    with st.sidebar:
+        logout_button()
+
+
+def current_team_id() -> int:
+    return st.session_state["user"]["team_id"]
 
 def logout_button():
     if st.button("Logout"):
+        token = st.session_state.pop("session_token", None)
+        if token:
+            delete_session(_token_hash(token))
         st.session_state.pop("user", None)
+        st.session_state.pop("session_cookie_set", None)
         st.rerun()
@@ -0,0 +1,167 @@
+"""
+Check stats.build_stats against the original per-player loop and time both.
+Both branches are checked: logs keyed by player_id and game_id, as the app
+builds them, and older logs with only names, dates and opponents.
+
+    python -m benchmarks.build_stats_bench            # 1k, 10k, 1M PAs
+    python -m benchmarks.build_stats_bench 5000 50000
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from stats import build_stats
+
+OUTCOME_MIX = {
+    "Single": 0.22,
+    "Double": 0.08,
+    "Triple": 0.01,
+    "Home Run": 0.05,
+    "Walk": 0.08,
+    "Strikeout": 0.10,
+    "Strikeout Looking": 0.02,
+    "Out": 0.38,
+    "Double Play": 0.05,
+    "Triple Play": 0.01,
+}
+
+
+def legacy_build_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The groupby loop build_stats replaced, kept as the reference. Logs with
+    player_id get one row per id (named after its first PA) and count games
+    by game_id, like build_stats.
+    """
+    walk_events = {"Walk"}
+    strikeout_events = {"Strikeout", "Strikeout Looking"}
+    by_id = "player_id" in df.columns
+    game_key = ["game_id"] if "game_id" in df.columns else ["game_date", "opponent"]
+
+    rows = []
+
+    groups = df.groupby("player_id", sort=False) if by_id else df.groupby("player_name")
+    for key, group in groups:
+        player = group["player_name"].iloc[0] if by_id else key
+        outcomes = group["outcome"]
+
+        singles = (outcomes == "Single").sum()
+        doubles = (outcomes == "Double").sum()
+        triples = (outcomes == "Triple").sum()
+        homers = (outcomes == "Home Run").sum()
+        hits = singles + doubles + triples + homers
+
+        walks = outcomes.isin(walk_events).sum()
+        strikeouts = outcomes.isin(strikeout_events).sum()
+
+        pa = len(group)
+        ab = pa - walks
+        games = group[game_key].drop_duplicates().shape[0]
+
+        avg = hits / ab if ab > 0 else 0
+        obp = (hits + walks) / pa if pa > 0 else 0
+        total_bases = singles + (2 * doubles) + (3 * triples) + (4 * homers)
+        slg = total_bases / ab if ab > 0 else 0
+        ops = obp + slg
+
+        jersey_number = int(group["jersey_number"].iloc[0])
+
+        rows.append(
+            {
+                "Player": player,
+                "Jersey": jersey_number,
+                "G": games,
+                "PA": pa,
+                "AB": ab,
+                "R": 0,
+                "H": hits,
+                "1B": singles,
+                "2B": doubles,
+                "3B": triples,
+                "HR": homers,
+                "RBI": int(group["rbis"].sum()),
+                "BB": walks,
+                "K": strikeouts,
+                "AVG": round(avg, 3),
+                "OBP": round(obp, 3),
+                "SLG": round(slg, 3),
+                "OPS": round(ops, 3),
+            }
+        )
+
+    out = pd.DataFrame(rows)
+    if by_id:
+        out.insert(0, "player_id", [key for key, _ in groups])
+        out = out.sort_values("Player", kind="stable")
+    return out.sort_values(
+        by=["OPS", "AVG", "H"],
+        ascending=False,
+    ).reset_index(drop=True)
+
+
+def make_log(n_pas: int, n_players: int = 300, n_games: int = 400, seed: int = 0) -> pd.DataFrame:
+    """
+    A season log shaped like load_current_season_log's output. Players 0 and
+    1 share a name, and games are played as doubleheaders (two game_ids per
+    date and opponent); drop player_id and game_id for a names-only log.
+    """
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Player {i:03d}" for i in range(n_players)], dtype=object)
+    names[1] = names[0]
+    days = np.arange(n_games) // 2
+    dates = pd.date_range("2025-04-01", periods=days[-1] + 1, freq="D").strftime("%Y-%m-%d")
+    dates = np.asarray(dates, dtype=object)[days]
+    opponents = np.array([f"Team {d % 23}" for d in days], dtype=object)
+
+    player = rng.integers(0, n_players, n_pas)
+    game = rng.integers(0, n_games, n_pas)
+    outcomes = rng.choice(
+        np.array(list(OUTCOME_MIX), dtype=object), n_pas, p=list(OUTCOME_MIX.values())
+    )
+    return pd.DataFrame(
+        {
+            "game_id": game + 1,
+            "game_date": dates[game],
+            "opponent": opponents[game],
+            "player_id": player + 1,
+            "player_name": names[player],
+            "jersey_number": player % 100,
+            "outcome": outcomes,
+            "rbis": rng.integers(0, 4, n_pas),
+        }
+    )
+
+
+def _time(fn, df, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check(df: pd.DataFrame) -> None:
+    """Raise if build_stats and the reference loop disagree on df."""
+    pd.testing.assert_frame_equal(build_stats(df), legacy_build_stats(df), check_dtype=False)
+
+
+def main(sizes) -> None:
+    for n in sizes:
+        df = make_log(n)
+        check(df)
+        check(df.drop(columns=["player_id", "game_id"]))
+
+        repeat = 3 if n <= 100_000 else 1
+        old = _time(legacy_build_stats, df, repeat)
+        new = _time(build_stats, df, repeat)
+        print(
+            f"{n:>9,} PAs  legacy {old * 1000:9.1f} ms  "
+            f"vectorized {new * 1000:8.1f} ms  speedup {old / new:6.1f}x  (results match)"
+        )
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(args or [1_000, 10_000, 1_000_000])
@@ -0,0 +1,229 @@
+"""
+Headless load test: many captains scoring games at once.
+
+    python -m benchmarks.load_test                         # 1, 2, 4, 8 sessions
+    python -m benchmarks.load_test --levels 1 4 16 --pas 30 --json load.json
+
+Every simulated session drives the real pages through Streamlit's AppTest
+for its own team: it logs in through the Home page form, starts a game on
+Gameday, submits PAs (and the opponent's halves), undoes one, ends the
+game, then opens Season History and Basic Stats. Each script run is timed,
+and every concurrency level reports p50/p95/p99 rerun latency and reruns
+per second.
+
+AppTest keeps a process-wide runtime and isn't thread-safe, so each session
+gets its own worker process. Sessions contend for the database and CPU as
+in a multi-worker deployment, but don't share in-process page caches.
+
+Everything runs locally against a scratch database and data directory
+seeded from benchmarks/synthetic_league.py; app.db is never touched.
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+import db
+import seed_users
+import storage
+from benchmarks import synthetic_league
+
+APP_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_LEVELS = [1, 2, 4, 8]
+PASSWORD = "load-test"
+
+# (result, where the batter ends up); runners already on base score
+PA_CYCLE = [
+    ("Single", "On 1B"),
+    ("Strikeout", "Out"),
+    ("Double", "On 2B"),
+    ("Home Run", "Scores"),
+    ("Out", "Out"),
+    ("Walk", "On 1B"),
+    ("Out", "Out"),
+]
+
+
+class Session:
+    """One captain's browser tab; every script run goes through timed()."""
+
+    def __init__(self, username: str, timeout: float):
+        self.username = username
+        self.timeout = timeout
+        self.user = None
+        self.token = None
+        self.samples = []   # (page, seconds)
+
+    def timed(self, page: str, element_or_app):
+        start = time.perf_counter()
+        at = element_or_app.run(timeout=self.timeout)
+        self.samples.append((page, time.perf_counter() - start))
+        if at.exception:
+            raise RuntimeError(f"{self.username} {page}: {at.exception[0].message}")
+        return at
+
+    def open(self, page: str):
+        at = AppTest.from_file(str(APP_DIR / page), default_timeout=self.timeout)
+        if self.user:
+            # Carried over from the login, as on a page switch in one tab
+            at.session_state["user"] = self.user
+            at.session_state["session_token"] = self.token
+            at.session_state["session_cookie_set"] = True
+        return self.timed(page, at)
+
+    def login(self) -> None:
+        at = self.open("Home.py")
+        at.text_input[0].input(self.username)
+        at.text_input[1].input(PASSWORD)
+        at = self.timed("Home.py", at.button[0].click())
+        self.user = at.session_state["user"]
+        self.token = at.session_state["session_token"]
+
+    def play_game(self, n_pas: int) -> None:
+        page = "pages/gameday.py"
+        at = self.open(page)
+        at.text_input[0].input("Load Test Opponent")
+        start = next(b for b in at.button if b.label == "Start New Game")
+        at = self.timed(page, start.click())
+
+        for i in range(n_pas):
+            if at.session_state.game.offense != "LTP":
+                submit = next(b for b in at.button if b.label == "Submit Opponent Half")
+                at = self.timed(page, submit.click())
+            outcome, dest = PA_CYCLE[i % len(PA_CYCLE)]
+            at.selectbox(key="outcome_select").select(outcome)
+            at.selectbox(key="batter_dest").select(dest)
+            for base in ("3B", "2B", "1B"):
+                try:
+                    at.selectbox(key=f"move_{base}").select("Scores")
+                except KeyError:
+                    pass
+            submit = next(b for b in at.button if b.label == "Submit Plate Appearance")
+            at = self.timed(page, submit.click())
+
+        undo = next(b for b in at.button if b.label.startswith("↩️"))
+        at = self.timed(page, undo.click())
+        end = next(b for b in at.button if b.label == "End Game & Upload Stats")
+        self.timed(page, end.click())
+
+    def browse(self) -> None:
+        self.open("pages/season_history.py")
+        self.open("pages/odds_maker.py")
+
+
+def _setup(work_dir: Path, n_teams: int, seasons: int, seed: int, rounds: int) -> list:
+    """Scratch league plus one captain login per team; returns the usernames."""
+    league = synthetic_league.generate(n_teams=n_teams, n_seasons=seasons, seed=seed)
+    synthetic_league.load_db(league, work_dir / "app.db")
+    storage.DATA_DIR = work_dir
+    synthetic_league.write_files(league, work_dir)
+
+    accounts = [
+        {
+            "team_name": name,
+            "name": f"Captain {team_id}",
+            "username": f"captain{team_id}",
+            "password": PASSWORD,
+            "role": "captain",
+        }
+        for team_id, name in league["teams"].itertuples(index=False)
+    ]
+    seed_users.provision(accounts, rounds=rounds)
+    return [a["username"] for a in accounts]
+
+
+def _run_session(work_dir: Path, username: str, n_pas: int, timeout: float):
+    """One session's whole scenario, in a worker process."""
+    db.DB_PATH = work_dir / "app.db"
+    storage.DATA_DIR = work_dir
+
+    session = Session(username, timeout)
+    error = None
+    started = time.time()
+    try:
+        session.login()
+        session.play_game(n_pas)
+        session.browse()
+    except Exception as exc:  # report it; the other sessions keep going
+        error = f"{username}: {exc}"
+    return session.samples, started, time.time(), error
+
+
+def run_level(work_dir: Path, usernames: list, n_pas: int, timeout: float) -> dict:
+    n = len(usernames)
+    # Spawned, not forked: a fork would inherit this process's open sqlite
+    # connections (db._pool) from seeding
+    spawn = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=n, mp_context=spawn) as pool:
+        runs = list(
+            pool.map(_run_session, [work_dir] * n, usernames, [n_pas] * n, [timeout] * n)
+        )
+
+    # Wall time from the first session starting to the last one finishing
+    wall = max(r[2] for r in runs) - min(r[1] for r in runs)
+    errors = [r[3] for r in runs if r[3]]
+
+    samples = [s for r in runs for s in r[0]]
+    latencies = np.array([seconds for _, seconds in samples]) * 1000
+    by_page = defaultdict(list)
+    for page, seconds in samples:
+        by_page[page].append(seconds * 1000)
+
+    def percentiles(values):
+        p50, p95, p99 = np.percentile(values, [50, 95, 99]) if len(values) else (0, 0, 0)
+        return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+
+    return {
+        "sessions": n,
+        "reruns": len(samples),
+        "wall_s": wall,
+        "reruns_per_s": len(samples) / wall if wall else 0.0,
+        **percentiles(latencies),
+        "pages": {page: percentiles(values) for page, values in sorted(by_page.items())},
+        "errors": errors,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=DEFAULT_LEVELS, help="concurrent sessions")
+    parser.add_argument("--pas", type=int, default=12, help="PAs each session submits")
+    parser.add_argument("--seasons", type=int, default=1, help="history already on each team")
+    parser.add_argument("--rounds", type=int, default=4, help="bcrypt cost for the test logins")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds per script run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write the results here")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        usernames = _setup(Path(tmp), max(args.levels), args.seasons, args.seed, args.rounds)
+        print(f"{'sessions':>8} {'reruns':>7} {'wall s':>7} {'reruns/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for level in args.levels:
+            result = run_level(Path(tmp), usernames[:level], args.pas, args.timeout)
+            results.append(result)
+            print(
+                f"{result['sessions']:>8} {result['reruns']:>7} {result['wall_s']:>7.1f} "
+                f"{result['reruns_per_s']:>9.1f} {result['p50_ms']:>8.0f} "
+                f"{result['p95_ms']:>8.0f} {result['p99_ms']:>8.0f}",
+                flush=True,
+            )
+            for error in result["errors"]:
+                print(f"  error: {error}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved {args.json}")
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Microbenchmarks for the stats and I/O paths behind every page, at several
+data sizes, with a JSON baseline to catch regressions.
+
+    python -m benchmarks.suite                                  # 1k, 10k, 100k PAs
+    python -m benchmarks.suite --sizes 1000 50000 --save base.json
+    python -m benchmarks.suite --compare base.json --threshold 0.25
+
+Each size is a synthetic league (benchmarks/synthetic_league.py) loaded into
+a scratch database and data directory; the team being timed has about that
+many PAs and shares the database with a few other teams. The page data
+paths are timed through team_data, the same functions the pages call.
+--compare exits
+with status 1 if any benchmark's median is slower than the baseline by more
+than the threshold.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import db
+import game_log
+import stats
+import storage
+import team_data
+from benchmarks import synthetic_league
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_THRESHOLD = 0.20
+
+TEAM_ID = 1
+OTHER_TEAMS = 3
+PAS_PER_GAME = 30
+
+# Runs per benchmark; the minimum and median are reported
+REPEAT = 7
+
+
+# ---------- Harness ----------
+def _time(fn, repeat: int = REPEAT) -> dict:
+    fn()  # warm-up: imports, page cache, first-touch allocations
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": min(samples), "median_ms": statistics.median(samples)}
+
+
+def _setup(size: int, work_dir: Path, seed: int) -> dict:
+    """Load a league into work_dir and return what the benchmarks need."""
+    league = synthetic_league.generate(
+        n_teams=1 + OTHER_TEAMS,
+        games_per_season=max(1, size // PAS_PER_GAME),
+        roster_size=15,
+        seed=seed,
+    )
+    synthetic_league.load_db(league, work_dir / "app.db")
+    storage.DATA_DIR = work_dir
+    synthetic_league.write_files(league, work_dir)
+
+    log = synthetic_league.team_log(league, TEAM_ID)
+    season = stats.compute_player_stats(log).set_index("player_id")
+    player = log.iloc[0][["player_id", "first_name", "last_name", "jersey_number"]].to_dict()
+
+    # One game's per-player counts, as GameState.game_stats holds them
+    game_stats = {
+        int(pid): row
+        for pid, row in season.head(10)[stats.SEASON_TOTAL_COLUMNS].astype(int).to_dict("index").items()
+    }
+
+    # Plain Python values, as the Gameday page builds them (sqlite can't bind numpy ints)
+    last = log.iloc[-1]
+    event = {
+        col: getattr(last[col], "item", lambda: last[col])()
+        for col in game_log.LOG_COLUMNS + ["player_id"]
+    }
+    return {
+        "log": log,
+        "season": season,
+        "player": player,
+        "game_stats": game_stats,
+        "event": event,
+        "n_pas": len(log),
+    }
+
+
+def run_size(size: int, seed: int = 0) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _setup(size, Path(tmp), seed)
+        board_log = team_data.load_current_season_log(TEAM_ID)
+
+        def uncached(fn):
+            # The pages' loaders are cached per team; time the rebuild a
+            # write forces, not a cache hit
+            def call():
+                fn.cache.clear()
+                return fn(TEAM_ID)
+
+            return call
+
+        benches = {
+            "update_player_stats": lambda: stats.update_player_stats(
+                ctx["season"], ctx["player"], "Double", 1
+            ),
+            "recompute_stats_from_log": lambda: team_data.recompute_stats_from_log(TEAM_ID),
+            "build_stats": lambda: stats.build_stats(board_log),
+            "load_current_season_log": uncached(team_data.load_current_season_log),
+            "merge_game_stats_into_2025": lambda: team_data.merge_game_stats_into_2025(
+                TEAM_ID, ctx["game_stats"]
+            ),
+            "append_game_log": lambda: team_data.append_game_log(TEAM_ID, ctx["event"]),
+            "load_roster": uncached(team_data.load_roster),
+        }
+        results = {}
+        for name, fn in benches.items():
+            results[name] = _time(fn)
+            results[name]["n_pas"] = ctx["n_pas"]
+        db.get_conn().close()
+    return results
+
+
+def run(sizes, seed: int = 0) -> dict:
+    results = {}
+    for size in sizes:
+        for name, timing in run_size(size, seed).items():
+            key = f"{name}@{size}"
+            results[key] = timing
+            print(
+                f"{name:<28} {size:>9,}  median {timing['median_ms']:9.2f} ms  "
+                f"min {timing['min_ms']:9.2f} ms",
+                flush=True,
+            )
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.platform(),
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """(key, baseline ms, current ms, change) for every benchmark slower than threshold."""
+    regressions = []
+    for key, timing in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        change = timing["median_ms"] / base["median_ms"] - 1
+        if change > threshold:
+            regressions.append((key, base["median_ms"], timing["median_ms"], change))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="PAs for the timed team")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", type=Path, help="write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to check against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed slowdown of the median before it counts as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    current = run(args.sizes, args.seed)
+    if args.save:
+        args.save.write_text(json.dumps(current, indent=2) + "\n")
+        print(f"Saved {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(current, baseline, args.threshold)
+        for key, base_ms, now_ms, change in regressions:
+            print(f"REGRESSION {key}: {base_ms:.2f} ms -> {now_ms:.2f} ms ({change:+.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+"""
+Seedable synthetic league data for benchmarking the app's data paths.
+
+    python -m benchmarks.synthetic_league --teams 20 --seasons 3 --out /tmp/league
+    python -m benchmarks.synthetic_league --teams 200 --db /tmp/league.db
+    python -m benchmarks.synthetic_league --mix "Home Run=0.10,Strikeout=0.05"
+
+Every team plays a season of games a year. Each PA is played through the
+same base-out rules as simulator.py, so runs, RBIs and the state columns
+agree with each other and with the game scores. Like the real files, some
+names carry stray spaces or odd case, some emails are missing and some
+games have no date.
+
+--out writes each team's files in the layout of data/teams/<team_id>/
+(point LTP_DATA_DIR at the directory to use them); --db loads the same
+rows into a SQLite database with the app's schema.
+"""
+import argparse
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import db
+import simulator
+import stats
+import storage
+
+# Share of PAs ending in each result, with the names the Gameday page logs
+DEFAULT_MIX = {
+    "Single": 0.22,
+    "Double": 0.07,
+    "Triple": 0.015,
+    "Home Run": 0.03,
+    "Walk": 0.07,
+    "Strikeout": 0.08,
+    "Out": 0.465,
+    "Double Play": 0.04,
+    "Triple Play": 0.01,
+}
+
+# Log outcome -> simulator outcome; DPs and TPs are Outs with extra outs
+_SIM_CODE = {
+    "Single": 0,
+    "Double": 1,
+    "Triple": 2,
+    "Home Run": 3,
+    "Walk": 4,
+    "Strikeout": 5,
+    "Out": 6,
+    "Double Play": 6,
+    "Triple Play": 6,
+}
+_OUT_KINDS = ["Out", "Double Play", "Triple Play"]
+
+FIRST_NAMES = [
+    "Austin", "John", "Ryan", "Zac", "Evan", "Connor", "Jett", "Rocco", "Mike",
+    "Chris", "Matt", "Kevin", "Sean", "Pat", "Dan", "Tom", "Nick", "Joe",
+    "Kelly", "Sam", "Alex", "Jordan", "Taylor", "Casey", "Morgan", "Jamie",
+]
+LAST_NAMES = [
+    "Celiberti", "Gannon", "Cole", "Lavigna", "Pollack", "Moloughney", "Tinik",
+    "Richard", "Murphy", "O'Brien", "Sullivan", "Kelly", "Walsh", "Byrne",
+    "Russo", "Romano", "Nguyen", "Garcia", "Smith", "Johnson", "Lee", "Brown",
+]
+OPPONENTS = [
+    "Playa Bowls", "Bandits", "Sharks", "Hit Happens", "Bad News Beers",
+    "Master Batters", "Pitch Slapped", "Balls Deep", "Mighty Ducks", "Sandlot",
+    "Designated Drinkers", "Walk Offs", "Foul Balls", "Dirty Sox",
+]
+
+SEASON_START = date(2023, 4, 6)
+
+
+def parse_mix(text: str) -> dict:
+    """ "Home Run=0.1,Walk=0.05" -> DEFAULT_MIX with those shares changed."""
+    mix = dict(DEFAULT_MIX)
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, share = part.partition("=")
+        name = name.strip()
+        if name not in mix:
+            raise ValueError(f"Unknown outcome {name!r}; expected one of {', '.join(mix)}")
+        mix[name] = float(share)
+    return mix
+
+
+def _sim_rates(mix: dict) -> np.ndarray:
+    rates = np.zeros(simulator.N_OUTCOMES)
+    for name, share in mix.items():
+        rates[_SIM_CODE[name]] += share
+    return rates / rates.sum()
+
+
+def _messy(name: str, rng, rate: float) -> str:
+    """The kinds of typo the real roster and stats files have."""
+    if rng.random() >= rate:
+        return name
+    kind = rng.integers(3)
+    if kind == 0:
+        return name + " "
+    if kind == 1:
+        return name.lower()
+    return " " + name
+
+
+# ---------- Games ----------
+def _play_half(rng, player_cdfs, out_shares, lineup, batter: int):
+    """
+    One LTP half-inning. Returns (rows, runs, next batter) where rows are
+    (player_id, outcome, rbis, outs_before, bases_before, outs_after,
+    bases_after, runs_scored).
+    """
+    rows = []
+    outs, bases, total = 0, 0, 0
+    while outs < 3:
+        player_id = lineup[batter % len(lineup)]
+        batter += 1
+        code = int(np.searchsorted(player_cdfs[player_id], rng.random(), side="right"))
+        code = min(code, simulator.N_OUTCOMES - 1)
+
+        outcome = list(_SIM_CODE)[code] if code < 6 else None
+        new_outs = outs + int(simulator.OUTS[code])
+        new_bases = int(simulator.NEXT_BASES[bases, code])
+        runs = int(simulator.RUNS[bases, code])
+
+        if code == 6:
+            outcome = _OUT_KINDS[
+                int(np.searchsorted(out_shares, rng.random(), side="right"))
+            ]
+            runners = bin(bases).count("1")
+            if outcome == "Double Play" and bases & 1 and outs <= 1:
+                new_outs, new_bases = outs + 2, bases & ~1
+            elif outcome == "Triple Play" and runners >= 2 and outs == 0:
+                new_outs, new_bases = 3, 0
+            else:
+                outcome = "Out"
+
+        new_outs = min(new_outs, 3)
+        rows.append(
+            (
+                player_id,
+                outcome,
+                min(runs, 4),
+                outs,
+                bases,
+                new_outs,
+                0 if new_outs >= 3 else new_bases,
+                runs,
+            )
+        )
+        outs, bases = new_outs, new_bases
+        total += runs
+    return rows, total, batter
+
+
+def generate(
+    n_teams: int = 10,
+    n_seasons: int = 1,
+    games_per_season: int = 12,
+    roster_size: int = 12,
+    mix: dict = None,
+    messy_rate: float = 0.05,
+    missing_date_rate: float = 0.03,
+    seed: int = 0,
+) -> dict:
+    """
+    A league as DataFrames keyed like the database tables: "teams",
+    "players", "games" and "plate_appearances", each with team_id, and
+    player/game ids that are unique across the league.
+    """
+    rng = np.random.default_rng(seed)
+    mix = mix or DEFAULT_MIX
+    rates = _sim_rates(mix)
+    out_total = sum(mix[k] for k in _OUT_KINDS)
+    out_shares = np.cumsum([mix[k] / out_total for k in _OUT_KINDS])
+    opp_lineup = np.tile(rates, (9, 1))
+
+    teams, players, games, pas = [], [], [], []
+    player_cdfs = {}
+    next_player = 1
+
+    for team_id in range(1, n_teams + 1):
+        teams.append((team_id, f"Synthetic Team {team_id:04d}"))
+
+        roster = []
+        for slot in range(roster_size):
+            player_id = next_player
+            next_player += 1
+            first = _messy(str(rng.choice(FIRST_NAMES)), rng, messy_rate)
+            last = _messy(str(rng.choice(LAST_NAMES)), rng, messy_rate)
+            jersey = 0 if rng.random() < 0.15 else int(rng.integers(1, 100))
+            email = (
+                f"{first.strip().lower()}.{last.strip().lower()}@example.com"
+                if rng.random() < 0.5
+                else ""
+            )
+            players.append((player_id, team_id, first, last, jersey, email, 1))
+            # Each hitter gets their own outcome mix around the league's
+            player_cdfs[player_id] = np.cumsum(rng.dirichlet(rates * 60))
+            roster.append(player_id)
+
+        n_games = n_seasons * games_per_season
+        opp_runs = simulator.simulate_runs(opp_lineup, n_games=n_games, seed=rng)
+
+        for g in range(n_games):
+            season, week = divmod(g, games_per_season)
+            game_day = SEASON_START + timedelta(days=365 * season + 7 * week)
+            game_date = (
+                None if rng.random() < missing_date_rate else game_day.isoformat()
+            )
+            opponent = str(rng.choice(OPPONENTS))
+            ltp_role = "Home" if rng.random() < 0.5 else "Away"
+            half = "Bottom" if ltp_role == "Home" else "Top"
+
+            lineup = list(rng.permutation(roster)[: int(rng.integers(9, roster_size + 1))])
+            clock = pd.Timestamp(game_day) + pd.Timedelta(hours=18, minutes=30)
+            batter, ltp_runs = 0, 0
+            for inning in range(1, simulator.INNINGS + 1):
+                rows, runs, batter = _play_half(
+                    rng, player_cdfs, out_shares, lineup, batter
+                )
+                ltp_runs += runs
+                for row in rows:
+                    clock += pd.Timedelta(seconds=int(rng.integers(90, 240)))
+                    pas.append(
+                        (team_id, len(games) + 1, clock.isoformat(timespec="seconds"),
+                         game_date, opponent, inning, half) + row
+                    )
+
+            opp = int(opp_runs[g])
+            result = "W" if ltp_runs > opp else "L" if ltp_runs < opp else "T"
+            games.append((team_id, game_date, opponent, ltp_runs, opp, result, ltp_role))
+
+    pa_df = pd.DataFrame(
+        pas,
+        columns=[
+            "team_id", "game_id", "timestamp", "game_date", "opponent", "inning", "half",
+            "player_id", "outcome", "rbis", "outs_before", "bases_before",
+            "outs_after", "bases_after", "runs_scored",
+        ],
+    )
+    pa_df.insert(0, "pa_id", np.arange(1, len(pa_df) + 1))
+
+    games_df = pd.DataFrame(
+        games,
+        columns=["team_id", "game_date", "opponent", "ltp_runs", "opp_runs", "result", "ltp_role"],
+    )
+    games_df.insert(0, "game_id", np.arange(1, len(games_df) + 1))
+
+    return {
+        "teams": pd.DataFrame(teams, columns=["team_id", "team_name"]),
+        "players": pd.DataFrame(
+            players,
+            columns=["player_id", "team_id", "first_name", "last_name", "jersey_number", "email", "active"],
+        ),
+        "games": games_df,
+        "plate_appearances": pa_df,
+    }
+
+
+# ---------- Output ----------
+def team_log(league: dict, team_id: int) -> pd.DataFrame:
+    """A team's PAs joined to player names, as db.fetch_plate_appearances returns them."""
+    pas = league["plate_appearances"]
+    log = pas[pas["team_id"] == team_id].drop(columns="team_id")
+    names = league["players"][["player_id", "first_name", "last_name", "jersey_number"]]
+    return log.merge(names, on="player_id", how="left")
+
+
+def write_files(league: dict, out_dir) -> Path:
+    """Each team's CSVs under out_dir/teams/<team_id>/, the way storage lays them out."""
+    out_dir = Path(out_dir)
+    games = league["games"]
+    players = league["players"]
+
+    for team_id in league["teams"]["team_id"]:
+        team_dir = out_dir / "teams" / str(int(team_id))
+        team_dir.mkdir(parents=True, exist_ok=True)
+
+        players[players["team_id"] == team_id][
+            ["first_name", "last_name", "jersey_number", "email"]
+        ].to_csv(team_dir / "players.csv", index=False)
+
+        games[games["team_id"] == team_id].rename(columns={"game_date": "date"})[
+            ["date", "opponent", "ltp_runs", "opp_runs", "result", "ltp_role"]
+        ].to_csv(team_dir / "season_history.csv", index=False)
+
+        log = team_log(league, team_id)
+
+        season = stats.compute_player_stats(log)
+        season[stats.STATS_COLUMNS].to_csv(team_dir / storage.PLAYER_STATS, index=False)
+
+        totals = season.assign(
+            Name=(season["first_name"].str.strip() + " " + season["last_name"].str.strip())
+        )
+        totals[["player_id", "Name"] + stats.SEASON_TOTAL_COLUMNS + ["H", "RBI", "AVG", "OBP", "SLG"]].to_csv(
+            team_dir / storage.SEASON_TOTALS, index=False
+        )
+    return out_dir
+
+
+def load_db(league: dict, path) -> None:
+    """Insert the league into a SQLite database at path (created if missing)."""
+    db.DB_PATH = Path(path)
+    conn = db.get_conn()
+    db.migrate(conn)
+
+    pas = league["plate_appearances"].merge(
+        league["players"][["player_id", "first_name", "last_name", "jersey_number"]],
+        on="player_id",
+    )
+    tables = [
+        ("teams", league["teams"]),
+        ("players", league["players"]),
+        ("games", league["games"]),
+        ("plate_appearances", pas),
+    ]
+    with conn:
+        for table, df in tables:
+            cols = list(df.columns)
+            conn.executemany(
+                f"INSERT INTO {table}({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                df.astype(object).where(df.notna(), None).itertuples(index=False, name=None),
+            )
+    conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--teams", type=int, default=10)
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--games", type=int, default=12, help="games per season")
+    parser.add_argument("--roster", type=int, default=12, help="players per team")
+    parser.add_argument("--mix", default="", help='outcome shares, e.g. "Home Run=0.1,Walk=0.05"')
+    parser.add_argument("--messy", type=float, default=0.05, help="share of names with typos")
+    parser.add_argument("--missing-dates", type=float, default=0.03, help="share of games with no date")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="write per-team CSVs here")
+    parser.add_argument("--db", type=Path, help="load into this SQLite database")
+    args = parser.parse_args(argv)
+
+    league = generate(
+        n_teams=args.teams,
+        n_seasons=args.seasons,
+        games_per_season=args.games,
+        roster_size=args.roster,
+        mix=parse_mix(args.mix),
+        messy_rate=args.messy,
+        missing_date_rate=args.missing_dates,
+        seed=args.seed,
+    )
+    print(
+        f"{len(league['teams'])} teams, {len(league['players'])} players, "
+        f"{len(league['games'])} games, {len(league['plate_appearances']):,} PAs"
+    )
+    if args.out:
+        print(f"Wrote {write_files(league, args.out)}")
+    if args.db:
+        load_db(league, args.db)
+        print(f"Loaded {args.db}")
+
+
+if __name__ == "__main__":
+    main()
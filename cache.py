@@ -0,0 +1,84 @@
+import functools
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import db
+
+
+def file_signature(*paths) -> tuple:
+    """(mtime_ns, size) of each path; changes whenever a file is rewritten."""
+    sig = []
+    for path in paths:
+        try:
+            info = Path(path).stat()
+            sig.append((info.st_mtime_ns, info.st_size))
+        except FileNotFoundError:
+            sig.append(None)
+    return tuple(sig)
+
+
+class TeamCache:
+    """
+    One cached value per team, tagged with the data version it was built
+    from. Teams are evicted least-recently-used past max_teams.
+    """
+
+    def __init__(self, max_teams: int = 64):
+        self.max_teams = max_teams
+        self._entries = OrderedDict()  # team_id -> (version, value)
+        self._lock = threading.Lock()
+
+    def get(self, team_id, version, build):
+        with self._lock:
+            entry = self._entries.get(team_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(team_id)
+                return entry[1]
+
+        # Build outside the lock so one slow team doesn't block the others
+        value = build()
+
+        with self._lock:
+            self._entries[team_id] = (version, value)
+            self._entries.move_to_end(team_id)
+            while len(self._entries) > self.max_teams:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Caches live here (not in the page) so they survive Streamlit reruns
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def by_revision(max_teams: int = 64, version=None):
+    """
+    Cache fn(team_id, ...) per team until the team's data changes.
+
+    version(team_id) gives the key the cached value is checked against;
+    by default the database revision counter. Pass a function returning
+    file_signature(...) for file-backed data. DataFrames are returned as
+    copies so callers can't corrupt the cached one.
+    """
+    version = version or db.data_revision
+
+    def decorator(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+        with _caches_lock:
+            store = _caches.setdefault(name, TeamCache(max_teams))
+
+        @functools.wraps(fn)
+        def wrapper(team_id, *args):
+            key = (team_id,) + args
+            value = store.get(key, version(team_id), lambda: fn(team_id, *args))
+            return value.copy() if hasattr(value, "copy") else value
+
+        wrapper.cache = store
+        return wrapper
+
+    return decorator
@@ -0,0 +1,6 @@
+"""
+Puts the checkout on sys.path for the tests under tests/, which import the
+app's top-level modules (db, stats, team_data, ...) and benchmarks/.
+
+    python -m pytest -q
+"""
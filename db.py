@@ -1,25 +1,46 @@
+import json
 import sqlite3
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
 
+import pandas as pd
+
+import metrics
+
 DB_PATH = Path("app.db")
 
-def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+# Legacy flat files, imported once into the tables below
+LEGACY_ROSTER_PATH = Path("players.csv")
+LEGACY_GAME_LOG_PATH = Path("gameday_log.csv")
+LEGACY_SEASON_HISTORY_PATH = Path("season_history.csv")
 
-def init_db():
-    conn = get_conn()
-    cur = conn.cursor()
 
-    cur.execute("""
+# ---------- Schema migrations ----------
+# PAs recorded before game_id existed go to the first game with their date
+# and opponent; nothing older can tell a doubleheader's games apart
+_ATTACH_LEGACY_PAS = """
+    UPDATE plate_appearances
+    SET game_id = (
+        SELECT MIN(g.game_id) FROM games g
+        WHERE g.team_id = plate_appearances.team_id
+          AND g.game_date IS plate_appearances.game_date
+          AND g.opponent = plate_appearances.opponent
+    )
+    WHERE game_id IS NULL AND live_game_id IS NULL;
+"""
+
+# Each entry moves the schema up one version (tracked in PRAGMA user_version).
+# Never edit a shipped migration; append a new one instead.
+MIGRATIONS = [
+    # 1: accounts
+    """
     CREATE TABLE IF NOT EXISTS teams (
         team_id INTEGER PRIMARY KEY AUTOINCREMENT,
         team_name TEXT NOT NULL UNIQUE
-    )
-    """)
+    );
 
-    cur.execute("""
     CREATE TABLE IF NOT EXISTS users (
         user_id INTEGER PRIMARY KEY AUTOINCREMENT,
         name TEXT NOT NULL,
@@ -28,8 +49,1078 @@ def init_db():
         team_id INTEGER NOT NULL,
         role TEXT NOT NULL DEFAULT 'captain',
         FOREIGN KEY(team_id) REFERENCES teams(team_id)
+    );
+    """,
+    # 2: roster, games and the plate-appearance log
+    """
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS players (
+        player_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_id INTEGER NOT NULL,
+        first_name TEXT NOT NULL,
+        last_name TEXT NOT NULL,
+        jersey_number INTEGER NOT NULL DEFAULT 0,
+        email TEXT NOT NULL DEFAULT '',
+        active INTEGER NOT NULL DEFAULT 1,
+        FOREIGN KEY(team_id) REFERENCES teams(team_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_players_team_name
+        ON players(team_id, first_name, last_name, jersey_number);
+
+    CREATE TABLE IF NOT EXISTS games (
+        game_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_id INTEGER NOT NULL,
+        game_date TEXT,
+        opponent TEXT NOT NULL DEFAULT '',
+        ltp_runs INTEGER NOT NULL DEFAULT 0,
+        opp_runs INTEGER NOT NULL DEFAULT 0,
+        result TEXT,
+        ltp_role TEXT,
+        FOREIGN KEY(team_id) REFERENCES teams(team_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_games_team_date_opp
+        ON games(team_id, game_date, opponent);
+
+    CREATE TABLE IF NOT EXISTS plate_appearances (
+        pa_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_id INTEGER NOT NULL,
+        player_id INTEGER NOT NULL,
+        timestamp TEXT,
+        game_date TEXT,
+        opponent TEXT NOT NULL DEFAULT '',
+        inning INTEGER,
+        half TEXT,
+        first_name TEXT NOT NULL,
+        last_name TEXT NOT NULL,
+        jersey_number INTEGER NOT NULL DEFAULT 0,
+        outcome TEXT NOT NULL,
+        rbis INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY(team_id) REFERENCES teams(team_id),
+        FOREIGN KEY(player_id) REFERENCES players(player_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_pa_team_game
+        ON plate_appearances(team_id, game_date, opponent);
+    CREATE INDEX IF NOT EXISTS idx_pa_player
+        ON plate_appearances(player_id);
+    """,
+    # 3: per-team change counter, bumped by triggers on every data write
+    """
+    CREATE TABLE IF NOT EXISTS data_revisions (
+        team_id INTEGER PRIMARY KEY,
+        revision INTEGER NOT NULL DEFAULT 0
+    );
+    """
+    + "".join(
+        f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_{op.lower()}_rev
+    AFTER {op} ON {table}
+    BEGIN
+        INSERT INTO data_revisions(team_id, revision) VALUES ({row}.team_id, 1)
+        ON CONFLICT(team_id) DO UPDATE SET revision = revision + 1;
+    END;
+    """
+        for table in ("players", "games", "plate_appearances")
+        for op, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))
+    ),
+    # 4: box scores materialized per game when it ends, keyed by player id
+    # (names are joined from players)
+    """
+    ALTER TABLE games ADD COLUMN box_score_built INTEGER NOT NULL DEFAULT 0;
+
+    CREATE TABLE IF NOT EXISTS box_scores (
+        game_id INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        player_id INTEGER NOT NULL,
+        PA INTEGER NOT NULL DEFAULT 0,
+        AB INTEGER NOT NULL DEFAULT 0,
+        H INTEGER NOT NULL DEFAULT 0,
+        "1B" INTEGER NOT NULL DEFAULT 0,
+        "2B" INTEGER NOT NULL DEFAULT 0,
+        "3B" INTEGER NOT NULL DEFAULT 0,
+        HR INTEGER NOT NULL DEFAULT 0,
+        BB INTEGER NOT NULL DEFAULT 0,
+        K INTEGER NOT NULL DEFAULT 0,
+        RBI INTEGER NOT NULL DEFAULT 0,
+        AVG REAL NOT NULL DEFAULT 0,
+        OBP REAL NOT NULL DEFAULT 0,
+        SLG REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY(game_id, player_id),
+        FOREIGN KEY(game_id) REFERENCES games(game_id),
+        FOREIGN KEY(player_id) REFERENCES players(player_id)
+    );
+    """,
+    # 5: base-out state around each PA, and a counter that only moves when
+    # the team's game list does (for season-level batch jobs)
+    """
+    ALTER TABLE plate_appearances ADD COLUMN outs_before INTEGER;
+    ALTER TABLE plate_appearances ADD COLUMN bases_before INTEGER;
+    ALTER TABLE plate_appearances ADD COLUMN outs_after INTEGER;
+    ALTER TABLE plate_appearances ADD COLUMN bases_after INTEGER;
+    ALTER TABLE plate_appearances ADD COLUMN runs_scored INTEGER;
+
+    ALTER TABLE data_revisions ADD COLUMN games_revision INTEGER NOT NULL DEFAULT 0;
+    """
+    + "".join(
+        f"""
+    CREATE TRIGGER IF NOT EXISTS trg_games_{op.lower()}_games_rev
+    AFTER {op} ON games
+    BEGIN
+        INSERT INTO data_revisions(team_id, revision, games_revision)
+        VALUES ({row}.team_id, 1, 1)
+        ON CONFLICT(team_id) DO UPDATE SET games_revision = games_revision + 1;
+    END;
+    """
+        for op, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))
+    ),
+    # 6: journal of live-game actions, with periodic state snapshots
+    """
+    CREATE TABLE IF NOT EXISTS live_games (
+        live_game_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_id INTEGER NOT NULL,
+        started_at TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'active',
+        FOREIGN KEY(team_id) REFERENCES teams(team_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_live_games_team_status
+        ON live_games(team_id, status);
+
+    CREATE TABLE IF NOT EXISTS live_game_events (
+        live_game_id INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        action TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        PRIMARY KEY(live_game_id, seq),
+        FOREIGN KEY(live_game_id) REFERENCES live_games(live_game_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS live_game_snapshots (
+        live_game_id INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        state TEXT NOT NULL,
+        PRIMARY KEY(live_game_id, seq),
+        FOREIGN KEY(live_game_id) REFERENCES live_games(live_game_id)
+    );
+    """,
+    # 7: a counter that only moves when the team's roster does (the roster
+    # and player-name caches would otherwise miss on every PA)
+    """
+    ALTER TABLE data_revisions ADD COLUMN roster_revision INTEGER NOT NULL DEFAULT 0;
+    """
+    + "".join(
+        f"""
+    CREATE TRIGGER IF NOT EXISTS trg_players_{op.lower()}_roster_rev
+    AFTER {op} ON players
+    BEGIN
+        INSERT INTO data_revisions(team_id, revision, roster_revision)
+        VALUES ({row}.team_id, 1, 1)
+        ON CONFLICT(team_id) DO UPDATE SET roster_revision = roster_revision + 1;
+    END;
+    """
+        for op, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))
+    ),
+    # 8: server-side login sessions; the browser holds only a random token,
+    # and a password change signs the account out everywhere
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        token_hash TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        expires_at INTEGER NOT NULL,
+        FOREIGN KEY(user_id) REFERENCES users(user_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_sessions_user
+        ON sessions(user_id);
+
+    CREATE TRIGGER IF NOT EXISTS trg_users_password_sessions
+    AFTER UPDATE OF password_hash ON users
+    BEGIN
+        DELETE FROM sessions WHERE user_id = NEW.user_id;
+    END;
+    """,
+    # 9: each PA points at the live game it was recorded in and, once that
+    # game is ended, at its row in games; date/opponent can't tell a
+    # doubleheader's two games apart
+    """
+    ALTER TABLE plate_appearances ADD COLUMN live_game_id INTEGER
+        REFERENCES live_games(live_game_id);
+    ALTER TABLE plate_appearances ADD COLUMN game_id INTEGER
+        REFERENCES games(game_id);
+    CREATE INDEX IF NOT EXISTS idx_pa_team_game_id
+        ON plate_appearances(team_id, game_id);
+    CREATE INDEX IF NOT EXISTS idx_pa_live_game
+        ON plate_appearances(live_game_id);
+    DROP INDEX IF EXISTS idx_pa_team_game;
+    """
+    + _ATTACH_LEGACY_PAS,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def _statements(script: str):
+    """Split a migration into single statements (trigger bodies stay whole)."""
+    pending = ""
+    for part in script.split(";"):
+        pending += part + ";"
+        if sqlite3.complete_statement(pending):
+            if pending.strip(" \n;"):
+                yield pending
+            pending = ""
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply any pending migrations and return the resulting schema version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        # Take the write lock before looking at the version, so another
+        # process migrating the same file can't apply a step twice
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < target:
+                for statement in _statements(MIGRATIONS[target - 1]):
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return max(version, SCHEMA_VERSION)
+
+
+# ---------- Connections ----------
+# Idle connections kept for reuse; any returned beyond this are closed
+POOL_SIZE = 8
+
+_pool = []
+_pool_lock = threading.Lock()
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Connection whose close() hands it back to the pool instead of closing
+    it, so callers keep the usual get_conn() ... close() pattern.
+    """
+
+    def close(self):
+        if self.idle:
+            return  # already back in the pool
+        if self.in_transaction:
+            self.rollback()
+        with _pool_lock:
+            if self.db_path == str(DB_PATH) and len(_pool) < POOL_SIZE:
+                self.idle = True
+                _pool.append(self)
+                return
+        super().close()
+
+
+def _use_wal(conn: sqlite3.Connection) -> None:
+    """
+    Switch the file to WAL (it stays that way). The switch needs the file to
+    itself and doesn't wait on the busy timeout, so retry while another
+    process is opening it too.
+    """
+    for _ in range(100):
+        try:
+            if conn.execute("PRAGMA journal_mode = WAL").fetchone()[0] == "wal":
+                return
+        except sqlite3.OperationalError as exc:
+            if "locked" not in str(exc):
+                raise
+        time.sleep(0.05)
+
+
+def _connect() -> PooledConnection:
+    global _schema_ready
+
+    # Connections move between Streamlit's script threads, one at a time
+    conn = sqlite3.connect(
+        DB_PATH, timeout=10, factory=PooledConnection, check_same_thread=False
+    )
+    conn.db_path = str(DB_PATH)
+    conn.idle = False
+    conn.row_factory = sqlite3.Row
+    if not _schema_ready:
+        with _schema_lock:
+            if not _schema_ready:
+                _use_wal(conn)
+                migrate(conn)
+                _schema_ready = True
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def get_conn():
+    """A connection from the pool, or a new one if none is idle."""
+    with _pool_lock:
+        conn = _pool.pop() if _pool else None
+        if conn is not None:
+            conn.idle = False
+
+    if conn is None:
+        return _connect()
+    if conn.db_path != str(DB_PATH):
+        # DB_PATH was pointed elsewhere (tests, benchmarks)
+        sqlite3.Connection.close(conn)
+        return _connect()
+    return conn
+
+
+def init_db():
+    conn = get_conn()
+    migrate(conn)
+    conn.close()
+
+
+# ---------- Users ----------
+@metrics.timed
+def fetch_user(username: str = None, user_id: int = None):
+    """One account row by username or user_id, or None."""
+    conn = get_conn()
+    if user_id is not None:
+        row = conn.execute("SELECT * FROM users WHERE user_id = ?", (user_id,)).fetchone()
+    else:
+        row = conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
+    conn.close()
+    return row
+
+
+def find_team(team) -> int:
+    """team_id for a team name or numeric id, or None if there's no such team."""
+    conn = get_conn()
+    row = conn.execute(
+        "SELECT team_id FROM teams WHERE team_name = ? OR CAST(team_id AS TEXT) = ?",
+        (str(team), str(team)),
+    ).fetchone()
+    conn.close()
+    return row["team_id"] if row else None
+
+
+def create_session(token_hash: str, user_id: int, expires_at: int) -> None:
+    """Record a login; expired sessions are swept out at the same time."""
+    conn = get_conn()
+    with conn:
+        conn.execute("DELETE FROM sessions WHERE expires_at < ?", (int(time.time()),))
+        conn.execute(
+            "INSERT INTO sessions(token_hash, user_id, expires_at) VALUES (?, ?, ?)",
+            (token_hash, user_id, expires_at),
+        )
+    conn.close()
+
+
+def session_user(token_hash: str):
+    """The account behind an unexpired session, or None."""
+    conn = get_conn()
+    row = conn.execute(
+        """
+        SELECT u.* FROM sessions s JOIN users u ON u.user_id = s.user_id
+        WHERE s.token_hash = ? AND s.expires_at >= ?
+        """,
+        (token_hash, int(time.time())),
+    ).fetchone()
+    conn.close()
+    return row
+
+
+def delete_session(token_hash: str) -> None:
+    conn = get_conn()
+    with conn:
+        conn.execute("DELETE FROM sessions WHERE token_hash = ?", (token_hash,))
+    conn.close()
+
+
+def data_revision(team_id: int) -> int:
+    """Counter that changes whenever the team's roster, games or PAs change."""
+    conn = get_conn()
+    row = conn.execute(
+        "SELECT revision FROM data_revisions WHERE team_id = ?", (team_id,)
+    ).fetchone()
+    conn.close()
+    return row["revision"] if row else 0
+
+
+def season_revision(team_id: int) -> int:
+    """Counter that changes only when a game is added, edited or deleted."""
+    conn = get_conn()
+    row = conn.execute(
+        "SELECT games_revision FROM data_revisions WHERE team_id = ?", (team_id,)
+    ).fetchone()
+    conn.close()
+    return row["games_revision"] if row else 0
+
+
+def roster_revision(team_id: int) -> int:
+    """Counter that changes only when the team's roster changes."""
+    conn = get_conn()
+    row = conn.execute(
+        "SELECT roster_revision FROM data_revisions WHERE team_id = ?", (team_id,)
+    ).fetchone()
+    conn.close()
+    return row["roster_revision"] if row else 0
+
+
+# ---------- Helpers ----------
+def _clean_str(value) -> str:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    value = str(value).strip()
+    return "" if value.lower() == "nan" else value
+
+
+def _clean_int(value, default: int = 0) -> int:
+    try:
+        if pd.isna(value):
+            return default
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def _clean_date(value):
+    parsed = pd.to_datetime(value, errors="coerce")
+    if pd.isna(parsed):
+        return None
+    return parsed.strftime("%Y-%m-%d")
+
+
+# ---------- Players ----------
+@metrics.timed
+def fetch_players(team_id: int, include_inactive: bool = False) -> pd.DataFrame:
+    sql = """
+        SELECT player_id, first_name, last_name, jersey_number, email, active
+        FROM players
+        WHERE team_id = ?
+    """
+    if not include_inactive:
+        sql += " AND active = 1"
+    sql += " ORDER BY player_id"
+
+    conn = get_conn()
+    df = pd.read_sql_query(sql, conn, params=(team_id,))
+    conn.close()
+    return df
+
+
+def player_names(team_id: int) -> dict:
+    """player_id -> "First Last" for every player the team has ever had."""
+    conn = get_conn()
+    rows = conn.execute(
+        "SELECT player_id, first_name, last_name FROM players WHERE team_id = ?",
+        (team_id,),
+    ).fetchall()
+    conn.close()
+    return {
+        r["player_id"]: f"{r['first_name']} {r['last_name']}".strip() for r in rows
+    }
+
+
+def _find_player_id(conn, team_id: int, first: str, last: str, jersey: int):
+    row = conn.execute(
+        """
+        SELECT player_id FROM players
+        WHERE team_id = ? AND first_name = ? AND last_name = ? AND jersey_number = ?
+        ORDER BY active DESC, player_id
+        LIMIT 1
+        """,
+        (team_id, first, last, jersey),
+    ).fetchone()
+    return row["player_id"] if row else None
+
+
+def _resolve_player_id(conn, team_id: int, first: str, last: str, jersey: int) -> int:
+    """Find a player by name/jersey, registering an inactive one if unknown."""
+    player_id = _find_player_id(conn, team_id, first, last, jersey)
+    if player_id is None:
+        cur = conn.execute(
+            """
+            INSERT INTO players(team_id, first_name, last_name, jersey_number, active)
+            VALUES (?, ?, ?, ?, 0)
+            """,
+            (team_id, first, last, jersey),
+        )
+        player_id = cur.lastrowid
+    return player_id
+
+
+def add_player(team_id: int, first: str, last: str, jersey: int, email: str = "") -> int:
+    conn = get_conn()
+    cur = conn.execute(
+        """
+        INSERT INTO players(team_id, first_name, last_name, jersey_number, email)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        (team_id, first, last, int(jersey), email),
     )
-    """)
+    conn.commit()
+    conn.close()
+    return cur.lastrowid
+
 
+def update_player(
+    team_id: int, player_id: int, first: str, last: str, jersey: int, email: str
+) -> None:
+    conn = get_conn()
+    conn.execute(
+        """
+        UPDATE players
+        SET first_name = ?, last_name = ?, jersey_number = ?, email = ?
+        WHERE team_id = ? AND player_id = ?
+        """,
+        (first, last, int(jersey), email, team_id, player_id),
+    )
     conn.commit()
     conn.close()
+
+
+def deactivate_player(team_id: int, player_id: int) -> None:
+    """Remove a player from the roster but keep their plate appearances."""
+    conn = get_conn()
+    conn.execute(
+        "UPDATE players SET active = 0 WHERE team_id = ? AND player_id = ?",
+        (team_id, player_id),
+    )
+    conn.commit()
+    conn.close()
+
+
+# ---------- Games ----------
+@metrics.timed
+def fetch_games(team_id: int) -> pd.DataFrame:
+    conn = get_conn()
+    df = pd.read_sql_query(
+        """
+        SELECT game_id, game_date AS date, opponent, ltp_runs, opp_runs, result, ltp_role
+        FROM games
+        WHERE team_id = ?
+        ORDER BY game_id
+        """,
+        conn,
+        params=(team_id,),
+    )
+    conn.close()
+    return df
+
+
+@metrics.timed
+def insert_game(team_id: int, record: dict, live_game_id: int = None) -> int:
+    """Save a finished game; the PAs recorded in live_game_id become its PAs."""
+    conn = get_conn()
+    cur = conn.execute(
+        """
+        INSERT INTO games(team_id, game_date, opponent, ltp_runs, opp_runs, result, ltp_role)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            team_id,
+            record["date"],
+            _clean_str(record["opponent"]),
+            int(record["ltp_runs"]),
+            int(record["opp_runs"]),
+            record["result"],
+            record.get("ltp_role"),
+        ),
+    )
+    game_id = cur.lastrowid
+    if live_game_id is not None:
+        conn.execute(
+            "UPDATE plate_appearances SET game_id = ? WHERE team_id = ? AND live_game_id = ?",
+            (game_id, team_id, live_game_id),
+        )
+    conn.commit()
+    conn.close()
+    return game_id
+
+
+def update_game(
+    team_id: int,
+    game_id: int,
+    game_date: str,
+    opponent: str,
+    ltp_runs: int,
+    opp_runs: int,
+    result: str,
+) -> None:
+    """Edit a game; its plate appearances follow a date/opponent change."""
+    conn = get_conn()
+    conn.execute(
+        """
+        UPDATE plate_appearances
+        SET game_date = ?, opponent = ?
+        WHERE team_id = ? AND game_id = ?
+        """,
+        (game_date, _clean_str(opponent), team_id, game_id),
+    )
+    conn.execute(
+        """
+        UPDATE games
+        SET game_date = ?, opponent = ?, ltp_runs = ?, opp_runs = ?, result = ?,
+            box_score_built = 0
+        WHERE team_id = ? AND game_id = ?
+        """,
+        (
+            game_date,
+            _clean_str(opponent),
+            int(ltp_runs),
+            int(opp_runs),
+            result,
+            team_id,
+            game_id,
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def delete_game(team_id: int, game_id: int) -> None:
+    """Delete a game and the plate appearances logged against it."""
+    conn = get_conn()
+    exists = conn.execute(
+        "SELECT 1 FROM games WHERE team_id = ? AND game_id = ?", (team_id, game_id)
+    ).fetchone()
+    if exists is not None:
+        conn.execute(
+            "DELETE FROM plate_appearances WHERE team_id = ? AND game_id = ?",
+            (team_id, game_id),
+        )
+        conn.execute("DELETE FROM box_scores WHERE game_id = ?", (game_id,))
+        conn.execute(
+            "DELETE FROM games WHERE team_id = ? AND game_id = ?", (team_id, game_id)
+        )
+    conn.commit()
+    conn.close()
+
+
+# ---------- Box scores ----------
+BOX_SCORE_COLUMNS = [
+    "player_id",
+    "PA",
+    "AB",
+    "H",
+    "1B",
+    "2B",
+    "3B",
+    "HR",
+    "BB",
+    "K",
+    "RBI",
+    "AVG",
+    "OBP",
+    "SLG",
+]
+
+
+@metrics.timed
+def save_box_score(team_id: int, game_id: int, box_df: pd.DataFrame) -> None:
+    """Store (or replace) a game's per-hitter lines and mark it built."""
+    cols = ", ".join(f'"{c}"' for c in BOX_SCORE_COLUMNS)
+    marks = ", ".join("?" for _ in BOX_SCORE_COLUMNS)
+    rows = [
+        (game_id, team_id, *row)
+        for row in box_df[BOX_SCORE_COLUMNS].itertuples(index=False, name=None)
+    ]
+
+    conn = get_conn()
+    with conn:
+        conn.execute("DELETE FROM box_scores WHERE game_id = ?", (game_id,))
+        conn.executemany(
+            f"INSERT INTO box_scores(game_id, team_id, {cols}) VALUES (?, ?, {marks})",
+            rows,
+        )
+        conn.execute(
+            "UPDATE games SET box_score_built = 1 WHERE team_id = ? AND game_id = ?",
+            (team_id, game_id),
+        )
+    conn.close()
+
+
+@metrics.timed
+def fetch_box_score(team_id: int, game_id: int):
+    """A game's stored box score, or None if it hasn't been built (or was invalidated)."""
+    conn = get_conn()
+    built = conn.execute(
+        "SELECT box_score_built FROM games WHERE team_id = ? AND game_id = ?",
+        (team_id, game_id),
+    ).fetchone()
+    if built is None or not built["box_score_built"]:
+        conn.close()
+        return None
+
+    cols = ", ".join(f'b."{c}"' for c in BOX_SCORE_COLUMNS[1:])
+    df = pd.read_sql_query(
+        f"""
+        SELECT b.player_id, p.first_name, p.last_name, p.jersey_number, {cols}
+        FROM box_scores b JOIN players p ON p.player_id = b.player_id
+        WHERE b.game_id = ? AND b.team_id = ?
+        """,
+        conn,
+        params=(game_id, team_id),
+    )
+    conn.close()
+    return df
+
+
+# ---------- Plate appearances ----------
+PA_COLUMNS = [
+    "pa_id",
+    "game_id",
+    "player_id",
+    "timestamp",
+    "game_date",
+    "opponent",
+    "inning",
+    "half",
+    "outcome",
+    "rbis",
+    "outs_before",
+    "bases_before",
+    "outs_after",
+    "bases_after",
+    "runs_scored",
+]
+
+# Base-out columns are NULL for PAs recorded before they were tracked
+_STATE_COLUMNS = PA_COLUMNS[-5:]
+
+# Names come from the players table, so a rename or jersey change carries
+# through every historical PA instead of orphaning it.
+_PA_SELECT = (
+    ", ".join(f"pa.{c}" for c in PA_COLUMNS)
+    + ", p.first_name, p.last_name, p.jersey_number"
+)
+_PA_FROM = "plate_appearances pa JOIN players p ON p.player_id = pa.player_id"
+
+
+def _insert_plate_appearance(conn, team_id: int, event: dict) -> int:
+    first = _clean_str(event["first_name"])
+    last = _clean_str(event["last_name"])
+    jersey = _clean_int(event["jersey_number"])
+    player_id = event.get("player_id")
+    if player_id is None:
+        player_id = _resolve_player_id(conn, team_id, first, last, jersey)
+    cur = conn.execute(
+        """
+        INSERT INTO plate_appearances(
+            team_id, live_game_id, player_id, timestamp, game_date, opponent, inning, half,
+            first_name, last_name, jersey_number, outcome, rbis,
+            outs_before, bases_before, outs_after, bases_after, runs_scored
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            team_id,
+            event.get("live_game_id"),
+            player_id,
+            event.get("timestamp"),
+            event.get("game_date"),
+            _clean_str(event.get("opponent")),
+            event.get("inning"),
+            event.get("half"),
+            first,
+            last,
+            jersey,
+            event["outcome"],
+            _clean_int(event.get("rbis")),
+            *(event.get(c) for c in _STATE_COLUMNS),
+        ),
+    )
+    return cur.lastrowid
+
+
+@metrics.timed
+def insert_plate_appearance(team_id: int, event: dict) -> int:
+    conn = get_conn()
+    with conn:
+        pa_id = _insert_plate_appearance(conn, team_id, event)
+    conn.close()
+    return pa_id
+
+
+@metrics.timed
+def insert_journaled_plate_appearance(
+    team_id: int, event: dict, live_game_id: int, payload: dict
+) -> tuple:
+    """
+    insert_plate_appearance plus the live game's "pa" journal entry, in one
+    transaction, so neither is ever stored without the other. payload["pa"]
+    is the PA's undo record; its pa_id is filled in before the entry is
+    written. Returns (pa_id, seq).
+    """
+    conn = get_conn()
+    with conn:
+        pa_id = _insert_plate_appearance(conn, team_id, event)
+        payload["pa"]["pa_id"] = pa_id
+        seq = _append_live_event(conn, live_game_id, "pa", json.dumps(payload))
+    conn.close()
+    return pa_id, seq
+
+
+@metrics.timed
+def delete_plate_appearance(team_id: int, pa_id: int) -> None:
+    conn = get_conn()
+    conn.execute(
+        "DELETE FROM plate_appearances WHERE team_id = ? AND pa_id = ?",
+        (team_id, pa_id),
+    )
+    conn.commit()
+    conn.close()
+
+
+@metrics.timed
+def delete_journaled_plate_appearance(team_id: int, pa_id: int, live_game_id: int) -> int:
+    """
+    delete_plate_appearance plus the live game's "undo" journal entry, in
+    one transaction. Returns the entry's sequence number.
+    """
+    conn = get_conn()
+    with conn:
+        conn.execute(
+            "DELETE FROM plate_appearances WHERE team_id = ? AND pa_id = ?",
+            (team_id, pa_id),
+        )
+        seq = _append_live_event(conn, live_game_id, "undo", "{}")
+    conn.close()
+    return seq
+
+
+@metrics.timed
+def fetch_plate_appearances(team_id: int, game_id: int = None) -> pd.DataFrame:
+    """PA log for a team, optionally narrowed to one game (indexed lookup)."""
+    sql = f"SELECT {_PA_SELECT} FROM {_PA_FROM} WHERE pa.team_id = ?"
+    params = [team_id]
+    if game_id is not None:
+        sql += " AND pa.game_id = ?"
+        params.append(game_id)
+    sql += " ORDER BY pa.pa_id"
+
+    conn = get_conn()
+    df = pd.read_sql_query(sql, conn, params=params)
+    conn.close()
+    return df
+
+
+@metrics.timed
+def fetch_season_plate_appearances(team_id: int) -> pd.DataFrame:
+    """PAs that belong to a game recorded in the team's season history."""
+    conn = get_conn()
+    df = pd.read_sql_query(
+        f"""
+        SELECT {_PA_SELECT}
+        FROM {_PA_FROM}
+        WHERE pa.team_id = ? AND pa.game_id IS NOT NULL
+        ORDER BY pa.pa_id
+        """,
+        conn,
+        params=(team_id,),
+    )
+    conn.close()
+    return df
+
+
+# ---------- Live-game journal ----------
+def create_live_game(team_id: int) -> int:
+    """Open a journal for a new game; any game the team left open is abandoned."""
+    conn = get_conn()
+    conn.execute(
+        "UPDATE live_games SET status = 'abandoned' WHERE team_id = ? AND status = 'active'",
+        (team_id,),
+    )
+    cur = conn.execute(
+        "INSERT INTO live_games(team_id, started_at) VALUES (?, datetime('now'))",
+        (team_id,),
+    )
+    conn.commit()
+    conn.close()
+    return cur.lastrowid
+
+
+def _append_live_event(conn, live_game_id: int, action: str, payload: str) -> int:
+    return conn.execute(
+        """
+        INSERT INTO live_game_events(live_game_id, seq, action, payload)
+        SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?
+        FROM live_game_events WHERE live_game_id = ?
+        RETURNING seq
+        """,
+        (live_game_id, action, payload, live_game_id),
+    ).fetchone()[0]
+
+
+@metrics.timed
+def append_live_event(live_game_id: int, action: str, payload: str) -> int:
+    """Append one journal entry and return its sequence number."""
+    conn = get_conn()
+    with conn:
+        seq = _append_live_event(conn, live_game_id, action, payload)
+    conn.close()
+    return seq
+
+
+def save_live_snapshot(live_game_id: int, seq: int, state: str) -> None:
+    conn = get_conn()
+    conn.execute(
+        "INSERT OR REPLACE INTO live_game_snapshots(live_game_id, seq, state) VALUES (?, ?, ?)",
+        (live_game_id, seq, state),
+    )
+    conn.commit()
+    conn.close()
+
+
+@metrics.timed
+def fetch_active_live_game(team_id: int):
+    """The team's unfinished game as (live_game_id, snapshot_seq, snapshot, events)."""
+    conn = get_conn()
+    row = conn.execute(
+        """
+        SELECT live_game_id FROM live_games
+        WHERE team_id = ? AND status = 'active'
+        ORDER BY live_game_id DESC LIMIT 1
+        """,
+        (team_id,),
+    ).fetchone()
+    if row is None:
+        conn.close()
+        return None
+
+    live_game_id = row["live_game_id"]
+    snap = conn.execute(
+        """
+        SELECT seq, state FROM live_game_snapshots
+        WHERE live_game_id = ? ORDER BY seq DESC LIMIT 1
+        """,
+        (live_game_id,),
+    ).fetchone()
+    snap_seq = snap["seq"] if snap else 0
+    events = conn.execute(
+        """
+        SELECT seq, action, payload FROM live_game_events
+        WHERE live_game_id = ? AND seq > ? ORDER BY seq
+        """,
+        (live_game_id, snap_seq),
+    ).fetchall()
+    conn.close()
+    return live_game_id, snap_seq, (snap["state"] if snap else None), events
+
+
+def finish_live_game(live_game_id: int, status: str = "ended") -> None:
+    conn = get_conn()
+    conn.execute(
+        "UPDATE live_games SET status = ? WHERE live_game_id = ?",
+        (status, live_game_id),
+    )
+    conn.commit()
+    conn.close()
+
+
+# ---------- One-time import of the legacy CSV files ----------
+def import_legacy_csvs(team_id: int) -> bool:
+    """
+    Copy players.csv, gameday_log.csv and season_history.csv into the tables
+    above, as team_id's data. Runs once per database (see import_legacy.py);
+    returns True if the import happened.
+    """
+    conn = get_conn()
+    done = conn.execute(
+        "SELECT value FROM meta WHERE key = 'legacy_csv_import'"
+    ).fetchone()
+    if done is not None:
+        conn.close()
+        return False
+
+    with conn:
+        if LEGACY_ROSTER_PATH.exists():
+            roster = pd.read_csv(LEGACY_ROSTER_PATH)
+            for _, r in roster.iterrows():
+                first = _clean_str(r.get("first_name"))
+                last = _clean_str(r.get("last_name"))
+                jersey = _clean_int(r.get("jersey_number"))
+                if _find_player_id(conn, team_id, first, last, jersey) is None:
+                    conn.execute(
+                        """
+                        INSERT INTO players(team_id, first_name, last_name, jersey_number, email)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        (team_id, first, last, jersey, _clean_str(r.get("email"))),
+                    )
+
+        if LEGACY_GAME_LOG_PATH.exists():
+            log_df = pd.read_csv(LEGACY_GAME_LOG_PATH)
+            rows = []
+            for _, r in log_df.iterrows():
+                first = _clean_str(r.get("first_name"))
+                last = _clean_str(r.get("last_name"))
+                jersey = _clean_int(r.get("jersey_number"))
+                inning = r.get("inning")
+                rows.append(
+                    (
+                        team_id,
+                        _resolve_player_id(conn, team_id, first, last, jersey),
+                        _clean_str(r.get("timestamp")) or None,
+                        _clean_date(r.get("game_date")),
+                        _clean_str(r.get("opponent")),
+                        None if pd.isna(inning) else _clean_int(inning),
+                        _clean_str(r.get("half")) or None,
+                        first,
+                        last,
+                        jersey,
+                        _clean_str(r.get("outcome")),
+                        _clean_int(r.get("rbis")),
+                    )
+                )
+            conn.executemany(
+                """
+                INSERT INTO plate_appearances(
+                    team_id, player_id, timestamp, game_date, opponent, inning, half,
+                    first_name, last_name, jersey_number, outcome, rbis
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+
+        if LEGACY_SEASON_HISTORY_PATH.exists():
+            hist_df = pd.read_csv(LEGACY_SEASON_HISTORY_PATH)
+            conn.executemany(
+                """
+                INSERT INTO games(team_id, game_date, opponent, ltp_runs, opp_runs, result, ltp_role)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        team_id,
+                        _clean_date(r.get("date")),
+                        _clean_str(r.get("opponent")),
+                        _clean_int(r.get("ltp_runs")),
+                        _clean_int(r.get("opp_runs")),
+                        _clean_str(r.get("result")) or None,
+                        _clean_str(r.get("ltp_role")) or None,
+                    )
+                    for _, r in hist_df.iterrows()
+                ],
+            )
+
+        conn.execute(_ATTACH_LEGACY_PAS)
+        conn.execute(
+            "INSERT INTO meta(key, value) VALUES ('legacy_csv_import', ?)",
+            (f"team {team_id} at {datetime.now().isoformat(timespec='seconds')}",),
+        )
+
+    conn.close()
+    return True
+
+
+def legacy_import_team():
+    """team_id the legacy CSV files were imported into, or None if not yet."""
+    conn = get_conn()
+    row = conn.execute(
+        "SELECT value FROM meta WHERE key = 'legacy_csv_import'"
+    ).fetchone()
+    conn.close()
+    # Recorded as "team <id> at <timestamp>"
+    return None if row is None else int(row["value"].split()[1])
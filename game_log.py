@@ -0,0 +1,63 @@
+"""
+Export a team's plate-appearance log as CSV, in the single-team app's
+gameday_log.csv layout.
+
+    python game_log.py --team "Connor Team"        # data/teams/<id>/gameday_log.csv
+    python game_log.py --team 1 --out ltp_log.csv
+
+The database is the only store the app writes; this is an on-demand copy for
+spreadsheets and backups, not something kept in step on every PA.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import db
+import storage
+
+# Column order of the exported log (the old gameday_log.csv header)
+LOG_COLUMNS = [
+    "timestamp",
+    "first_name",
+    "last_name",
+    "jersey_number",
+    "outcome",
+    "rbis",
+    "game_date",
+    "opponent",
+    "inning",
+    "half",
+    "outs_before",
+    "bases_before",
+    "outs_after",
+    "bases_after",
+    "runs_scored",
+]
+
+
+def export(team_id: int, path=None) -> Path:
+    """Write the team's whole PA log to path (default: its data directory)."""
+    path = Path(path) if path else storage.team_file(team_id, storage.GAME_LOG)
+    log_df = db.fetch_plate_appearances(team_id)
+    storage.write_csv(log_df.reindex(columns=LOG_COLUMNS), path, index=False)
+    return path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--team", required=True, help="team name or team_id to export")
+    parser.add_argument("--out", type=Path, help="CSV file to write")
+    args = parser.parse_args(argv)
+
+    db.init_db()
+    team_id = db.find_team(args.team)
+    if team_id is None:
+        parser.error(f"no team {args.team!r}")
+
+    path = export(team_id, args.out)
+    print(f"Wrote team {team_id}'s plate appearances to {path}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
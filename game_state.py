@@ -0,0 +1,288 @@
+import json
+from collections import deque
+from dataclasses import dataclass, field
+
+import db
+
+# Save a full state snapshot after this many journal entries, so resuming
+# replays at most this many actions however long the game runs.
+SNAPSHOT_EVERY = 25
+
+# Most plays that can be undone; older history is dropped.
+UNDO_LIMIT = 20
+
+BASES = ("1B", "2B", "3B")
+EMPTY_BASES = (None, None, None)
+
+
+# ---------- State ----------
+def empty_bases():
+    return dict.fromkeys(BASES)
+
+
+@dataclass(slots=True)
+class GameState:
+    """
+    One live game. Every field except game_stats and history holds an
+    immutable value (ints, strings, tuples), so an undo entry only needs
+    references to the values a play replaced.
+
+    bases is (1B, 2B, 3B) runner player_ids or None; ltp_scores and
+    opp_scores are runs per inning, index 0 = 1st.
+    """
+
+    game_active: bool = False
+    game_date: str = ""
+    opponent: str = ""
+    ltp_role: str = "Away"          # Home or Away
+    inning: int = 1
+    half: str = "Top"               # Top / Bottom
+    offense: str = "LTP"            # LTP or Opponent
+    outs: int = 0
+    bases: tuple = EMPTY_BASES
+    ltp_scores: tuple = ()
+    opp_scores: tuple = ()
+    current_ltp_runs: int = 0
+    current_opp_runs: int = 0
+    lineup: tuple = ()              # player_ids in batting order
+    batter_index: int = 0
+    last_play: str = ""
+    game_stats: dict = field(default_factory=dict)   # per-game hitting for 2025 CSV
+    history: deque = field(default_factory=lambda: deque(maxlen=UNDO_LIMIT))
+    live_game_id: int = None
+
+    @property
+    def runners(self) -> dict:
+        """Bases as a {"1B": player_id or None, ...} dict."""
+        return dict(zip(BASES, self.bases))
+
+    @property
+    def base_state(self) -> int:
+        """Occupied bases as a bitmask (1 = 1B, 2 = 2B, 4 = 3B)."""
+        return sum(1 << i for i, runner in enumerate(self.bases) if runner is not None)
+
+    def line_score(self, innings: int):
+        """(LTP, opponent) runs per inning for innings 1..innings, live half included."""
+        ltp = [_runs_in(self.ltp_scores, inn) for inn in range(1, innings + 1)]
+        opp = [_runs_in(self.opp_scores, inn) for inn in range(1, innings + 1)]
+        if 1 <= self.inning <= innings:
+            if self.offense == "LTP":
+                ltp[self.inning - 1] += self.current_ltp_runs
+            else:
+                opp[self.inning - 1] += self.current_opp_runs
+        return ltp, opp
+
+    def totals(self):
+        """(LTP, opponent) runs so far, including the half in progress."""
+        return (
+            sum(self.ltp_scores) + self.current_ltp_runs,
+            sum(self.opp_scores) + self.current_opp_runs,
+        )
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self.history)
+
+    @property
+    def last_pa(self):
+        """Undo record of the PA the next undo would take back, if any."""
+        return self.history[-1][1] if self.history else None
+
+
+# Fields a play can change; undo entries hold the old values of these only
+_TRACKED = (
+    "inning",
+    "half",
+    "offense",
+    "outs",
+    "bases",
+    "ltp_scores",
+    "opp_scores",
+    "current_ltp_runs",
+    "current_opp_runs",
+    "lineup",
+    "batter_index",
+    "last_play",
+)
+_TUPLE_FIELDS = ("bases", "ltp_scores", "opp_scores", "lineup")
+
+
+def _runs_in(scores: tuple, inning: int) -> int:
+    return scores[inning - 1] if 0 < inning <= len(scores) else 0
+
+
+def _add_runs(scores: tuple, inning: int, runs: int) -> tuple:
+    scores = scores + (0,) * (inning - len(scores))
+    return scores[: inning - 1] + (scores[inning - 1] + runs,) + scores[inning:]
+
+
+def record_game_stat(state: GameState, player_id: int, delta: dict, sign: int = 1) -> None:
+    """Per-game counting stats keyed by player_id, merged into the 2025 CSV at End Game."""
+    game_stats = state.game_stats
+    if player_id not in game_stats:
+        if sign < 0:
+            return
+        game_stats[player_id] = {col: 0 for col in ("PA", "1B", "2B", "3B", "HR", "BB", "K")}
+
+    s = game_stats[player_id]
+    for col in s:
+        s[col] += sign * delta[col]
+
+    if s["PA"] <= 0:
+        del game_stats[player_id]
+
+
+# ---------- Reducer ----------
+def _play(state: GameState, pa, change) -> None:
+    """Run change(state) and remember what it replaced for undo."""
+    before = tuple(getattr(state, f) for f in _TRACKED)
+    change(state)
+    delta = {
+        f: old for f, old in zip(_TRACKED, before) if getattr(state, f) != old
+    }
+    state.history.append((delta, pa))
+
+
+def _pa(state: GameState, payload: dict) -> None:
+    state.outs = min(state.outs + payload["outs_added"], 3)
+    state.current_ltp_runs += payload["runs_scored"]
+    state.bases = tuple(payload["bases"].get(b) for b in BASES)
+    state.last_play = payload["last_play"]
+    state.batter_index = (state.batter_index + 1) % len(state.lineup)
+
+    # End of half?
+    if state.outs >= 3:
+        state.ltp_scores = _add_runs(state.ltp_scores, state.inning, state.current_ltp_runs)
+        state.current_ltp_runs = 0
+        state.outs = 0
+        state.bases = EMPTY_BASES
+        state.offense = "Opponent"
+        state.half = "Bottom" if state.half == "Top" else "Top"
+        state.last_play += " (End of half-inning.)"
+
+
+def _opp_half(state: GameState, payload: dict) -> None:
+    runs = payload["runs"]
+    state.opp_scores = _add_runs(state.opp_scores, state.inning, runs)
+    state.current_opp_runs = 0
+    state.outs = 0
+    state.inning += 1
+    state.half = "Top"
+    state.offense = "LTP"
+    state.bases = EMPTY_BASES
+    state.last_play = f"{state.opponent} scored {runs} run(s) in the half."
+
+
+def apply_event(state: GameState, action: str, payload: dict) -> None:
+    """
+    Apply one journaled action to the game state in place. This is the only
+    code that changes live-game state, so replaying the journal rebuilds
+    exactly what the captain saw.
+    """
+    if action == "start":
+        live_game_id = state.live_game_id
+        fresh = GameState(
+            game_active=True,
+            game_date=payload["game_date"],
+            opponent=payload["opponent"],
+            ltp_role=payload["ltp_role"],
+            lineup=tuple(payload["lineup"]),
+            # Home team takes the field first
+            offense="LTP" if payload["ltp_role"] == "Away" else "Opponent",
+            live_game_id=live_game_id,
+        )
+        for f in GameState.__slots__:
+            setattr(state, f, getattr(fresh, f))
+
+    elif action == "pa":
+        pa = payload["pa"]
+        _play(state, pa, lambda s: _pa(s, payload))
+        record_game_stat(state, pa["event"]["player_id"], pa["delta"])
+
+    elif action == "opp_half":
+        _play(state, None, lambda s: _opp_half(s, payload))
+
+    elif action == "undo":
+        # Past the undo limit there is nothing left to take back
+        if not state.history:
+            return
+        delta, pa = state.history.pop()
+        if pa is not None:
+            record_game_stat(state, pa["event"]["player_id"], pa["delta"], sign=-1)
+        for f, old in delta.items():
+            setattr(state, f, old)
+
+    else:
+        raise ValueError(f"Unknown game action: {action}")
+
+
+# ---------- Journal ----------
+def _int_keys(d: dict) -> dict:
+    return {int(k): v for k, v in d.items()}
+
+
+def _from_json(name: str, value):
+    return tuple(value) if name in _TUPLE_FIELDS else value
+
+
+def encode_state(state: GameState) -> str:
+    data = {f: getattr(state, f) for f in GameState.__slots__ if f != "history"}
+    data["history"] = list(state.history)
+    return json.dumps(data)
+
+
+def decode_state(text: str) -> GameState:
+    """JSON turns tuples into lists and int dict keys into strings; put them back."""
+    data = json.loads(text)
+    history = data.pop("history")
+    state = GameState(**{f: _from_json(f, v) for f, v in data.items()})
+    state.game_stats = _int_keys(state.game_stats)
+    state.history.extend(
+        ({f: _from_json(f, v) for f, v in delta.items()}, pa) for delta, pa in history
+    )
+    return state
+
+
+def dispatch(state: GameState, action: str, payload: dict = None, seq: int = None) -> None:
+    """
+    Journal an action durably, then apply it to the state. Pass seq when the
+    entry is already journaled, in the same transaction as the rows it
+    records (team_data.append_game_log and undo_game_log).
+    """
+    payload = payload or {}
+    if seq is None:
+        seq = db.append_live_event(state.live_game_id, action, json.dumps(payload))
+    apply_event(state, action, payload)
+    if seq % SNAPSHOT_EVERY == 0:
+        db.save_live_snapshot(state.live_game_id, seq, encode_state(state))
+
+
+def start(state: GameState, team_id: int, payload: dict) -> None:
+    """Open a new journal for the team and record the start of the game."""
+    state.live_game_id = db.create_live_game(team_id)
+    dispatch(state, "start", payload)
+
+
+def resume(team_id: int):
+    """
+    Rebuild the team's unfinished game from its latest snapshot plus the
+    journal entries after it. Returns a GameState, or None when no game is
+    in progress.
+    """
+    found = db.fetch_active_live_game(team_id)
+    if found is None:
+        return None
+
+    live_game_id, _, snapshot, events = found
+    state = decode_state(snapshot) if snapshot else GameState()
+    state.live_game_id = live_game_id
+    for row in events:
+        apply_event(state, row["action"], json.loads(row["payload"]))
+    return state
+
+
+def finish(state: GameState, status: str = "ended") -> None:
+    """Close the journal when the game is saved ("ended") or thrown away ("discarded")."""
+    if state.live_game_id is not None:
+        db.finish_live_game(state.live_game_id, status)
+    state.live_game_id = None
@@ -0,0 +1,42 @@
+"""
+Import the single-team app's CSV files into the team they belong to.
+
+    python import_legacy.py --team "Connor Team"      # or --team 1
+
+players.csv, gameday_log.csv and season_history.csv are copied into that
+team's roster, plate appearances and games, once per database, and the
+imported games get their box scores; running it again changes nothing.
+The team must already exist (seed_users.py).
+"""
+import argparse
+import sys
+
+import db
+import team_data
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--team", required=True, help="team name or team_id to import into")
+    args = parser.parse_args(argv)
+
+    db.init_db()
+    done = db.legacy_import_team()
+    if done is not None:
+        print(f"Legacy CSVs were already imported into team {done}; nothing to do.")
+        return 0
+
+    team_id = db.find_team(args.team)
+    if team_id is None:
+        parser.error(f"no team {args.team!r}; create it first with seed_users.py")
+
+    db.import_legacy_csvs(team_id)
+    games = db.fetch_games(team_id)
+    for game in games.itertuples(index=False):
+        team_data.build_box_score(team_id, game.game_id)
+    print(f"Imported the legacy CSVs into team {team_id} ({len(games)} games).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
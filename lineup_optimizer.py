@@ -0,0 +1,232 @@
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+
+import numpy as np
+
+from simulator import INNINGS, N_BASE_STATES, NEXT_BASES, OUTS, RUNS
+
+# ---------- Markov run model ----------
+# Half-inning state = outs * 8 + bases (24 live states) plus one absorbing
+# "3 outs" state at index 24.
+N_STATES = 3 * N_BASE_STATES
+END_STATE = N_STATES
+
+# Stop following an inning once this little probability mass is still live
+_MASS_EPSILON = 1e-7
+_MAX_PA_PER_INNING = 40
+
+
+def _build_state_tables():
+    n_outcomes = NEXT_BASES.shape[1]
+    move = np.zeros((n_outcomes, N_STATES, N_STATES + 1))
+    runs = np.zeros((n_outcomes, N_STATES))
+    for o in range(n_outcomes):
+        for outs in range(3):
+            for bases in range(N_BASE_STATES):
+                s = outs * N_BASE_STATES + bases
+                new_outs = outs + OUTS[o]
+                t = END_STATE if new_outs >= 3 else new_outs * N_BASE_STATES + NEXT_BASES[bases, o]
+                move[o, s, t] = 1.0
+                runs[o, s] = RUNS[bases, o]
+    return move, runs
+
+
+# MOVE[outcome, state, next_state], STATE_RUNS[outcome, state]
+MOVE, STATE_RUNS = _build_state_tables()
+
+
+def player_tables(probs: np.ndarray):
+    """
+    Per-hitter state transition matrices (n, 24, 25) and expected runs per
+    PA from each state (n, 24). These depend only on the hitter, so a search
+    builds them once and reorders rows for every candidate.
+    """
+    probs = np.asarray(probs, dtype=float)
+    return np.einsum("no,ost->nst", probs, MOVE), probs @ STATE_RUNS
+
+
+def _inning_tables(move: np.ndarray, runs: np.ndarray):
+    """
+    For each possible leadoff spot i: expected runs in the inning and the
+    probability that spot j leads off the next one.
+
+    Within an inning the k-th batter is always (i + k) % n, so every leadoff
+    is stepped in one batch over the 24 base-out states.
+    """
+    n = len(move)
+    leads = np.arange(n)
+    mass = np.zeros((n, N_STATES))
+    mass[:, 0] = 1.0
+    exp_runs = np.zeros(n)
+    next_lead = np.zeros((n, n))
+
+    for k in range(_MAX_PA_PER_INNING):
+        batter = (leads + k) % n
+        exp_runs += (mass * runs[batter]).sum(axis=1)
+        stepped = np.matmul(mass[:, None, :], move[batter])[:, 0]
+        next_lead[leads, (batter + 1) % n] += stepped[:, END_STATE]
+        mass = stepped[:, :N_STATES]
+        if mass.sum() < _MASS_EPSILON:
+            break
+
+    return exp_runs, next_lead
+
+
+def _expected_runs(move: np.ndarray, runs: np.ndarray, innings: int) -> float:
+    exp_runs, next_lead = _inning_tables(move, runs)
+    lead = np.zeros(len(move))
+    lead[0] = 1.0
+    total = 0.0
+    for _ in range(innings):
+        total += lead @ exp_runs
+        lead = lead @ next_lead
+    return float(total)
+
+
+def expected_runs(lineup_probs, innings: int = INNINGS) -> float:
+    """Expected runs per game for a batting order (rows in order)."""
+    return _expected_runs(*player_tables(lineup_probs), innings)
+
+
+# ---------- Search ----------
+# One pool for the life of the process, shared by every session's searches.
+# Spawned, not forked: a fork would copy the app's open sqlite connections
+# and pay the process start-up on every click.
+POOL_SIZE = os.cpu_count() or 1
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=POOL_SIZE, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _neighbour(order: tuple, rng) -> tuple:
+    """Swap two spots, or pull one hitter out and reinsert them elsewhere."""
+    order = list(order)
+    i, j = rng.choice(len(order), 2, replace=False)
+    if rng.random() < 0.5:
+        order[i], order[j] = order[j], order[i]
+    else:
+        order.insert(j, order.pop(i))
+    return tuple(order)
+
+
+def _anneal(lineup_probs, start: tuple, seed: int, time_budget: float, top_n: int, innings: int):
+    """
+    One simulated-annealing walk over batting orders. Scores are memoized,
+    so revisited orders cost nothing; returns the top_n (runs, order) seen.
+    """
+    rng = np.random.default_rng(seed)
+    deadline = time.perf_counter() + time_budget
+    move, runs = player_tables(lineup_probs)
+    scores = {}
+
+    def score(order):
+        if order not in scores:
+            idx = list(order)
+            scores[order] = _expected_runs(move[idx], runs[idx], innings)
+        return scores[order]
+
+    current = start
+    current_score = score(current)
+    t_start, t_end = 0.05, 0.001
+    started = time.perf_counter()
+
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        frac = (now - started) / time_budget
+        temp = t_start * (t_end / t_start) ** frac
+
+        candidate = _neighbour(current, rng)
+        cand_score = score(candidate)
+        delta = cand_score - current_score
+        if delta >= 0 or rng.random() < math.exp(delta / temp):
+            current, current_score = candidate, cand_score
+
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:top_n]
+    return [(runs, order) for order, runs in ranked]
+
+
+def _starting_orders(lineup_probs: np.ndarray, n_starts: int, rng) -> list:
+    """The given order, on-base and power sorts, then random shuffles."""
+    n = len(lineup_probs)
+    on_base = lineup_probs[:, :5].sum(axis=1)
+    power = lineup_probs[:, 1] * 2 + lineup_probs[:, 2] * 3 + lineup_probs[:, 3] * 4
+    starts = [
+        tuple(range(n)),
+        tuple(np.argsort(-on_base, kind="stable").tolist()),
+        tuple(np.argsort(-(on_base + power), kind="stable").tolist()),
+    ]
+    while len(starts) < n_starts:
+        starts.append(tuple(rng.permutation(n).tolist()))
+    return starts[:n_starts]
+
+
+def optimize_lineup(
+    lineup_probs,
+    time_budget: float = 5.0,
+    workers: int = None,
+    top_n: int = 5,
+    seed=None,
+    innings: int = INNINGS,
+) -> list:
+    """
+    Search batting orders for the best expected runs within time_budget
+    seconds. Independent annealing walks from heuristic and random starts
+    run in the shared process pool (one per core by default, at most
+    POOL_SIZE) and their best orders are merged. Returns
+    [(expected_runs, order)] best first, where order is a tuple of row
+    indices into lineup_probs.
+    """
+    lineup_probs = np.asarray(lineup_probs, dtype=float)
+    n = len(lineup_probs)
+    if n <= 1:
+        return [(expected_runs(lineup_probs, innings), tuple(range(n)))]
+
+    # Small enough to just score every order
+    if math.factorial(n) <= 720:
+        move, runs = player_tables(lineup_probs)
+        scored = [
+            (_expected_runs(move[list(p)], runs[list(p)], innings), p)
+            for p in permutations(range(n))
+        ]
+        return sorted(scored, key=lambda s: s[0], reverse=True)[:top_n]
+
+    workers = min(workers or POOL_SIZE, POOL_SIZE)
+    rng = np.random.default_rng(seed)
+    starts = _starting_orders(lineup_probs, workers, rng)
+    seeds = rng.integers(0, 2**32, size=workers).tolist()
+    # Leave headroom for the pool's start-up (first search only) and the
+    # hand-off of each walk
+    walk_budget = max(0.1, time_budget * 0.9 - 0.2)
+
+    if workers == 1:
+        results = [_anneal(lineup_probs, starts[0], seeds[0], walk_budget, top_n, innings)]
+    else:
+        pool = _get_pool()
+        futures = [
+            pool.submit(_anneal, lineup_probs, start, s, walk_budget, top_n, innings)
+            for start, s in zip(starts, seeds)
+        ]
+        results = [f.result() for f in futures]
+
+    merged = {}
+    for walk in results:
+        for runs, order in walk:
+            merged[order] = runs
+    ranked = sorted(merged.items(), key=lambda kv: kv[1], reverse=True)[:top_n]
+    return [(runs, order) for order, runs in ranked]
@@ -0,0 +1,256 @@
+"""
+Lightweight timing spans for the data paths, off unless LTP_METRICS=1.
+
+Wrap a function with @metrics.timed or a block with metrics.span("name").
+Pages name themselves once, through auth.require_login(page), and every span
+is recorded against the page and team of the script run it ran in. Each run,
+fragment-only runs and runs cut short by st.rerun()/st.stop() included, is
+also recorded whole as the "rerun" span.
+Latencies go into in-memory histograms, labelled by page and span only so
+hundreds of teams don't explode the series count. The most recent spans,
+with their team, are kept for the admin panel on Home.
+
+Set LTP_METRICS_FILE to also have the histograms written there in
+Prometheus text format every EXPORT_EVERY seconds. When metrics are off,
+@timed returns the function unchanged and span() is a shared no-op.
+"""
+import bisect
+import contextlib
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import pandas as pd
+
+ENABLED = os.environ.get("LTP_METRICS", "") not in ("", "0")
+EXPORT_PATH = os.environ.get("LTP_METRICS_FILE")
+EXPORT_EVERY = 10.0
+
+# Histogram bucket upper bounds in seconds (Prometheus "le"); +Inf is implied
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECENT_SPANS = 500
+# Sessions whose page label is kept for their fragment-only runs
+MAX_SESSIONS = 10_000
+
+_context = threading.local()
+_lock = threading.Lock()
+_histograms = {}   # (page, span) -> [bucket counts..., +Inf count], total seconds
+_recent = deque(maxlen=RECENT_SPANS)   # (unix time, page, team_id, span, seconds)
+_last_export = 0.0
+_NO_SPAN = contextlib.nullcontext()
+_session_labels = OrderedDict()   # session_id -> (page, team_id)
+_hook_installed = False
+
+
+# ---------- Recording ----------
+def label_rerun(page: str, team_id=None) -> None:
+    """
+    Label this script run's spans with the page and team. The label carries
+    over to the session's fragment-only runs, which don't execute the page.
+    """
+    if not ENABLED:
+        return
+    _install_rerun_hook()
+    _context.page = page
+    _context.team_id = team_id
+
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is not None:
+        with _lock:
+            _session_labels[ctx.session_id] = (page, team_id)
+            _session_labels.move_to_end(ctx.session_id)
+            if len(_session_labels) > MAX_SESSIONS:
+                _session_labels.popitem(last=False)
+
+
+def _install_rerun_hook() -> None:
+    """
+    Time every script run as the "rerun" span. Streamlit has no public
+    script-end hook, so this wraps the function its script runner calls once
+    per run (whole page or fragment) and that swallows st.rerun()/st.stop().
+    If a Streamlit upgrade moves it, spans are still recorded, just no
+    "rerun" span.
+    """
+    global _hook_installed
+    with _lock:
+        if _hook_installed:
+            return
+        _hook_installed = True
+
+    try:
+        from streamlit.runtime.scriptrunner import script_runner
+        run = script_runner.exec_func_with_error_handling
+    except (ImportError, AttributeError):
+        return
+
+    @functools.wraps(run)
+    def timed_run(func, ctx, *args, **kwargs):
+        with _lock:
+            _context.page, _context.team_id = _session_labels.get(ctx.session_id, ("", None))
+        start = time.perf_counter()
+        try:
+            return run(func, ctx, *args, **kwargs)
+        finally:
+            record("rerun", time.perf_counter() - start)
+
+    script_runner.exec_func_with_error_handling = timed_run
+
+
+def record(name: str, seconds: float) -> None:
+    page = getattr(_context, "page", "")
+    team_id = getattr(_context, "team_id", None)
+    with _lock:
+        entry = _histograms.get((page, name))
+        if entry is None:
+            entry = _histograms[(page, name)] = [[0] * (len(BUCKETS) + 1), 0.0]
+        entry[0][bisect.bisect_left(BUCKETS, seconds)] += 1
+        entry[1] += seconds
+        _recent.append((time.time(), page, team_id, name, seconds))
+    if EXPORT_PATH:
+        _maybe_export()
+
+
+@contextlib.contextmanager
+def _span(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def span(name: str):
+    """Context manager timing the block as `name`."""
+    return _span(name) if ENABLED else _NO_SPAN
+
+
+def timed(fn):
+    """Decorator timing every call as module.function (just function on pages)."""
+    if not ENABLED:
+        return fn
+    name = fn.__qualname__
+    if fn.__module__ != "__main__":
+        name = f"{fn.__module__}.{name}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record(name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        _recent.clear()
+
+
+# ---------- Export ----------
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text() -> str:
+    """All histograms in the Prometheus text exposition format."""
+    with _lock:
+        snapshot = {key: (list(counts), total) for key, (counts, total) in _histograms.items()}
+
+    lines = [
+        "# HELP ltp_span_seconds Time spent in instrumented data functions.",
+        "# TYPE ltp_span_seconds histogram",
+    ]
+    for (page, name), (counts, total) in sorted(snapshot.items()):
+        labels = f'page="{_label(page)}",span="{_label(name)}"'
+        cumulative = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'ltp_span_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"ltp_span_seconds_sum{{{labels}}} {total:.6f}")
+        lines.append(f"ltp_span_seconds_count{{{labels}}} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path) -> None:
+    """Write prometheus_text() beside path and swap it in."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+
+
+def _maybe_export() -> None:
+    global _last_export
+    now = time.monotonic()
+    with _lock:
+        if now - _last_export < EXPORT_EVERY:
+            return
+        _last_export = now
+    write_prometheus(EXPORT_PATH)
+
+
+# ---------- Admin view ----------
+def _quantile(counts: list, q: float) -> float:
+    """Upper bound (seconds) of the bucket holding the q-th quantile."""
+    target = q * sum(counts)
+    cumulative = 0
+    for bound, count in zip(BUCKETS + (float("inf"),), counts):
+        cumulative += count
+        if cumulative >= target:
+            return bound
+    return float("inf")
+
+
+def summary():
+    """One row per (page, span) with call count, mean and bucketed p50/p95 in ms."""
+    with _lock:
+        snapshot = {key: (list(counts), total) for key, (counts, total) in _histograms.items()}
+    rows = [
+        {
+            "page": page,
+            "span": name,
+            "calls": sum(counts),
+            "mean_ms": 1000 * total / max(sum(counts), 1),
+            "p50_ms <=": 1000 * _quantile(counts, 0.50),
+            "p95_ms <=": 1000 * _quantile(counts, 0.95),
+            "total_s": total,
+        }
+        for (page, name), (counts, total) in snapshot.items()
+    ]
+    df = pd.DataFrame(rows, columns=["page", "span", "calls", "mean_ms", "p50_ms <=", "p95_ms <=", "total_s"])
+    return df.sort_values("total_s", ascending=False).reset_index(drop=True)
+
+
+def recent():
+    with _lock:
+        rows = list(_recent)
+    df = pd.DataFrame(rows, columns=["time", "page", "team_id", "span", "seconds"])
+    df["time"] = pd.to_datetime(df["time"], unit="s")
+    df["ms"] = df.pop("seconds") * 1000
+    return df.iloc[::-1].reset_index(drop=True)
+
+
+def render_admin_panel() -> None:
+    """Span tables for admins; draws nothing for anyone else or when metrics are off."""
+    import streamlit as st
+
+    user = st.session_state.get("user") or {}
+    if not ENABLED or user.get("role") != "admin":
+        return
+
+    with st.expander("Timing metrics (admin)"):
+        st.dataframe(summary(), hide_index=True)
+        st.caption(f"Most recent {RECENT_SPANS} spans")
+        st.dataframe(recent(), hide_index=True)
+        st.download_button("Download Prometheus metrics", prometheus_text(), "ltp_metrics.prom")
+        if st.button("Reset metrics"):
+            reset()
+            st.rerun()
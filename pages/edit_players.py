@@ -1,27 +1,17 @@
 import streamlit as st
 import pandas as pd
-from pathlib import Path
 import auth
-auth.require_login()
+import db
+import metrics
+auth.require_login("Players")
 
-
-# Single source of truth for roster
-DATA_PATH = Path("players.csv")
+TEAM_ID = auth.current_team_id()
 
 
+@metrics.timed
 def load_players() -> pd.DataFrame:
-    """Load players from CSV, or create an empty one if it doesn't exist."""
-    if DATA_PATH.exists():
-        df = pd.read_csv(DATA_PATH)
-    else:
-        df = pd.DataFrame(
-            columns=["first_name", "last_name", "jersey_number", "email"]
-        )
-
-    # Ensure expected columns
-    for col in ["first_name", "last_name", "jersey_number", "email"]:
-        if col not in df.columns:
-            df[col] = ""
+    """Load the team's active roster from the database."""
+    df = db.fetch_players(TEAM_ID)
 
     # Basic cleanup
     df["first_name"] = df["first_name"].astype(str).str.strip()
@@ -34,10 +24,6 @@ def load_players() -> pd.DataFrame:
     return df
 
 
-def save_players(df: pd.DataFrame) -> None:
-    df.to_csv(DATA_PATH, index=False)
-
-
 st.set_page_config(
     page_title="Manage Players",
     page_icon="",
@@ -80,27 +66,17 @@ if not players_df.empty:
         + ")"
     )
 
+    names = players_df.set_index("player_id")["display_name"].to_dict()
     to_remove = st.selectbox(
         "Select a player to remove",
-        options=["-- None --"] + players_df["display_name"].tolist(),
+        options=[None] + list(names),
+        format_func=lambda pid: "-- None --" if pid is None else names[pid],
     )
 
-    if to_remove != "-- None --":
+    if to_remove is not None:
         if st.button("Remove Selected Player"):
-            first, rest = to_remove.split(" ", 1)
-            last = rest.split(" (#")[0]
-            jersey = int(
-                rest.split(" (#")[-1].rstrip(")")
-            )  # extract jersey number
-
-            mask = ~(
-                (players_df["first_name"] == first)
-                & (players_df["last_name"] == last)
-                & (players_df["jersey_number"] == jersey)
-            )
-            updated = players_df[mask].drop(columns=["display_name"])
-            save_players(updated)
-            st.success(f"Removed {to_remove} from roster.")
+            db.deactivate_player(TEAM_ID, int(to_remove))
+            st.success(f"Removed {names[to_remove]} from roster.")
             st.rerun()
 
 st.markdown("---")
@@ -122,15 +98,16 @@ else:
         + ")"
     )
 
+    by_id = players_df.set_index("player_id")
     player_to_edit = st.selectbox(
         "Select a player to edit",
-        options=players_df["display_name"].tolist(),
+        options=by_id.index.tolist(),
+        format_func=lambda pid: by_id.at[pid, "display_name"],
         key="edit_select",
     )
 
-    # Get the row + index for the selected player
-    row = players_df.loc[players_df["display_name"] == player_to_edit].iloc[0]
-    idx = row.name  # index in the DataFrame
+    # Get the row for the selected player
+    row = by_id.loc[player_to_edit]
 
     # Pre-filled inputs
     new_first = st.text_input("First name", value=row["first_name"], key="edit_first")
@@ -146,16 +123,16 @@ else:
     new_email = st.text_input("Email", value=str(row["email"]), key="edit_email")
 
     if st.button("Save changes", key="edit_save"):
-        players_df.at[idx, "first_name"] = new_first.strip()
-        players_df.at[idx, "last_name"] = new_last.strip()
-        players_df.at[idx, "jersey_number"] = int(new_jersey)
-        players_df.at[idx, "email"] = new_email.strip()
-
-        # Drop helper col before saving
-        to_save = players_df.drop(columns=["display_name"], errors="ignore")
-        save_players(to_save)
+        db.update_player(
+            TEAM_ID,
+            int(player_to_edit),
+            new_first.strip(),
+            new_last.strip(),
+            int(new_jersey),
+            new_email.strip(),
+        )
 
-        st.success(f"Updated {player_to_edit}.")
+        st.success(f"Updated {row['display_name']}.")
         st.rerun()
 
 
@@ -176,22 +153,15 @@ with st.form("add_player_form"):
         if not first_name or not last_name:
             st.error("First and last name are required.")
         else:
-            new_player = {
-                "first_name": first_name.strip(),
-                "last_name": last_name.strip(),
-                "jersey_number": int(jersey_number),
-                "email": email.strip(),
-            }
-
-            updated_df = pd.concat(
-                [players_df.drop(columns=["display_name"], errors="ignore"),
-                 pd.DataFrame([new_player])],
-                ignore_index=True,
+            db.add_player(
+                TEAM_ID,
+                first_name.strip(),
+                last_name.strip(),
+                int(jersey_number),
+                email.strip(),
             )
-            save_players(updated_df)
 
             st.success(
                 f"Added {first_name} {last_name} (#{int(jersey_number)}) to the roster."
             )
             st.rerun()
-
@@ -1,280 +1,35 @@
 import streamlit as st
 import pandas as pd
-from pathlib import Path
 from datetime import datetime, date
+import assets
 import auth
-auth.require_login()
+import cache
+import db
+import game_state
+import lineup_optimizer
+import run_expectancy
+import simulator
+import team_data
+import win_expectancy
+auth.require_login("Gameday")
 
-
-# ---------- File paths ----------
-ROSTER_PATH = Path("players.csv")
-GAME_LOG_PATH = Path("gameday_log.csv")
-PLAYER_STATS_PATH = Path("player_stats.csv")
-SEASON_HISTORY_PATH = Path("season_history.csv")
-STATS_2025_PATH = Path("ltp_2025 1(in).csv")   # historical file used by Odds Maker
-
-
-# ---------- Helper functions ----------
-def load_roster() -> pd.DataFrame:
-    if ROSTER_PATH.exists():
-        df = pd.read_csv(ROSTER_PATH)
-    else:
-        df = pd.DataFrame(
-            columns=["first_name", "last_name", "jersey_number", "email"]
-        )
-
-    for col in ["first_name", "last_name", "jersey_number", "email"]:
-        if col not in df.columns:
-            df[col] = ""
-
-    df["first_name"] = df["first_name"].astype(str).str.strip()
-    df["last_name"] = df["last_name"].astype(str).str.strip()
-    df["jersey_number"] = (
-        pd.to_numeric(df["jersey_number"], errors="coerce").fillna(0).astype(int)
-    )
-
-    df["display_name"] = (
-        df["first_name"]
-        + " "
-        + df["last_name"]
-        + " (#"
-        + df["jersey_number"].astype(str)
-        + ")"
-    )
-    return df
-
-
-def empty_stats_df() -> pd.DataFrame:
-    return pd.DataFrame(
-        columns=[
-            "first_name",
-            "last_name",
-            "jersey_number",
-            "PA",
-            "AB",
-            "H",
-            "1B",
-            "2B",
-            "3B",
-            "HR",
-            "BB",
-            "K",
-            "RBI",
-            "AVG",
-            "OBP",
-            "SLG",
-        ]
-    )
-
-
-def load_player_stats() -> pd.DataFrame:
-    if PLAYER_STATS_PATH.exists():
-        df = pd.read_csv(PLAYER_STATS_PATH)
-    else:
-        df = empty_stats_df()
-    return df
-
-
-def save_player_stats(df: pd.DataFrame) -> None:
-    df.to_csv(PLAYER_STATS_PATH, index=False)
-
-
-def append_game_log(event: dict) -> None:
-    if GAME_LOG_PATH.exists():
-        log_df = pd.read_csv(GAME_LOG_PATH)
-    else:
-        log_df = pd.DataFrame(columns=event.keys())
-    log_df = pd.concat([log_df, pd.DataFrame([event])], ignore_index=True)
-    log_df.to_csv(GAME_LOG_PATH, index=False)
-
-
-def update_player_stats(
-    stats_df: pd.DataFrame,
-    first: str,
-    last: str,
-    jersey: int,
-    outcome: str,
-    rbis: int,
-) -> pd.DataFrame:
-    """Update counting stats for a single PA and recompute AVG/OBP/SLG."""
-    mask = (
-        (stats_df["first_name"] == first)
-        & (stats_df["last_name"] == last)
-        & (stats_df["jersey_number"] == jersey)
-    )
-
-    if not mask.any():
-        new_row = {
-            "first_name": first,
-            "last_name": last,
-            "jersey_number": jersey,
-            "PA": 0,
-            "AB": 0,
-            "H": 0,
-            "1B": 0,
-            "2B": 0,
-            "3B": 0,
-            "HR": 0,
-            "BB": 0,
-            "K": 0,
-            "RBI": 0,
-            "AVG": 0.0,
-            "OBP": 0.0,
-            "SLG": 0.0,
-        }
-        stats_df = pd.concat(
-            [stats_df, pd.DataFrame([new_row])], ignore_index=True
-        )
-        mask = (
-            (stats_df["first_name"] == first)
-            & (stats_df["last_name"] == last)
-            & (stats_df["jersey_number"] == jersey)
-        )
-
-    row_idx = stats_df.index[mask][0]
-
-    # Plate appearance
-    stats_df.at[row_idx, "PA"] += 1
-
-    # Outcomes that count as AB
-    ab_outcomes = [
-        "Single",
-        "Double",
-        "Triple",
-        "Home Run",
-        "Out",
-        "Strikeout",
-        "Double Play",
-        "Triple Play",
-    ]
-    if outcome in ab_outcomes:
-        stats_df.at[row_idx, "AB"] += 1
-
-    if outcome == "Single":
-        stats_df.at[row_idx, "H"] += 1
-        stats_df.at[row_idx, "1B"] += 1
-    elif outcome == "Double":
-        stats_df.at[row_idx, "H"] += 1
-        stats_df.at[row_idx, "2B"] += 1
-    elif outcome == "Triple":
-        stats_df.at[row_idx, "H"] += 1
-        stats_df.at[row_idx, "3B"] += 1
-    elif outcome == "Home Run":
-        stats_df.at[row_idx, "H"] += 1
-        stats_df.at[row_idx, "HR"] += 1
-    elif outcome == "Walk":
-        stats_df.at[row_idx, "BB"] += 1
-    elif outcome == "Strikeout":
-        stats_df.at[row_idx, "K"] += 1
-    # Out / Double Play / Triple Play: just AB, no hits, no BB, no K
-
-    # RBIs (cap at 4 for safety)
-    stats_df.at[row_idx, "RBI"] += max(0, min(4, rbis))
-
-    # Recalculate AVG / OBP / SLG
-    AB = stats_df.at[row_idx, "AB"]
-    H = stats_df.at[row_idx, "H"]
-    BB = stats_df.at[row_idx, "BB"]
-    _1B = stats_df.at[row_idx, "1B"]
-    _2B = stats_df.at[row_idx, "2B"]
-    _3B = stats_df.at[row_idx, "3B"]
-    HR = stats_df.at[row_idx, "HR"]
-
-    stats_df.at[row_idx, "AVG"] = H / AB if AB > 0 else 0.0
-    PA = stats_df.at[row_idx, "PA"]
-    stats_df.at[row_idx, "OBP"] = (H + BB) / PA if PA > 0 else 0.0
-
-    total_bases = _1B + 2 * _2B + 3 * _3B + 4 * HR
-    stats_df.at[row_idx, "SLG"] = total_bases / AB if AB > 0 else 0.0
-
-    return stats_df
-
-
-# ---------- In-game stat aggregation for 2025 CSV (Option A) ----------
-def record_game_stat(first: str, last: str, outcome: str):
-    """
-    Aggregate per-game stats for merging into 2025 CSV.
-    Called only when game ends to update ltp_2025 1(in).csv.
-    """
-    name = f"{first} {last}".strip()
-    if "game_stats" not in st.session_state:
-        st.session_state.game_stats = {}
-
-    if name not in st.session_state.game_stats:
-        st.session_state.game_stats[name] = {
-            "PA": 0,
-            "1B": 0,
-            "2B": 0,
-            "3B": 0,
-            "HR": 0,
-            "BB": 0,
-            "K": 0,
-        }
-
-    s = st.session_state.game_stats[name]
-    s["PA"] += 1
-
-    if outcome == "Single":
-        s["1B"] += 1
-    elif outcome == "Double":
-        s["2B"] += 1
-    elif outcome == "Triple":
-        s["3B"] += 1
-    elif outcome == "Home Run":
-        s["HR"] += 1
-    elif outcome == "Walk":
-        s["BB"] += 1
-    elif outcome == "Strikeout":
-        s["K"] += 1
-
-    st.session_state.game_stats[name] = s
-
-
-def merge_game_stats_into_2025():
-    """Merge per-game stats into main 2025 CSV (called at End Game)."""
-    stats_dict = st.session_state.get("game_stats", {})
-    if not stats_dict:
-        return
-
-    if STATS_2025_PATH.exists():
-        try:
-            df = pd.read_csv(STATS_2025_PATH)
-        except UnicodeDecodeError:
-            df = pd.read_csv(STATS_2025_PATH, encoding="latin1")
-    else:
-        df = pd.DataFrame(columns=["Name", "PA", "1B", "2B", "3B", "HR", "BB", "K"])
-
-    for col in ["Name", "PA", "1B", "2B", "3B", "HR", "BB", "K"]:
-        if col not in df.columns:
-            df[col] = 0
-    num_cols = ["PA", "1B", "2B", "3B", "HR", "BB", "K"]
-    df[num_cols] = df[num_cols].apply(pd.to_numeric, errors="coerce").fillna(0)
-
-    for name, s in stats_dict.items():
-        mask = df["Name"].astype(str) == name
-        if mask.any():
-            for col in num_cols:
-                df.loc[mask, col] = df.loc[mask, col] + s[col]
-        else:
-            new_row = {"Name": name}
-            for col in num_cols:
-                new_row[col] = s[col]
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-
-    df.to_csv(STATS_2025_PATH, index=False)
+TEAM_ID = auth.current_team_id()
+team_data.prepare_player_stats(TEAM_ID)
 
 
 # ---------- Base helpers ----------
-def empty_bases():
-    return {"1B": None, "2B": None, "3B": None}
+@cache.by_revision(max_teams=64, version=db.roster_revision)
+def load_player_names(team_id: int) -> dict:
+    """Names for every player id, including inactive runners still on base."""
+    return db.player_names(team_id)
 
 
-def render_basepaths(bases: dict):
-    """Visual diamond showing where runners are."""
+def render_basepaths(bases: dict, names: dict):
+    """Visual diamond showing where runners (player ids) are."""
 
     def box(label, runner):
         occupied = runner is not None
-        text = runner if occupied else label
+        text = names.get(runner, "?") if occupied else label
         bg = "#2e7d32" if occupied else "#424242"
         return f"""
         <div style="
@@ -301,41 +56,6 @@ def render_basepaths(bases: dict):
     )
 
 
-# ---------- Stats recomputation for UNDO ----------
-def recompute_stats_from_log():
-    if not GAME_LOG_PATH.exists():
-        save_player_stats(empty_stats_df())
-        return
-
-    log_df = pd.read_csv(GAME_LOG_PATH)
-    stats_df = empty_stats_df()
-    for _, row in log_df.iterrows():
-        stats_df = update_player_stats(
-            stats_df,
-            row["first_name"],
-            row["last_name"],
-            int(row["jersey_number"]),
-            row["outcome"],
-            int(row.get("rbis", 0)),
-        )
-    save_player_stats(stats_df)
-
-
-def recompute_game_stats_for_current_game():
-    """Rebuild per-game aggregates for the current game from the log."""
-    st.session_state.game_stats = {}
-    if not GAME_LOG_PATH.exists():
-        return
-
-    log_df = pd.read_csv(GAME_LOG_PATH)
-    sub = log_df[
-        (log_df["game_date"] == st.session_state.game_date)
-        & (log_df["opponent"] == st.session_state.opponent)
-    ]
-    for _, row in sub.iterrows():
-        record_game_stat(row["first_name"], row["last_name"], row["outcome"])
-
-
 # ---------- Streamlit setup ----------
 st.set_page_config(
     page_title="Gameday",
@@ -361,100 +81,40 @@ with col_title:
 
 with col_img:
     st.image(
-        "Gameday.png",
+        assets.sized_image("Gameday.png", 220),
         caption="",
         width=220,      # ⭐️ ideal size
     )
 
 
 # ---------- Initialize session_state for game flow ----------
-def init_game_state():
-    st.session_state.game_active = False
-    st.session_state.game_date = str(date.today())
-    st.session_state.opponent = ""
-    st.session_state.inning = 1             # start in 1st
-    st.session_state.half = "Top"           # Top / Bottom
-    st.session_state.offense = "LTP"        # LTP or Opponent
-    st.session_state.outs = 0
-    st.session_state.ltp_role = "Away"      # Home or Away; default
-
-    st.session_state.ltp_scores = {}        # inning -> runs
-    st.session_state.opp_scores = {}
-    st.session_state.current_ltp_runs = 0
-    st.session_state.current_opp_runs = 0
-
-    st.session_state.game_stats = {}        # per-game hitting for 2025 CSV
-    st.session_state.bases = empty_bases()
-    st.session_state.lineup = []            # ordered list of display_names
-    st.session_state.batter_index = 0
-    st.session_state.last_play = ""
-    st.session_state.undo_stack = []        # for rollback
-
-
-if "game_active" not in st.session_state:
-    init_game_state()
+def init_game_state() -> game_state.GameState:
+    st.session_state.game = game_state.GameState(game_date=str(date.today()))
+    return st.session_state.game
 
 
-def push_snapshot():
-    """Save current game state so we can undo the last action."""
-    snap = {
-        "inning": st.session_state.inning,
-        "half": st.session_state.half,
-        "offense": st.session_state.offense,
-        "outs": st.session_state.outs,
-        "ltp_role": st.session_state.ltp_role,
-        "ltp_scores": st.session_state.ltp_scores.copy(),
-        "opp_scores": st.session_state.opp_scores.copy(),
-        "current_ltp_runs": st.session_state.current_ltp_runs,
-        "current_opp_runs": st.session_state.current_opp_runs,
-        "bases": st.session_state.bases.copy(),
-        "lineup": st.session_state.lineup.copy(),
-        "batter_index": st.session_state.batter_index,
-        "last_play": st.session_state.last_play,
-    }
-    st.session_state.undo_stack.append(snap)
+if "game" not in st.session_state:
+    # A refresh or reconnect picks the team's unfinished game back up
+    st.session_state.game = game_state.resume(TEAM_ID) or init_game_state()
 
-
-def apply_snapshot(snap: dict):
-    st.session_state.inning = snap["inning"]
-    st.session_state.half = snap["half"]
-    st.session_state.offense = snap["offense"]
-    st.session_state.outs = snap["outs"]
-    st.session_state.ltp_role = snap["ltp_role"]
-    st.session_state.ltp_scores = snap["ltp_scores"]
-    st.session_state.opp_scores = snap["opp_scores"]
-    st.session_state.current_ltp_runs = snap["current_ltp_runs"]
-    st.session_state.current_opp_runs = snap["current_opp_runs"]
-    st.session_state.bases = snap["bases"]
-    st.session_state.lineup = snap["lineup"]
-    st.session_state.batter_index = snap["batter_index"]
-    st.session_state.last_play = snap["last_play"]
+game = st.session_state.game
 
 
 # ---------- Start new game + lineup UI ----------
-roster = load_roster()
+roster = team_data.load_roster(TEAM_ID)
 if roster.empty:
     st.error("Roster is empty. Go to 'Add / Remove Players' to add players first.")
     st.stop()
 
-with st.expander("Start / Reset Game", expanded=not st.session_state.game_active):
-    game_date = st.date_input(
-        "Game date",
-        value=date.fromisoformat(st.session_state.game_date),
-        key="game_date_input",
-    )
-    opponent = st.text_input(
-        "Opponent name",
-        value=st.session_state.opponent,
-        placeholder="e.g., Beer League Bandits",
-    )
+# player_id -> roster row / display name; lineup and bases hold ids
+roster_by_id = roster.set_index("player_id")
+display_names = roster_by_id["display_name"].to_dict()
+runner_names = {**load_player_names(TEAM_ID), **display_names}
 
-    ltp_role = st.radio(
-        "LTP is:",
-        ["Home", "Away"],
-        index=0 if st.session_state.get("ltp_role", "Home") == "Home" else 1,
-    )
 
+# Lineup spots and the optimizer rerun on their own, not the whole page
+@st.fragment
+def lineup_builder():
     st.markdown("### Set Lineup (Batting Order)")
     max_spots = min(15, len(roster))
     num_spots = st.number_input(
@@ -466,160 +126,227 @@ with st.expander("Start / Reset Game", expanded=not st.session_state.game_active
         key="num_spots",
     )
 
-    lineup_options = ["-- None --"] + roster["display_name"].tolist()
+    lineup_options = [None] + roster["player_id"].tolist()
     for i in range(num_spots):
         st.selectbox(
             f"Spot {i + 1}",
             options=lineup_options,
+            format_func=lambda pid: "-- None --" if pid is None else display_names[pid],
             key=f"lineup_{i}",
         )
 
+    st.markdown("#### Optimize Batting Order")
+    st.caption(
+        "Searches orders of the hitters picked above for the most expected "
+        "runs, using season outcome rates (new players get team averages)."
+    )
+    picked = []
+    for i in range(num_spots):
+        val = st.session_state.get(f"lineup_{i}")
+        if val is not None and val not in picked:
+            picked.append(val)
+
+    opt_budget = st.slider("Search time (seconds)", 1, 30, 5, key="opt_budget")
+    if st.button("Suggest Batting Orders", disabled=len(picked) < 2):
+        season = team_data.load_player_stats(TEAM_ID)
+        season = season.reindex(season.index.union(picked), fill_value=0)
+        probs = simulator.outcome_probabilities(season.reset_index(), key="player_id")
+        with st.spinner("Searching batting orders..."):
+            results = lineup_optimizer.optimize_lineup(
+                probs.loc[picked].to_numpy(), time_budget=float(opt_budget)
+            )
+        st.session_state.lineup_suggestions = [
+            (runs, [picked[i] for i in order]) for runs, order in results
+        ]
+
+    def use_order(order):
+        for i in range(st.session_state.num_spots):
+            st.session_state[f"lineup_{i}"] = order[i] if i < len(order) else None
+
+    for rank, (exp_runs, order) in enumerate(st.session_state.get("lineup_suggestions", []), start=1):
+        sug_col1, sug_col2 = st.columns([5, 1])
+        with sug_col1:
+            st.markdown(
+                f"**{rank}. {exp_runs:.2f} runs/game** — "
+                + ", ".join(display_names.get(pid, str(pid)) for pid in order)
+            )
+        with sug_col2:
+            st.button("Use", key=f"use_order_{rank}", on_click=use_order, args=(order,))
+
+
+with st.expander("Start / Reset Game", expanded=not game.game_active):
+    game_date = st.date_input(
+        "Game date",
+        value=date.fromisoformat(game.game_date),
+        key="game_date_input",
+    )
+    opponent = st.text_input(
+        "Opponent name",
+        value=game.opponent,
+        placeholder="e.g., Beer League Bandits",
+    )
+
+    ltp_role = st.radio(
+        "LTP is:",
+        ["Home", "Away"],
+        index=0 if game.ltp_role == "Home" else 1,
+    )
+
+    lineup_builder()
+
     col_a, col_b = st.columns(2)
     with col_a:
         if st.button("Start New Game"):
-            init_game_state()
-            st.session_state.game_active = True
-            st.session_state.game_date = str(game_date)
-            st.session_state.opponent = opponent or "Unknown Opponent"
-            st.session_state.ltp_role = ltp_role
+            game_state.finish(game, "discarded")
 
             # Build lineup from selected spots
             selected = []
-            for i in range(num_spots):
+            for i in range(st.session_state.num_spots):
                 val = st.session_state.get(f"lineup_{i}")
-                if val and val != "-- None --" and val not in selected:
+                if val is not None and val not in selected:
                     selected.append(val)
 
             if not selected:
-                selected = roster["display_name"].tolist()
-
-            st.session_state.lineup = selected
-            st.session_state.batter_index = 0
-            st.session_state.undo_stack = []
-
-            # Set who bats first based on Home/Away
-            st.session_state.inning = 1
-            st.session_state.half = "Top"
-            if ltp_role == "Away":
-                st.session_state.offense = "LTP"       # LTP bats in top 1
-            else:
-                st.session_state.offense = "Opponent"  # Opponent bats in top 1
+                selected = roster["player_id"].tolist()
+
+            game_state.start(
+                game,
+                TEAM_ID,
+                {
+                    "game_date": str(game_date),
+                    "opponent": opponent.strip() or "Unknown Opponent",
+                    "ltp_role": ltp_role,
+                    "lineup": [int(pid) for pid in selected],
+                },
+            )
 
             st.success(
-                f"Game started vs {st.session_state.opponent} on {st.session_state.game_date}. "
+                f"Game started vs {game.opponent} on {game.game_date}. "
                 f"LTP is {ltp_role} team. Lineup set with {len(selected)} hitters."
             )
             st.rerun()
     with col_b:
         if st.button("Reset Current Game (Discard Progress)"):
-            init_game_state()
+            game_state.finish(game, "discarded")
+            game = init_game_state()
             st.warning("Current game state cleared (historical 2025 stats NOT touched).")
 
-if not st.session_state.game_active:
+if not game.game_active:
     st.stop()
 
 # Ensure we always have a lineup
-if not st.session_state.lineup:
-    st.session_state.lineup = roster["display_name"].tolist()
-    st.session_state.batter_index = 0
+if not game.lineup:
+    game.lineup = tuple(roster["player_id"].tolist())
+    game.batter_index = 0
 
 
 # ---------- Scoreboard ----------
-st.markdown("---")
-st.subheader("Scoreboard")
-
-ltp_scores = st.session_state.ltp_scores
-opp_scores = st.session_state.opp_scores
-
-max_inning = max(
-    6, st.session_state.inning, *(ltp_scores.keys() or [1]), *(opp_scores.keys() or [1])
-)
+def render_scoreboard():
+    st.markdown("---")
+    st.subheader("Scoreboard")
+
+    max_inning = max(6, game.inning, len(game.ltp_scores), len(game.opp_scores))
+    innings = list(range(1, max_inning + 1))
+    ltp_row, opp_row = game.line_score(max_inning)
+
+    score_df = pd.DataFrame(
+        {
+            "Inning": innings,
+            "LTP": ltp_row,
+            game.opponent or "Opponent": opp_row,
+        }
+    )
 
-innings = list(range(1, max_inning + 1))
+    st.dataframe(score_df, use_container_width=True, hide_index=True)
 
-ltp_row = []
-opp_row = []
+    total_ltp, total_opp = game.totals()
 
-for inn in innings:
-    ltp_val = ltp_scores.get(inn, 0)
-    opp_val = opp_scores.get(inn, 0)
-    if inn == st.session_state.inning:
-        if st.session_state.offense == "LTP":
-            ltp_val += st.session_state.current_ltp_runs
-        else:
-            opp_val += st.session_state.current_opp_runs
+    st.write(f"**Total Score:** LTP {total_ltp} — {total_opp} {game.opponent}")
 
-    ltp_row.append(ltp_val)
-    opp_row.append(opp_val)
-
-score_df = pd.DataFrame(
-    {
-        "Inning": innings,
-        "LTP": ltp_row,
-        st.session_state.opponent or "Opponent": opp_row,
-    }
-)
-
-st.dataframe(score_df, use_container_width=True, hide_index=True)
+    # Win probability for the state the next PA starts in. When LTP is home the
+    # opponent's half advances the inning counter, so LTP's own half is the
+    # bottom of the previous inning.
+    ltp_home = game.ltp_role == "Home"
+    if game.offense == "LTP":
+        wp_half = "Bottom" if ltp_home else "Top"
+        wp_inning = game.inning - 1 if ltp_home else game.inning
+        wp_bases = game.base_state
+    else:
+        wp_half = "Top" if ltp_home else "Bottom"
+        wp_inning = game.inning
+        wp_bases = 0
+    wp_table = win_expectancy.load_table()
+    if wp_table is None:
+        st.caption("Win probability appears once the table is built (python win_expectancy.py).")
+    else:
+        win_prob, leverage = win_expectancy.lookup(
+            wp_table,
+            wp_inning,
+            wp_half,
+            game.outs,
+            wp_bases,
+            total_ltp,
+            total_opp,
+            ltp_home,
+        )
+        wp_col, lev_col = st.columns(2)
+        with wp_col:
+            st.metric("LTP Win Probability", f"{win_prob:.0%}")
+        with lev_col:
+            st.metric("Leverage", f"{leverage:.1f}")
 
-total_ltp = sum(ltp_scores.values()) + st.session_state.current_ltp_runs
-total_opp = sum(opp_scores.values()) + st.session_state.current_opp_runs
+    if game.inning > 6:
+        st.caption("Regulation 6 innings complete. Extra innings in progress.")
 
-st.write(f"**Total Score:** LTP {total_ltp} — {total_opp} {st.session_state.opponent}")
 
-if st.session_state.inning > 6:
-    st.caption("Regulation 6 innings complete. Extra innings in progress.")
+render_scoreboard()
 
 # ---------- Undo button ----------
-if st.session_state.undo_stack:
+if game.can_undo:
     if st.button("↩️ Undo Last Play"):
-        if GAME_LOG_PATH.exists():
-            log_df = pd.read_csv(GAME_LOG_PATH)
-            if len(log_df) > 0:
-                log_df = log_df.iloc[:-1]
-                log_df.to_csv(GAME_LOG_PATH, index=False)
-
-        recompute_stats_from_log()
-        recompute_game_stats_for_current_game()
-
-        snap = st.session_state.undo_stack.pop()
-        apply_snapshot(snap)
+        # Opponent half-innings have no PA to take back
+        if game.last_pa is not None:
+            seq = team_data.undo_game_log(TEAM_ID, game.last_pa, game.live_game_id)
+            game_state.dispatch(game, "undo", seq=seq)
+        else:
+            game_state.dispatch(game, "undo")
 
         st.info("Last play undone.")
         st.rerun()
 
 # ---------- Current half-inning status ----------
 st.markdown("---")
-half_label = f"{st.session_state.half} {st.session_state.inning}"
+half_label = f"{game.half} {game.inning}"
 offense_label = (
-    "LTP batting" if st.session_state.offense == "LTP" else f"{st.session_state.opponent} batting"
+    "LTP batting" if game.offense == "LTP" else f"{game.opponent} batting"
 )
-st.subheader(f"Inning {st.session_state.inning} — {half_label} ({offense_label})")
-st.write(f"**Outs:** {st.session_state.outs} / 3")
+st.subheader(f"Inning {game.inning} — {half_label} ({offense_label})")
+st.write(f"**Outs:** {game.outs} / 3")
 
 # Base viz for LTP offense
-if st.session_state.offense == "LTP":
+if game.offense == "LTP":
     st.markdown("#### Base Runners")
-    render_basepaths(st.session_state.bases)
+    render_basepaths(game.runners, runner_names)
 
-if st.session_state.last_play:
-    st.caption(f"Last play: {st.session_state.last_play}")
+if game.last_play:
+    st.caption(f"Last play: {game.last_play}")
 
 
 # ---------- LTP batting flow ----------
-if st.session_state.offense == "LTP":
+# Runner and result pickers only rerun this panel; submitting reruns the page
+@st.fragment
+def ltp_plate_appearance_panel():
     st.markdown("### Current Batter")
 
-    lineup = st.session_state.lineup
-    idx = st.session_state.batter_index % len(lineup)
-    current_batter_name = lineup[idx]
-    st.write(f"**Batter up:** {current_batter_name}")
-
-    batter_row = roster[roster["display_name"] == current_batter_name]
-    if batter_row.empty:
+    lineup = game.lineup
+    idx = game.batter_index % len(lineup)
+    current_batter_id = lineup[idx]
+    if current_batter_id not in roster_by_id.index:
         st.error("Current batter not found in roster. Check lineup setup.")
         st.stop()
-    batter_info = batter_row.iloc[0]
+    batter_info = roster_by_id.loc[current_batter_id]
+    current_batter_name = batter_info["display_name"]
+    st.write(f"**Batter up:** {current_batter_name}")
 
     # Outcome options WITH placeholder (must be changed)
     OUTCOME_OPTIONS = [
@@ -642,7 +369,7 @@ if st.session_state.offense == "LTP":
 
     st.markdown("### Runners & Scoring")
 
-    bases_before = st.session_state.bases
+    bases_before = game.runners
     runner_moves = {}
 
     MOVE_OPTIONS_TEMPLATE = {
@@ -674,10 +401,10 @@ if st.session_state.offense == "LTP":
 
     for base in ["3B", "2B", "1B"]:
         runner = bases_before.get(base)
-        if runner:
+        if runner is not None:
             opts = MOVE_OPTIONS_TEMPLATE[base]
             choice = st.selectbox(
-                f"Runner {runner} (was on {base}) ends up:",
+                f"Runner {runner_names.get(runner, '?')} (was on {base}) ends up:",
                 options=opts,
                 key=f"move_{base}",
             )
@@ -704,7 +431,9 @@ if st.session_state.offense == "LTP":
             errors.append("Select a result for the plate appearance.")
         for (_, runner), choice in runner_moves.items():
             if choice.startswith("--"):
-                errors.append(f"Make a selection for runner {runner}.")
+                errors.append(
+                    f"Make a selection for runner {runner_names.get(runner, '?')}."
+                )
         if batter_dest == BATTER_OPTIONS[0]:
             errors.append("Select where the batter ends up.")
 
@@ -713,16 +442,16 @@ if st.session_state.offense == "LTP":
                 st.error(e)
             st.stop()
 
-        # Save snapshot for UNDO
-        push_snapshot()
-
         first = batter_info["first_name"]
         last = batter_info["last_name"]
         jersey = int(batter_info["jersey_number"])
         display_name = current_batter_name
+        player_id = int(current_batter_id)
+
+        outs_before = game.outs
 
         # --- Apply manual base moves & count runs from Scores ---
-        new_bases = empty_bases()
+        new_bases = game_state.empty_bases()
         outs_added = 0
         runs_scored = 0
 
@@ -745,64 +474,43 @@ if st.session_state.offense == "LTP":
             runs_scored += 1
         elif batter_dest.startswith("On "):
             dest_base = batter_dest.split(" ")[1]
-            new_bases[dest_base] = display_name
-
-        # Update outs & runs
-        st.session_state.outs += outs_added
-        st.session_state.outs = min(st.session_state.outs, 3)
-        st.session_state.current_ltp_runs += runs_scored
+            new_bases[dest_base] = player_id
 
         # Log event
         event = {
             "timestamp": datetime.now().isoformat(timespec="seconds"),
-            "game_date": st.session_state.game_date,
-            "opponent": st.session_state.opponent,
-            "inning": st.session_state.inning,
-            "half": st.session_state.half,
+            "live_game_id": game.live_game_id,
+            "game_date": game.game_date,
+            "opponent": game.opponent,
+            "inning": game.inning,
+            "half": game.half,
+            "player_id": player_id,
             "first_name": first,
             "last_name": last,
             "jersey_number": jersey,
             "outcome": outcome,
             "rbis": int(runs_scored),
+            "outs_before": outs_before,
+            "bases_before": run_expectancy.base_state(bases_before),
+            "outs_after": min(outs_before + outs_added, 3),
+            "bases_after": run_expectancy.base_state(new_bases),
+            "runs_scored": int(runs_scored),
         }
-        append_game_log(event)
-
-        # Update season stats
-        stats = load_player_stats()
-        stats = update_player_stats(
-            stats, first, last, jersey, outcome, int(runs_scored)
-        )
-        save_player_stats(stats)
-
-        # Record per-game stats for 2025 CSV
-        record_game_stat(first, last, outcome)
-
-        # Save updated bases & play summary
-        st.session_state.bases = new_bases
-        st.session_state.last_play = (
-            f"{outcome} by {display_name}, {runs_scored} run(s) scored, "
-            f"{outs_added} out(s) on the play."
-        )
-
-        # Advance lineup
-        st.session_state.batter_index = (st.session_state.batter_index + 1) % len(
-            st.session_state.lineup
-        )
-
-        # End of half?
-        if st.session_state.outs >= 3:
-            prev = st.session_state.ltp_scores.get(
-                st.session_state.inning, 0
-            )
-            st.session_state.ltp_scores[st.session_state.inning] = (
-                prev + st.session_state.current_ltp_runs
-            )
-            st.session_state.current_ltp_runs = 0
-            st.session_state.outs = 0
-            st.session_state.bases = empty_bases()
-            st.session_state.offense = "Opponent"
-            st.session_state.half = "Bottom" if st.session_state.half == "Top" else "Top"
-            st.session_state.last_play += " (End of half-inning.)"
+        # Log the PA, update season stats and journal the play (the PA and
+        # its journal entry in one transaction); the reducer then updates
+        # outs, runs, bases, the lineup position and the per-game stats,
+        # and closes the half
+        payload = {
+            "outs_added": outs_added,
+            "runs_scored": runs_scored,
+            "bases": new_bases,
+            "last_play": (
+                f"{outcome} by {display_name}, {runs_scored} run(s) scored, "
+                f"{outs_added} out(s) on the play."
+            ),
+        }
+        _, seq = team_data.append_game_log(TEAM_ID, event, (game.live_game_id, payload))
+        game_state.dispatch(game, "pa", payload, seq=seq)
 
         # reset input widgets so user has to choose fresh each PA
         for key in ["outcome_select", "batter_dest", "move_3B", "move_2B", "move_1B"]:
@@ -811,12 +519,14 @@ if st.session_state.offense == "LTP":
 
         st.rerun()
 
+
 # ---------- Opponent batting flow ----------
-else:
+@st.fragment
+def opponent_half_panel():
     st.markdown("### Opponent Half-Inning")
 
     runs_this_half = st.number_input(
-        f"Runs scored by {st.session_state.opponent} this half-inning",
+        f"Runs scored by {game.opponent} this half-inning",
         min_value=0,
         max_value=50,
         step=1,
@@ -834,24 +544,7 @@ else:
     )
 
     if st.button("Submit Opponent Half"):
-        push_snapshot()
-
-        st.session_state.current_opp_runs = int(runs_this_half)
-
-        prev = st.session_state.opp_scores.get(st.session_state.inning, 0)
-        st.session_state.opp_scores[st.session_state.inning] = (
-            prev + st.session_state.current_opp_runs
-        )
-        st.session_state.current_opp_runs = 0
-
-        st.session_state.outs = 0
-        st.session_state.inning += 1
-        st.session_state.half = "Top"
-        st.session_state.offense = "LTP"
-        st.session_state.bases = empty_bases()
-        st.session_state.last_play = (
-            f"{st.session_state.opponent} scored {runs_this_half} run(s) in the half."
-        )
+        game_state.dispatch(game, "opp_half", {"runs": int(runs_this_half)})
 
         if "opp_runs_input" in st.session_state:
             del st.session_state["opp_runs_input"]
@@ -861,26 +554,19 @@ else:
         st.rerun()
 
 
+if game.offense == "LTP":
+    ltp_plate_appearance_panel()
+else:
+    opponent_half_panel()
+
+
 # ---------- End game + save to season history + upload stats ----------
 st.markdown("---")
 st.subheader("End Game")
 
 if st.button("End Game & Upload Stats"):
-    if st.session_state.offense == "LTP" and st.session_state.current_ltp_runs > 0:
-        prev = st.session_state.ltp_scores.get(st.session_state.inning, 0)
-        st.session_state.ltp_scores[st.session_state.inning] = (
-            prev + st.session_state.current_ltp_runs
-        )
-        st.session_state.current_ltp_runs = 0
-    elif st.session_state.offense == "Opponent" and st.session_state.current_opp_runs > 0:
-        prev = st.session_state.opp_scores.get(st.session_state.inning, 0)
-        st.session_state.opp_scores[st.session_state.inning] = (
-            prev + st.session_state.current_opp_runs
-        )
-        st.session_state.current_opp_runs = 0
-
-    total_ltp = sum(st.session_state.ltp_scores.values())
-    total_opp = sum(st.session_state.opp_scores.values())
+    # Runs in the half still in progress count toward the final
+    total_ltp, total_opp = game.totals()
 
     if total_ltp > total_opp:
         result = "W"
@@ -890,31 +576,28 @@ if st.button("End Game & Upload Stats"):
         result = "T"
 
     game_record = {
-        "date": st.session_state.game_date,
-        "opponent": st.session_state.opponent,
+        "date": game.game_date,
+        "opponent": game.opponent,
         "ltp_runs": total_ltp,
         "opp_runs": total_opp,
         "result": result,
-        "ltp_role": st.session_state.ltp_role,
+        "ltp_role": game.ltp_role,
     }
 
-    if SEASON_HISTORY_PATH.exists():
-        hist_df = pd.read_csv(SEASON_HISTORY_PATH)
-    else:
-        hist_df = pd.DataFrame(columns=game_record.keys())
+    # The game takes over the PAs recorded in this live game, so a
+    # doubleheader's games (or a discarded one) never share PAs
+    game_id = db.insert_game(TEAM_ID, game_record, game.live_game_id)
+    game_state.finish(game, "ended")
 
-    hist_df = pd.concat(
-        [hist_df, pd.DataFrame([game_record])], ignore_index=True
-    )
-    hist_df.to_csv(SEASON_HISTORY_PATH, index=False)
+    # Materialize the box score now so Season History never rebuilds it
+    team_data.build_box_score(TEAM_ID, game_id)
 
-    merge_game_stats_into_2025()
+    team_data.merge_game_stats_into_2025(TEAM_ID, game.game_stats)
 
     st.success(
         f"Game saved & stats uploaded: LTP {total_ltp} – {total_opp} "
-        f"{st.session_state.opponent} ({result})"
+        f"{game.opponent} ({result})"
     )
 
     init_game_state()
-    st.session_state.game_active = False
     st.stop()
@@ -1,9 +1,15 @@
 import streamlit as st
 import pandas as pd
-from pathlib import Path
 import auth
+import db
+import run_expectancy
+import simulator
+import team_data
+from stats import build_stats
 
-auth.require_login()
+auth.require_login("Basic Stats")
+
+TEAM_ID = auth.current_team_id()
 
 st.set_page_config(
     page_title="LTP Stats",
@@ -14,150 +20,7 @@ st.set_page_config(
 st.title("LTP Basic Stats")
 st.caption("Season-to-date team and player batting stats")
 
-LOG_PATH = Path("gameday_log.csv")
-SEASON_HISTORY_PATH = Path("season_history.csv")
-
-
-@st.cache_data
-def load_current_season_log() -> pd.DataFrame:
-    """Only include plate appearances tied to games in season history."""
-    if not LOG_PATH.exists():
-        return pd.DataFrame()
-
-    log_df = pd.read_csv(LOG_PATH)
-    if log_df.empty:
-        return pd.DataFrame()
-
-    required_log_cols = {
-        "game_date",
-        "opponent",
-        "first_name",
-        "last_name",
-        "jersey_number",
-        "outcome",
-        "rbis",
-    }
-    if not required_log_cols.issubset(set(log_df.columns)):
-        return pd.DataFrame()
-
-    if not SEASON_HISTORY_PATH.exists():
-        return pd.DataFrame()
-
-    hist_df = pd.read_csv(SEASON_HISTORY_PATH)
-    if hist_df.empty or not {"date", "opponent"}.issubset(hist_df.columns):
-        return pd.DataFrame()
-
-    log_df["game_date"] = pd.to_datetime(log_df["game_date"], errors="coerce").dt.strftime("%Y-%m-%d")
-    hist_df["date"] = pd.to_datetime(hist_df["date"], errors="coerce").dt.strftime("%Y-%m-%d")
-
-    log_df["opponent"] = log_df["opponent"].fillna("").astype(str).str.strip()
-    hist_df["opponent"] = hist_df["opponent"].fillna("").astype(str).str.strip()
-
-    valid_games = hist_df[["date", "opponent"]].dropna().drop_duplicates()
-    merged = log_df.merge(
-        valid_games,
-        left_on=["game_date", "opponent"],
-        right_on=["date", "opponent"],
-        how="inner",
-    )
-
-    if merged.empty:
-        return pd.DataFrame()
-
-    merged["first_name"] = merged["first_name"].fillna("").astype(str).str.strip()
-    merged["last_name"] = merged["last_name"].fillna("").astype(str).str.strip()
-    merged["player_name"] = (merged["first_name"] + " " + merged["last_name"]).str.strip()
-    merged["outcome"] = merged["outcome"].fillna("").astype(str).str.strip()
-    merged["rbis"] = pd.to_numeric(merged["rbis"], errors="coerce").fillna(0).astype(int)
-    merged["jersey_number"] = pd.to_numeric(merged["jersey_number"], errors="coerce").fillna(0).astype(int)
-
-    return merged
-
-
-def build_stats(df: pd.DataFrame) -> pd.DataFrame:
-    if df.empty:
-        return pd.DataFrame(
-            columns=[
-                "Player",
-                "Jersey",
-                "G",
-                "PA",
-                "AB",
-                "R",
-                "H",
-                "1B",
-                "2B",
-                "3B",
-                "HR",
-                "RBI",
-                "BB",
-                "K",
-                "AVG",
-                "OBP",
-                "SLG",
-                "OPS",
-            ]
-        )
-
-    walk_events = {"Walk"}
-    strikeout_events = {"Strikeout", "Strikeout Looking"}
-
-    rows = []
-
-    for player, group in df.groupby("player_name"):
-        outcomes = group["outcome"]
-
-        singles = (outcomes == "Single").sum()
-        doubles = (outcomes == "Double").sum()
-        triples = (outcomes == "Triple").sum()
-        homers = (outcomes == "Home Run").sum()
-        hits = singles + doubles + triples + homers
-
-        walks = outcomes.isin(walk_events).sum()
-        strikeouts = outcomes.isin(strikeout_events).sum()
-
-        pa = len(group)
-        ab = pa - walks
-        games = group[["game_date", "opponent"]].drop_duplicates().shape[0]
-
-        avg = hits / ab if ab > 0 else 0
-        obp = (hits + walks) / pa if pa > 0 else 0
-        total_bases = singles + (2 * doubles) + (3 * triples) + (4 * homers)
-        slg = total_bases / ab if ab > 0 else 0
-        ops = obp + slg
-
-        jersey_number = int(group["jersey_number"].iloc[0])
-
-        rows.append(
-            {
-                "Player": player,
-                "Jersey": jersey_number,
-                "G": games,
-                "PA": pa,
-                "AB": ab,
-                "R": 0,
-                "H": hits,
-                "1B": singles,
-                "2B": doubles,
-                "3B": triples,
-                "HR": homers,
-                "RBI": int(group["rbis"].sum()),
-                "BB": walks,
-                "K": strikeouts,
-                "AVG": round(avg, 3),
-                "OBP": round(obp, 3),
-                "SLG": round(slg, 3),
-                "OPS": round(ops, 3),
-            }
-        )
-
-    return pd.DataFrame(rows).sort_values(
-        by=["OPS", "AVG", "H"],
-        ascending=False,
-    ).reset_index(drop=True)
-
-
-log_df = load_current_season_log()
+log_df = team_data.load_current_season_log(TEAM_ID)
 stats_df = build_stats(log_df)
 
 st.markdown("### Stats Pipeline")
@@ -174,7 +37,7 @@ if stats_df.empty:
 
 metric1, metric2, metric3, metric4 = st.columns(4)
 with metric1:
-    st.metric("Games", int(log_df[["game_date", "opponent"]].drop_duplicates().shape[0]) if not log_df.empty else 0)
+    st.metric("Games", int(log_df["game_id"].nunique()) if not log_df.empty else 0)
 with metric2:
     st.metric("Plate Appearances", int(stats_df["PA"].sum()) if not stats_df.empty else 0)
 with metric3:
@@ -185,11 +48,94 @@ with metric4:
 st.markdown("---")
 search = st.text_input("Search player name").strip().lower()
 
-display_df = stats_df.copy()
+display_df = stats_df.drop(columns="player_id", errors="ignore")
 if search and not display_df.empty:
     display_df = display_df[
         display_df["Player"].str.lower().str.contains(search, na=False)
     ]
 
 st.subheader("Player Batting Stats")
-st.dataframe(display_df, use_container_width=True, hide_index=True)
\ No newline at end of file
+st.dataframe(display_df, use_container_width=True, hide_index=True)
+
+
+# ---------- Game Simulator ----------
+st.markdown("---")
+st.subheader("Game Simulator")
+st.caption(
+    "Monte Carlo runs for a batting order, drawn from each hitter's season "
+    "outcome rates, against the runs we've allowed in past games."
+)
+
+if stats_df.empty:
+    st.info("Record at least one game to simulate lineups.")
+else:
+    # Keyed by player id: two hitters can share a name
+    probs_df = simulator.outcome_probabilities(stats_df, key="player_id")
+    labels = dict(
+        zip(stats_df["player_id"], stats_df["Player"] + " (#" + stats_df["Jersey"].astype(str) + ")")
+    )
+    default_order = stats_df.sort_values("PA", ascending=False, kind="stable")["player_id"].head(10).tolist()
+    sim_lineup = st.multiselect(
+        "Batting order (in order)",
+        options=stats_df["player_id"].tolist(),
+        default=default_order,
+        format_func=labels.get,
+    )
+
+    hist_df = db.fetch_games(TEAM_ID)
+    opponents = sorted(hist_df["opponent"].dropna().unique().tolist()) if not hist_df.empty else []
+    sim_col1, sim_col2, sim_col3 = st.columns(3)
+    with sim_col1:
+        n_games = st.select_slider(
+            "Simulated games",
+            options=[10_000, 50_000, 100_000, 250_000, 500_000],
+            value=100_000,
+        )
+    with sim_col2:
+        opp_choice = st.selectbox("Opponent profile", ["All opponents"] + opponents)
+    with sim_col3:
+        seed = st.number_input("Seed", min_value=0, value=2025, step=1)
+
+    if sim_lineup and st.button("Run Simulation"):
+        runs = simulator.simulate_runs(
+            probs_df.loc[sim_lineup].to_numpy(), n_games=int(n_games), seed=int(seed)
+        )
+
+        profile_df = hist_df if opp_choice == "All opponents" else hist_df[hist_df["opponent"] == opp_choice]
+        opp_runs = pd.to_numeric(profile_df["opp_runs"], errors="coerce").dropna().astype(int).to_numpy()
+        odds = simulator.win_probability(runs, opp_runs, seed=int(seed) + 1)
+
+        r1, r2, r3, r4 = st.columns(4)
+        with r1:
+            st.metric("Expected Runs", f"{runs.mean():.2f}")
+        if odds:
+            with r2:
+                st.metric("Win", f"{odds['win']:.1%}")
+            with r3:
+                st.metric("Tie", f"{odds['tie']:.1%}")
+            with r4:
+                st.metric("Loss", f"{odds['loss']:.1%}")
+        else:
+            st.info("No completed games for this opponent yet, so only the run distribution is shown.")
+
+        st.bar_chart(simulator.run_distribution(runs))
+
+# ---------- Run Expectancy ----------
+with st.expander("Run Expectancy (RE24)"):
+    matrices = run_expectancy.team_matrices(TEAM_ID)
+    if not matrices["re_counts"].any():
+        st.info(
+            "Base-out states are recorded with each plate appearance on the "
+            "Gameday page; the table fills in once a tracked game is saved."
+        )
+    else:
+        st.caption(
+            "Average runs scored from each base-out state to the end of the "
+            "half-inning, from our completed games."
+        )
+        st.dataframe(
+            run_expectancy.re24_table(matrices["run_expectancy"]).round(2),
+            use_container_width=True,
+        )
+        st.caption("Plate appearances seen in each state")
+        st.dataframe(run_expectancy.re24_table(matrices["re_counts"]), use_container_width=True)
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+import cache
+import db
+
+# ---------- Base-out states ----------
+# state = outs * 8 + bases, with bases as a bitmask (1 = 1B, 2 = 2B, 4 = 3B)
+# like simulator.py; index 24 is "three outs" in the transition matrix.
+N_STATES = 24
+END_STATE = N_STATES
+
+STATE_COLUMNS = ["outs_before", "bases_before", "outs_after", "bases_after", "runs_scored"]
+
+BASE_LABELS = ["---", "1__", "_2_", "12_", "__3", "1_3", "_23", "123"]
+OUT_LABELS = ["0 outs", "1 out", "2 outs"]
+
+_BASE_BITS = {"1B": 1, "2B": 2, "3B": 4}
+
+
+def base_state(bases: dict) -> int:
+    """Bitmask of occupied bases for a {"1B": runner, ...} dict."""
+    return sum(bit for base, bit in _BASE_BITS.items() if bases.get(base) is not None)
+
+
+# ---------- Batch job ----------
+def build_matrices(log_df: pd.DataFrame) -> dict:
+    """
+    RE24 and base-out transition matrices from a PA log.
+
+    Half-innings are grouped by (game_id, inning, half) and rows
+    are taken in log order. Run expectancy for a state is the mean of runs
+    scored from that PA to the end of its half-inning, using only
+    half-innings that reached three outs. Everything is bincounts over the
+    state index, so the whole log is a handful of array passes.
+    """
+    cols = ["game_id", "inning", "half"] + STATE_COLUMNS
+    if log_df.empty or not set(cols) <= set(log_df.columns):
+        df = pd.DataFrame(columns=cols)
+    else:
+        df = log_df[cols].dropna(subset=STATE_COLUMNS)
+
+    outs_before = df["outs_before"].to_numpy(dtype=np.int64)
+    bases_before = df["bases_before"].to_numpy(dtype=np.int64)
+    outs_after = df["outs_after"].to_numpy(dtype=np.int64)
+    bases_after = df["bases_after"].to_numpy(dtype=np.int64)
+    runs = df["runs_scored"].to_numpy(dtype=np.int64)
+
+    valid = (outs_before < 3) & (bases_before >= 0) & (bases_before < 8)
+    state = outs_before * 8 + bases_before
+    after = np.where(outs_after >= 3, END_STATE, outs_after * 8 + bases_after)
+
+    half_key = df.groupby(["game_id", "inning", "half"], sort=False).ngroup().to_numpy()
+    n_halves = int(half_key.max()) + 1 if half_key.size else 0
+
+    # Runs from each PA (inclusive) to the end of its half-inning
+    half_total = np.bincount(half_key, weights=runs, minlength=n_halves)
+    runs_so_far = pd.Series(runs).groupby(half_key).cumsum().to_numpy()
+    runs_to_end = half_total[half_key] - runs_so_far + runs
+
+    completed = np.zeros(n_halves, dtype=bool)
+    completed[half_key[outs_after >= 3]] = True
+    use = valid & completed[half_key]
+
+    re_counts = np.bincount(state[use], minlength=N_STATES)
+    re_sums = np.bincount(state[use], weights=runs_to_end[use], minlength=N_STATES)
+
+    pa_counts = np.bincount(state[valid], minlength=N_STATES)
+    pa_runs = np.bincount(state[valid], weights=runs[valid], minlength=N_STATES)
+
+    trans_counts = np.bincount(
+        state[valid] * (N_STATES + 1) + after[valid], minlength=N_STATES * (N_STATES + 1)
+    ).reshape(N_STATES, N_STATES + 1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        run_expectancy = np.where(re_counts > 0, re_sums / re_counts, np.nan)
+        runs_per_pa = np.where(pa_counts > 0, pa_runs / pa_counts, np.nan)
+        transitions = np.where(
+            pa_counts[:, None] > 0, trans_counts / pa_counts[:, None], 0.0
+        )
+
+    return {
+        "run_expectancy": run_expectancy,
+        "re_counts": re_counts,
+        "runs_per_pa": runs_per_pa,
+        "transitions": transitions,
+        "transition_counts": trans_counts,
+        "pa_counts": pa_counts,
+    }
+
+
+def re24_table(run_expectancy: np.ndarray) -> pd.DataFrame:
+    """24-state vector as the usual bases x outs grid."""
+    return pd.DataFrame(
+        np.asarray(run_expectancy).reshape(3, 8).T,
+        index=pd.Index(BASE_LABELS, name="Bases"),
+        columns=OUT_LABELS,
+    )
+
+
+@cache.by_revision(max_teams=64, version=db.season_revision)
+def team_matrices(team_id: int) -> dict:
+    """Matrices for the team's completed games; rebuilt only when games change."""
+    return build_matrices(db.fetch_season_plate_appearances(team_id))
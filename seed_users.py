@@ -1,6 +1,24 @@
+"""
+Create teams and captain logins.
+
+With no arguments this seeds the original captain from CAPTAIN_PASSWORD.
+--file provisions every row of a CSV (team_name, name, username, password
+and optionally role); --synthetic N adds N load-test teams with one captain
+each. Passwords are hashed across processes and everything is written in
+one transaction.
+"""
+import argparse
+import csv
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 from db import init_db, get_conn
-from auth import hash_password
+from auth import BCRYPT_ROUNDS, hash_password
+
+SYNTHETIC_TEAM_PREFIX = "Load Team"
+SYNTHETIC_USER_PREFIX = "load"
+
 
 def seed():
     init_db()
@@ -25,14 +43,125 @@ def seed():
 
     pw_hash = hash_password(plain_pw)
 
+    # Update in place: a REPLACE would delete the row, which sessions still
+    # reference, and hand the captain a new user_id
     cur.execute("""
-    INSERT OR REPLACE INTO users(name, username, password_hash, team_id, role)
+    INSERT INTO users(name, username, password_hash, team_id, role)
     VALUES (?, ?, ?, ?, 'captain')
+    ON CONFLICT(username) DO UPDATE SET
+        name = excluded.name,
+        password_hash = excluded.password_hash,
+        team_id = excluded.team_id,
+        role = excluded.role
     """, (name, username, pw_hash, team_id))
 
     conn.commit()
     conn.close()
     print("Seed complete: created/updated captain user.")
 
+
+# ---------- Bulk provisioning ----------
+def read_accounts(path) -> list:
+    """Rows of a provisioning CSV as dicts, with role defaulting to captain."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    missing = {"team_name", "name", "username", "password"} - set(rows[0] if rows else {})
+    if missing:
+        raise ValueError(f"{path} is missing column(s): {', '.join(sorted(missing))}")
+
+    for row in rows:
+        row["role"] = (row.get("role") or "").strip() or "captain"
+    return rows
+
+
+def synthetic_accounts(n: int, password: str, start: int = 1) -> list:
+    width = max(4, len(str(start + n - 1)))
+    return [
+        {
+            "team_name": f"{SYNTHETIC_TEAM_PREFIX} {i:0{width}d}",
+            "name": f"Load Captain {i:0{width}d}",
+            "username": f"{SYNTHETIC_USER_PREFIX}{i:0{width}d}",
+            "password": password,
+            "role": "captain",
+        }
+        for i in range(start, start + n)
+    ]
+
+
+def provision(accounts: list, rounds: int = BCRYPT_ROUNDS, workers: int = None) -> int:
+    """
+    Create any missing teams and create or update every account. Returns the
+    number of accounts written.
+    """
+    if not accounts:
+        return 0
+
+    # bcrypt is the only slow part; spread it over every core
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        hashes = list(
+            pool.map(
+                partial(hash_password, rounds=rounds),
+                [a["password"] for a in accounts],
+                chunksize=max(1, len(accounts) // (4 * (workers or os.cpu_count() or 1))),
+            )
+        )
+
+    init_db()
+    conn = get_conn()
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO teams(team_name) VALUES (?)",
+            [(name,) for name in dict.fromkeys(a["team_name"] for a in accounts)],
+        )
+        team_ids = dict(conn.execute("SELECT team_name, team_id FROM teams").fetchall())
+        conn.executemany(
+            """
+            INSERT INTO users(name, username, password_hash, team_id, role)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(username) DO UPDATE SET
+                name = excluded.name,
+                password_hash = excluded.password_hash,
+                team_id = excluded.team_id,
+                role = excluded.role
+            """,
+            [
+                (a["name"], a["username"], pw_hash, team_ids[a["team_name"]], a["role"])
+                for a, pw_hash in zip(accounts, hashes)
+            ],
+        )
+    conn.close()
+    return len(accounts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--file", help="CSV of team_name, name, username, password[, role]")
+    source.add_argument("--synthetic", type=int, metavar="N", help="create N load-test teams")
+    parser.add_argument("--start", type=int, default=1, help="first synthetic team number")
+    parser.add_argument(
+        "--password",
+        default=os.environ.get("LOAD_TEST_PASSWORD"),
+        help="password for every synthetic captain (default: $LOAD_TEST_PASSWORD)",
+    )
+    parser.add_argument("--rounds", type=int, default=BCRYPT_ROUNDS, help="bcrypt cost")
+    parser.add_argument("--workers", type=int, help="hashing processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    if args.file:
+        accounts = read_accounts(args.file)
+    elif args.synthetic:
+        if not args.password:
+            parser.error("--synthetic needs --password or LOAD_TEST_PASSWORD")
+        accounts = synthetic_accounts(args.synthetic, args.password, args.start)
+    else:
+        seed()
+        return
+
+    count = provision(accounts, rounds=args.rounds, workers=args.workers)
+    print(f"Provisioned {count} account(s) across {len({a['team_name'] for a in accounts})} team(s).")
+
+
 if __name__ == "__main__":
-    seed()
+    main()
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+# ---------- Outcome model ----------
+# Each PA ends in one of these; Out covers outs in play, DPs and TPs.
+SIM_OUTCOMES = ["1B", "2B", "3B", "HR", "BB", "K", "Out"]
+N_OUTCOMES = len(SIM_OUTCOMES)
+
+INNINGS = 6
+
+# Base state is a bitmask: 1 = runner on 1B, 2 = on 2B, 4 = on 3B.
+N_BASE_STATES = 8
+
+
+def _advance(bases: int, hit_bases: int):
+    """Runners and batter all move hit_bases; returns (new_bases, runs)."""
+    runners = [b + 1 for b in range(3) if bases & (1 << b)] + [0]
+    new_bases, runs = 0, 0
+    for base in runners:
+        dest = base + hit_bases
+        if dest >= 4:
+            runs += 1
+        else:
+            new_bases |= 1 << (dest - 1)
+    return new_bases, runs
+
+
+def _walk(bases: int):
+    """Batter to first; only forced runners move."""
+    if not bases & 1:
+        return bases | 1, 0
+    if not bases & 2:
+        return bases | 3, 0
+    if not bases & 4:
+        return 7, 0
+    return 7, 1
+
+
+def _build_transitions():
+    next_bases = np.zeros((N_BASE_STATES, N_OUTCOMES), dtype=np.int8)
+    runs = np.zeros((N_BASE_STATES, N_OUTCOMES), dtype=np.int8)
+    outs = np.zeros(N_OUTCOMES, dtype=np.int8)
+    for bases in range(N_BASE_STATES):
+        for code, name in enumerate(SIM_OUTCOMES):
+            if name in ("1B", "2B", "3B", "HR"):
+                nb, r = _advance(bases, "1B 2B 3B HR".split().index(name) + 1)
+            elif name == "BB":
+                nb, r = _walk(bases)
+            else:
+                nb, r = bases, 0
+                outs[code] = 1
+            next_bases[bases, code] = nb
+            runs[bases, code] = r
+    return next_bases, runs, outs
+
+
+# NEXT_BASES[bases, outcome], RUNS[bases, outcome], OUTS[outcome]
+NEXT_BASES, RUNS, OUTS = _build_transitions()
+
+
+def outcome_probabilities(
+    stats_df: pd.DataFrame, prior_pa: float = 10.0, key: str = "Player"
+) -> pd.DataFrame:
+    """
+    Per-player outcome distribution from build_stats rows, indexed by the
+    key column (Player, or player_id for player_stats.csv frames).
+
+    Each player's counts are blended with the team-wide rates using prior_pa
+    pseudo plate appearances, so a hitter with two PAs isn't simulated as
+    a 1.000 hitter.
+    """
+    counts = stats_df.set_index(key)[["PA", "1B", "2B", "3B", "HR", "BB", "K"]]
+    counts = counts.astype(float)
+    counts["Out"] = (
+        counts["PA"] - counts[["1B", "2B", "3B", "HR", "BB", "K"]].sum(axis=1)
+    ).clip(lower=0)
+    events = counts[SIM_OUTCOMES]
+
+    team = events.sum(axis=0)
+    team_rates = (team / team.sum()).to_numpy() if team.sum() > 0 else np.full(
+        N_OUTCOMES, 1.0 / N_OUTCOMES
+    )
+
+    blended = events.to_numpy() + prior_pa * team_rates
+    probs = blended / blended.sum(axis=1, keepdims=True)
+    return pd.DataFrame(probs, index=events.index, columns=SIM_OUTCOMES)
+
+
+# ---------- Simulation ----------
+def simulate_runs(
+    lineup_probs: np.ndarray,
+    n_games: int = 100_000,
+    innings: int = INNINGS,
+    seed=None,
+    max_runs_per_inning: int = None,
+) -> np.ndarray:
+    """
+    Runs scored in each of n_games simulated games for one batting order.
+
+    lineup_probs is (n_batters, N_OUTCOMES) in batting order. All games
+    advance together one PA at a time as NumPy arrays; games whose half
+    inning is over drop out of the active set, so there is no per-game or
+    per-PA Python work. Returns an int array of length n_games.
+    """
+    rng = np.random.default_rng(seed)
+    lineup_probs = np.asarray(lineup_probs, dtype=float)
+    n_batters = len(lineup_probs)
+    cdf = np.cumsum(lineup_probs, axis=1)
+    cdf[:, -1] = 1.0
+
+    total_runs = np.zeros(n_games, dtype=np.int32)
+    batter = np.zeros(n_games, dtype=np.int32)
+
+    for _ in range(innings):
+        idx = np.arange(n_games)
+        outs = np.zeros(n_games, dtype=np.int8)
+        bases = np.zeros(n_games, dtype=np.int8)
+        inning_runs = np.zeros(n_games, dtype=np.int32)
+
+        while idx.size:
+            b = batter[idx]
+            u = rng.random(idx.size)
+            outcome = (u[:, None] > cdf[b]).sum(axis=1)
+
+            r = RUNS[bases, outcome]
+            if max_runs_per_inning is not None:
+                r = np.minimum(r, max_runs_per_inning - inning_runs[idx])
+            inning_runs[idx] += r
+            bases = NEXT_BASES[bases, outcome]
+            outs = outs + OUTS[outcome]
+            batter[idx] = (b + 1) % n_batters
+
+            alive = outs < 3
+            if max_runs_per_inning is not None:
+                alive &= inning_runs[idx] < max_runs_per_inning
+            idx, outs, bases = idx[alive], outs[alive], bases[alive]
+
+        total_runs += inning_runs
+
+    return total_runs
+
+
+def run_distribution(runs: np.ndarray) -> pd.Series:
+    """Share of games ending with each run total."""
+    counts = np.bincount(runs)
+    return pd.Series(counts / counts.sum(), name="share").rename_axis("runs")
+
+
+def win_probability(runs: np.ndarray, opp_runs_profile, seed=None) -> dict:
+    """
+    Pair every simulated game with an opponent score drawn from the
+    empirical runs-allowed profile (past opp_runs values).
+    """
+    profile = np.asarray(opp_runs_profile, dtype=np.int32)
+    if profile.size == 0:
+        return {}
+    rng = np.random.default_rng(seed)
+    opp = profile[rng.integers(0, profile.size, runs.size)]
+    return {
+        "win": float(np.mean(runs > opp)),
+        "tie": float(np.mean(runs == opp)),
+        "loss": float(np.mean(runs < opp)),
+    }
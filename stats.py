@@ -0,0 +1,389 @@
+import numpy as np
+import pandas as pd
+
+import metrics
+
+STATS_COLUMNS = [
+    "player_id",
+    "first_name",
+    "last_name",
+    "jersey_number",
+    "PA",
+    "AB",
+    "H",
+    "1B",
+    "2B",
+    "3B",
+    "HR",
+    "BB",
+    "K",
+    "RBI",
+    "AVG",
+    "OBP",
+    "SLG",
+]
+
+COUNT_COLUMNS = ["PA", "AB", "H", "1B", "2B", "3B", "HR", "BB", "K"]
+
+# ---------- Outcome codes ----------
+# Code 0 is anything we don't recognise: it counts as a PA and nothing else.
+OUTCOMES = [
+    "Other",
+    "Single",
+    "Double",
+    "Triple",
+    "Home Run",
+    "Walk",
+    "Strikeout",
+    "Out",
+    "Double Play",
+    "Triple Play",
+]
+OUTCOME_CODES = {name: code for code, name in enumerate(OUTCOMES)}
+
+# OUTCOME_EFFECTS[code] -> increments for COUNT_COLUMNS
+OUTCOME_EFFECTS = np.array(
+    [
+        # PA AB  H 1B 2B 3B HR BB  K
+        [1, 0, 0, 0, 0, 0, 0, 0, 0],  # Other
+        [1, 1, 1, 1, 0, 0, 0, 0, 0],  # Single
+        [1, 1, 1, 0, 1, 0, 0, 0, 0],  # Double
+        [1, 1, 1, 0, 0, 1, 0, 0, 0],  # Triple
+        [1, 1, 1, 0, 0, 0, 1, 0, 0],  # Home Run
+        [1, 0, 0, 0, 0, 0, 0, 1, 0],  # Walk
+        [1, 1, 0, 0, 0, 0, 0, 0, 1],  # Strikeout
+        [1, 1, 0, 0, 0, 0, 0, 0, 0],  # Out
+        [1, 1, 0, 0, 0, 0, 0, 0, 0],  # Double Play
+        [1, 1, 0, 0, 0, 0, 0, 0, 0],  # Triple Play
+    ],
+    dtype=np.int64,
+)
+
+
+def encode_outcomes(outcomes: pd.Series) -> np.ndarray:
+    return outcomes.map(OUTCOME_CODES).fillna(0).to_numpy(dtype=np.int64)
+
+
+def empty_stats_df() -> pd.DataFrame:
+    return pd.DataFrame(columns=STATS_COLUMNS)
+
+
+def add_rate_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """Fill AVG / OBP / SLG column-wise from the counting stats."""
+    ab = df["AB"].to_numpy(dtype=float)
+    pa = df["PA"].to_numpy(dtype=float)
+    hits = df["H"].to_numpy(dtype=float)
+    walks = df["BB"].to_numpy(dtype=float)
+    total_bases = (
+        df["1B"].to_numpy(dtype=float)
+        + 2 * df["2B"].to_numpy(dtype=float)
+        + 3 * df["3B"].to_numpy(dtype=float)
+        + 4 * df["HR"].to_numpy(dtype=float)
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["AVG"] = np.where(ab > 0, hits / ab, 0.0)
+        df["OBP"] = np.where(pa > 0, (hits + walks) / pa, 0.0)
+        df["SLG"] = np.where(ab > 0, total_bases / ab, 0.0)
+    return df
+
+
+@metrics.timed
+def compute_player_stats(log_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Season (or single-game) batting lines from a PA log in one pass:
+    outcomes become integer codes, player ids become group ids, and every
+    counting stat is a bincount over the group ids. Names and jersey come
+    from each player's first row, so pass a log joined to current names.
+    """
+    if log_df.empty:
+        return empty_stats_df()
+
+    group_ids, player_ids = pd.factorize(log_df["player_id"])
+    n_players = len(player_ids)
+
+    effects = OUTCOME_EFFECTS[encode_outcomes(log_df["outcome"])]
+    rbis = (
+        pd.to_numeric(log_df.get("rbis", pd.Series(0, index=log_df.index)), errors="coerce")
+        .fillna(0)
+        .clip(0, 4)
+        .to_numpy(dtype=np.int64)
+    )
+
+    first_rows = pd.Series(group_ids).drop_duplicates().index
+    out = pd.DataFrame(
+        {
+            "player_id": np.asarray(player_ids, dtype=np.int64),
+            "first_name": log_df["first_name"].fillna("").astype(str).to_numpy()[first_rows],
+            "last_name": log_df["last_name"].fillna("").astype(str).to_numpy()[first_rows],
+            "jersey_number": pd.to_numeric(log_df["jersey_number"], errors="coerce")
+            .fillna(0)
+            .astype(int)
+            .to_numpy()[first_rows],
+        }
+    )
+    for i, col in enumerate(COUNT_COLUMNS):
+        out[col] = np.bincount(group_ids, weights=effects[:, i], minlength=n_players).astype(int)
+    out["RBI"] = np.bincount(group_ids, weights=rbis, minlength=n_players).astype(int)
+
+    return add_rate_stats(out)[STATS_COLUMNS]
+
+
+def pa_delta(outcome: str, rbis: int) -> dict:
+    """Counting-stat increments for one plate appearance."""
+    effect = OUTCOME_EFFECTS[OUTCOME_CODES.get(outcome, 0)]
+    delta = {col: int(inc) for col, inc in zip(COUNT_COLUMNS, effect)}
+    # RBIs (cap at 4 for safety)
+    delta["RBI"] = max(0, min(4, int(rbis)))
+    return delta
+
+
+@metrics.timed
+def apply_pa_delta(
+    stats_df: pd.DataFrame,
+    player: dict,
+    delta: dict,
+    sign: int = 1,
+) -> pd.DataFrame:
+    """
+    Add (sign=1) or take back (sign=-1) one PA's delta and recompute
+    AVG/OBP/SLG. stats_df is indexed by player_id; player needs player_id,
+    first_name, last_name and jersey_number.
+    """
+    pid = int(player["player_id"])
+
+    if pid not in stats_df.index:
+        if sign < 0:
+            return stats_df
+        new_row = {col: 0 for col in STATS_COLUMNS[1:]}
+        new_row.update(
+            {
+                "first_name": player["first_name"],
+                "last_name": player["last_name"],
+                "jersey_number": int(player["jersey_number"]),
+                "AVG": 0.0,
+                "OBP": 0.0,
+                "SLG": 0.0,
+            }
+        )
+        stats_df.loc[pid] = new_row
+
+    for col, inc in delta.items():
+        stats_df.at[pid, col] += sign * inc
+
+    # Recalculate AVG / OBP / SLG
+    AB = stats_df.at[pid, "AB"]
+    PA = stats_df.at[pid, "PA"]
+    H = stats_df.at[pid, "H"]
+    BB = stats_df.at[pid, "BB"]
+    total_bases = (
+        stats_df.at[pid, "1B"]
+        + 2 * stats_df.at[pid, "2B"]
+        + 3 * stats_df.at[pid, "3B"]
+        + 4 * stats_df.at[pid, "HR"]
+    )
+    stats_df.at[pid, "AVG"] = H / AB if AB > 0 else 0.0
+    stats_df.at[pid, "OBP"] = (H + BB) / PA if PA > 0 else 0.0
+    stats_df.at[pid, "SLG"] = total_bases / AB if AB > 0 else 0.0
+
+    # A player whose only PA was just undone drops out of the table
+    if sign < 0 and stats_df.at[pid, "PA"] <= 0:
+        stats_df = stats_df.drop(index=pid)
+
+    return stats_df
+
+
+def update_player_stats(
+    stats_df: pd.DataFrame,
+    player: dict,
+    outcome: str,
+    rbis: int,
+) -> pd.DataFrame:
+    """Update counting stats for a single PA and recompute AVG/OBP/SLG."""
+    return apply_pa_delta(stats_df, player, pa_delta(outcome, rbis))
+
+
+# ---------- Season totals (ltp_2025 CSV) ----------
+SEASON_TOTAL_COLUMNS = ["PA", "1B", "2B", "3B", "HR", "BB", "K"]
+
+
+@metrics.timed
+def upsert_season_totals(season_df: pd.DataFrame, game_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add one game's per-player totals (indexed by player_id, with a Name
+    column) into the season table in a single aligned operation: rows whose
+    player_id matches get the game's counts added and the player's current
+    Name, unseen players are appended as new rows. Name is only displayed;
+    two players can share one.
+    """
+    season_df = season_df.copy()
+    if "player_id" not in season_df.columns:
+        season_df.insert(0, "player_id", pd.NA)
+    for col in ["Name"] + SEASON_TOTAL_COLUMNS:
+        if col not in season_df.columns:
+            season_df[col] = 0
+    season_df["player_id"] = pd.to_numeric(season_df["player_id"], errors="coerce").astype("Int64")
+
+    # Row of game_df for each season row (-1: didn't play)
+    pos = game_df.index.get_indexer(season_df["player_id"].to_numpy(dtype=float, na_value=np.nan))
+    played = pos >= 0
+
+    totals = (
+        season_df[SEASON_TOTAL_COLUMNS].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(copy=True)
+    )
+    totals[played] += game_df[SEASON_TOTAL_COLUMNS].to_numpy()[pos[played]]
+    season_df[SEASON_TOTAL_COLUMNS] = totals.astype(np.int64)
+
+    names = season_df["Name"].to_numpy(dtype=object, copy=True)
+    names[played] = game_df["Name"].to_numpy(dtype=object)[pos[played]]
+    season_df["Name"] = names
+
+    unseen = np.ones(len(game_df), dtype=bool)
+    unseen[pos[played]] = False
+    if unseen.any():
+        new_rows = game_df.loc[unseen, ["Name"] + SEASON_TOTAL_COLUMNS]
+        season_df = pd.concat(
+            [season_df, new_rows.rename_axis("player_id").reset_index()], ignore_index=True
+        )
+    return season_df
+
+
+# ---------- Basic Stats leaderboard ----------
+LEADERBOARD_COLUMNS = [
+    "Player",
+    "Jersey",
+    "G",
+    "PA",
+    "AB",
+    "R",
+    "H",
+    "1B",
+    "2B",
+    "3B",
+    "HR",
+    "RBI",
+    "BB",
+    "K",
+    "AVG",
+    "OBP",
+    "SLG",
+    "OPS",
+]
+
+# Leaderboard outcome buckets; anything else is just a PA
+_LEADERBOARD_BUCKETS = {
+    "Single": 0,
+    "Double": 1,
+    "Triple": 2,
+    "Home Run": 3,
+    "Walk": 4,
+    "Strikeout": 5,
+    "Strikeout Looking": 5,
+}
+_N_BUCKETS = 7
+
+
+@metrics.timed
+def build_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Season leaderboard from a PA log with a player_name column. Logs that
+    carry player_id keep it as a column, so rows can be looked up by id.
+
+    Players and outcome buckets are factorized to integers and the whole
+    player x outcome table comes from one bincount (a crosstab without the
+    pandas overhead); games played is a count of distinct (player, game) keys,
+    by game_id when the log has it and (game_date, opponent) otherwise.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=LEADERBOARD_COLUMNS)
+
+    if "player_id" in df.columns:
+        # One row per player id, named after the player's first PA
+        player_idx, ids = pd.factorize(df["player_id"])
+        n = len(ids)
+        first = pd.Series(player_idx).drop_duplicates()
+        players = np.empty(n, dtype=object)
+        players[first.to_numpy()] = df["player_name"].to_numpy()[first.index]
+    else:
+        player_idx, players = pd.factorize(df["player_name"], sort=True)
+        n = len(players)
+        ids = None
+
+    # Few distinct outcome strings: factorize, then map the uniques only
+    outcome_idx, outcomes = pd.factorize(df["outcome"], use_na_sentinel=False)
+    lookup = np.array(
+        [_LEADERBOARD_BUCKETS.get(o, _N_BUCKETS - 1) for o in outcomes], dtype=np.int64
+    )
+    buckets = lookup[outcome_idx]
+    table = np.bincount(
+        player_idx * _N_BUCKETS + buckets, minlength=n * _N_BUCKETS
+    ).reshape(n, _N_BUCKETS)
+    singles, doubles, triples, homers, walks, strikeouts = (
+        table[:, i] for i in range(6)
+    )
+
+    pa = np.bincount(player_idx, minlength=n)
+    hits = singles + doubles + triples + homers
+    ab = pa - walks
+
+    if "game_id" in df.columns:
+        # A doubleheader is two games with the same date and opponent
+        game_idx, games = pd.factorize(df["game_id"], use_na_sentinel=False)
+        games_per_player = len(games)
+    else:
+        date_idx, dates = pd.factorize(df["game_date"], use_na_sentinel=False)
+        opp_idx, opps = pd.factorize(df["opponent"], use_na_sentinel=False)
+        game_idx = date_idx * len(opps) + opp_idx
+        games_per_player = len(dates) * len(opps)
+    player_games = pd.unique(player_idx.astype(np.int64) * games_per_player + game_idx)
+    games_played = np.bincount(player_games // games_per_player, minlength=n)
+
+    # Jersey from each player's first PA
+    first_rows = pd.Series(player_idx).drop_duplicates()
+    jersey = np.zeros(n, dtype=np.int64)
+    jersey[first_rows.to_numpy()] = df["jersey_number"].to_numpy()[first_rows.index]
+
+    rbis = np.bincount(
+        player_idx, weights=df["rbis"].to_numpy(dtype=float), minlength=n
+    ).astype(np.int64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg = np.where(ab > 0, hits / ab, 0.0)
+        obp = np.where(pa > 0, (hits + walks) / pa, 0.0)
+        total_bases = singles + 2 * doubles + 3 * triples + 4 * homers
+        slg = np.where(ab > 0, total_bases / ab, 0.0)
+    ops = obp + slg
+
+    out = pd.DataFrame(
+        {
+            "Player": np.asarray(players, dtype=object),
+            "Jersey": jersey,
+            "G": games_played,
+            "PA": pa,
+            "AB": ab,
+            "R": np.zeros(n, dtype=np.int64),
+            "H": hits,
+            "1B": singles,
+            "2B": doubles,
+            "3B": triples,
+            "HR": homers,
+            "RBI": rbis,
+            "BB": walks,
+            "K": strikeouts,
+            # Python round (one call per player) to match the old per-row rounding
+            "AVG": [round(x, 3) for x in avg],
+            "OBP": [round(x, 3) for x in obp],
+            "SLG": [round(x, 3) for x in slg],
+            "OPS": [round(x, 3) for x in ops],
+        }
+    )
+
+    if ids is not None:
+        out.insert(0, "player_id", np.asarray(ids, dtype=np.int64))
+
+    # Ties keep name order, as the old groupby("player_name") loop did
+    out = out.sort_values("Player", kind="stable")
+    return out.sort_values(
+        by=["OPS", "AVG", "H"],
+        ascending=False,
+    ).reset_index(drop=True)
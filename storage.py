@@ -0,0 +1,128 @@
+"""
+Per-team locations for the plain-text files kept beside the database.
+
+Each team gets its own directory under data/teams/<team_id>/, so one team's
+writes never touch another's files and a page load only reads its own team's
+copy, however many teams share the install.
+
+Files are replaced whole with write_csv() (temp file + rename), so a reader
+sees either the old file or the new one, never a torn one, and never waits.
+Writers that read-modify-write hold locked(path): an exclusive lock on that
+one file, across threads and processes, so sessions writing different
+files never queue behind each other.
+"""
+import contextlib
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import db
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks only cover this process
+    fcntl = None
+
+DATA_DIR = Path(os.environ.get("LTP_DATA_DIR", "data"))
+
+GAME_LOG = "gameday_log.csv"            # PA log export (game_log.py), never kept in step
+PLAYER_STATS = "player_stats.csv"
+SEASON_TOTALS = "season_totals.csv"     # per-player season hitting (was the ltp_2025 CSV)
+
+# Where the single-team app kept these, at the top of the checkout. They are
+# copied into the directory of the team that imported the legacy CSVs.
+LEGACY_PATHS = {
+    PLAYER_STATS: Path("player_stats.csv"),
+    SEASON_TOTALS: Path("ltp_2025 1(in).csv"),
+}
+
+# ---------- Atomic, locked writes ----------
+_file_locks = {}
+_file_locks_lock = threading.Lock()
+
+
+def temp_path(path: Path) -> Path:
+    """Unique name beside path, so concurrent writers never share a temp file."""
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+@contextlib.contextmanager
+def locked(path):
+    """
+    Exclusive lock on one data file for a read-modify-write. Advisory: only
+    writers take it. A sidecar .lock file carries the cross-process flock,
+    since the data file itself is swapped out by every write.
+    """
+    path = Path(path)
+    key = path.resolve()
+    with _file_locks_lock:
+        thread_lock = _file_locks.setdefault(key, threading.Lock())
+
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path.with_name(f".{path.name}.lock"), "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def write_csv(df, path, **to_csv_kwargs) -> None:
+    """Write df to a temp file beside path, fsync it and rename it over path."""
+    path = Path(path)
+    tmp = temp_path(path)
+    try:
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            df.to_csv(f, **to_csv_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+# ---------- Team files ----------
+# Paths already created/adopted in this process (DATA_DIR can be repointed)
+_ready = set()
+_lock = threading.Lock()
+
+
+def team_dir(team_id: int) -> Path:
+    return DATA_DIR / "teams" / str(int(team_id))
+
+
+def _adopt_legacy(team_id: int, name: str, path: Path) -> None:
+    legacy = LEGACY_PATHS.get(name)
+    if legacy is None or not legacy.exists():
+        return
+    if db.legacy_import_team() != team_id:
+        return
+    with locked(path):
+        tmp = temp_path(path)
+        shutil.copy2(legacy, tmp)
+        os.replace(tmp, path)
+
+
+def team_file(team_id: int, name: str) -> Path:
+    """
+    Path of one of a team's files (PLAYER_STATS, SEASON_TOTALS, GAME_LOG).
+    The directory is created on first use; the file itself may not exist yet.
+    """
+    team_id = int(team_id)
+    path = team_dir(team_id) / name
+    if path in _ready:
+        return path
+
+    with _lock:
+        if path not in _ready:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if not path.exists():
+                _adopt_legacy(team_id, name, path)
+            _ready.add(path)
+    return path
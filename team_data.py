@@ -0,0 +1,215 @@
+"""
+Per-team data paths shared by the pages and benchmarks/suite.py.
+
+Roster and season-log loaders, the plate-appearance write and undo path,
+and the updates to the team's stats files under data/teams/<team_id>/. Every
+function takes the team_id and none of them touch Streamlit, so the
+benchmarks time exactly what the pages run.
+"""
+import pandas as pd
+
+import cache
+import db
+import metrics
+import stats
+import storage
+
+
+# ---------- Roster ----------
+@metrics.timed
+@cache.by_revision(max_teams=64, version=db.roster_revision)
+def load_roster(team_id: int) -> pd.DataFrame:
+    df = db.fetch_players(team_id)
+
+    df["first_name"] = df["first_name"].astype(str).str.strip()
+    df["last_name"] = df["last_name"].astype(str).str.strip()
+    df["jersey_number"] = (
+        pd.to_numeric(df["jersey_number"], errors="coerce").fillna(0).astype(int)
+    )
+
+    df["display_name"] = (
+        df["first_name"]
+        + " "
+        + df["last_name"]
+        + " (#"
+        + df["jersey_number"].astype(str)
+        + ")"
+    )
+    return df
+
+
+# ---------- Season log (Basic Stats) ----------
+@metrics.timed
+@cache.by_revision(max_teams=64)
+def load_current_season_log(team_id: int) -> pd.DataFrame:
+    """Only include plate appearances tied to games in season history."""
+    merged = db.fetch_season_plate_appearances(team_id)
+    if merged.empty:
+        return pd.DataFrame()
+
+    merged["game_date"] = merged["game_date"].fillna("").astype(str)
+    merged["opponent"] = merged["opponent"].fillna("").astype(str).str.strip()
+    merged["first_name"] = merged["first_name"].fillna("").astype(str).str.strip()
+    merged["last_name"] = merged["last_name"].fillna("").astype(str).str.strip()
+    merged["player_name"] = (merged["first_name"] + " " + merged["last_name"]).str.strip()
+    merged["outcome"] = merged["outcome"].fillna("").astype(str).str.strip()
+    merged["rbis"] = pd.to_numeric(merged["rbis"], errors="coerce").fillna(0).astype(int)
+    merged["jersey_number"] = pd.to_numeric(merged["jersey_number"], errors="coerce").fillna(0).astype(int)
+
+    return merged
+
+
+# ---------- Season stats file ----------
+# Stats files already checked for the player_id format in this process
+_stats_ready = set()
+
+
+def _rebuild_player_stats(team_id: int, path) -> None:
+    log_df = db.fetch_plate_appearances(team_id)
+    storage.write_csv(stats.compute_player_stats(log_df), path, index=False)
+
+
+def prepare_player_stats(team_id: int) -> None:
+    """
+    One-time setup of the team's stats file: built from the team's log if it
+    doesn't exist yet, or rebuilt if it was written before player ids
+    existed. Pages call this on load, before any PA is written, so the write
+    path only ever applies deltas.
+    """
+    path = storage.team_file(team_id, storage.PLAYER_STATS)
+    if path in _stats_ready:
+        return
+
+    with storage.locked(path):
+        if not path.exists() or "player_id" not in pd.read_csv(path, nrows=0).columns:
+            _rebuild_player_stats(team_id, path)
+    _stats_ready.add(path)
+
+
+@metrics.timed
+def load_player_stats(team_id: int) -> pd.DataFrame:
+    """Season stats indexed by player_id (see prepare_player_stats)."""
+    path = storage.team_file(team_id, storage.PLAYER_STATS)
+    return pd.read_csv(path).set_index("player_id")
+
+
+@metrics.timed
+def save_player_stats(team_id: int, df: pd.DataFrame) -> None:
+    path = storage.team_file(team_id, storage.PLAYER_STATS)
+    storage.write_csv(df.reset_index()[stats.STATS_COLUMNS], path, index=False)
+
+
+def _bump_player_stats(team_id: int, event: dict, delta: dict, sign: int = 1) -> None:
+    """Apply one PA's delta to the season stats file; caller holds its lock."""
+    season_stats = stats.apply_pa_delta(load_player_stats(team_id), event, delta, sign=sign)
+    save_player_stats(team_id, season_stats)
+
+
+@metrics.timed
+def recompute_stats_from_log(team_id: int) -> None:
+    path = storage.team_file(team_id, storage.PLAYER_STATS)
+    with storage.locked(path):
+        _rebuild_player_stats(team_id, path)
+
+
+# ---------- Plate appearances ----------
+@metrics.timed
+def append_game_log(team_id: int, event: dict, journal: tuple = None) -> tuple:
+    """
+    Store a PA in the database and add it to the season stats. Returns
+    (record, seq): an undo record with the row's pa_id and the stat delta it
+    applied, and the journal entry's sequence number.
+
+    journal is the live game's (live_game_id, payload) for the play; the
+    record goes in payload["pa"] and the entry is written in the same
+    transaction as the PA. Without it, seq is None.
+    """
+    # The stats lock spans the insert, so a rebuild from the log (a new
+    # team's first PA, or a game deleted elsewhere) can't count it twice
+    path = storage.team_file(team_id, storage.PLAYER_STATS)
+    with storage.locked(path):
+        if not path.exists():
+            _rebuild_player_stats(team_id, path)
+        delta = stats.pa_delta(event["outcome"], event["rbis"])
+        record = {"pa_id": None, "event": event, "delta": delta}
+        if journal is None:
+            record["pa_id"] = db.insert_plate_appearance(team_id, event)
+            seq = None
+        else:
+            live_game_id, payload = journal
+            payload["pa"] = record
+            _, seq = db.insert_journaled_plate_appearance(team_id, event, live_game_id, payload)
+        _bump_player_stats(team_id, event, delta)
+    return record, seq
+
+
+@metrics.timed
+def undo_game_log(team_id: int, pa: dict, live_game_id: int = None):
+    """
+    Take back one logged PA by subtracting its delta; no log replay. With a
+    live_game_id the game's "undo" journal entry is written in the same
+    transaction as the delete, and its sequence number is returned.
+    """
+    event = pa["event"]
+    path = storage.team_file(team_id, storage.PLAYER_STATS)
+    with storage.locked(path):
+        if not path.exists():
+            _rebuild_player_stats(team_id, path)
+        if live_game_id is None:
+            db.delete_plate_appearance(team_id, pa["pa_id"])
+            seq = None
+        else:
+            seq = db.delete_journaled_plate_appearance(team_id, pa["pa_id"], live_game_id)
+        _bump_player_stats(team_id, event, pa["delta"], sign=-1)
+    return seq
+
+
+# ---------- Box scores ----------
+@metrics.timed
+def build_box_score(team_id: int, game_id: int) -> None:
+    """
+    Materialize a game's box score from its PAs. Runs when a game is saved
+    or edited, so Season History only ever reads them.
+    """
+    game_events = db.fetch_plate_appearances(team_id, game_id)
+    db.save_box_score(team_id, game_id, stats.compute_player_stats(game_events))
+
+
+# ---------- Season totals (2025 CSV) ----------
+def _season_totals_ids(df: pd.DataFrame, names: dict) -> pd.Series:
+    """
+    player_id for each row of a totals file written before it had one. Only
+    names that belong to exactly one player are matched; the rest keep their
+    counts but are never merged into again.
+    """
+    by_name = pd.Series(list(names), index=list(names.values()), dtype="Int64")
+    unique = by_name[~by_name.index.duplicated(keep=False)]
+    return df["Name"].astype(str).str.strip().map(unique).astype("Int64")
+
+
+@metrics.timed
+def merge_game_stats_into_2025(team_id: int, game_stats: dict) -> None:
+    """Merge one game's per-player stats into the season totals CSV (called at End Game)."""
+    if not game_stats:
+        return
+
+    # One frame for the whole game, keyed by player_id; Name is for display
+    names = db.player_names(team_id)
+    game_df = pd.DataFrame.from_dict(game_stats, orient="index")
+    game_df["Name"] = [names.get(pid, "") for pid in game_df.index]
+
+    # Two devices on one team can end a game at the same moment; hold the file
+    # from read to swap so neither merge is lost
+    path = storage.team_file(team_id, storage.SEASON_TOTALS)
+    with storage.locked(path):
+        if path.exists():
+            try:
+                df = pd.read_csv(path)
+            except UnicodeDecodeError:
+                df = pd.read_csv(path, encoding="latin1")
+            if "player_id" not in df.columns:
+                df.insert(0, "player_id", _season_totals_ids(df, names))
+        else:
+            df = pd.DataFrame(columns=["player_id", "Name"] + stats.SEASON_TOTAL_COLUMNS)
+        df = stats.upsert_season_totals(df, game_df)
+        storage.write_csv(df, path, index=False)
@@ -0,0 +1,89 @@
+import pytest
+
+import db
+import game_state
+import storage
+import team_data
+
+LAST_NAMES = ["Adams", "Baker", "Cruz", "Diaz", "Evans", "Fox", "Gray", "Hill", "Ito"]
+
+
+@pytest.fixture
+def team_id(tmp_path, monkeypatch):
+    """A team with a nine-player roster, in a scratch database and data directory."""
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "app.db")
+    monkeypatch.setattr(storage, "DATA_DIR", tmp_path)
+    db.init_db()
+
+    conn = db.get_conn()
+    with conn:
+        team_id = conn.execute("INSERT INTO teams(team_name) VALUES ('Test Team')").lastrowid
+    conn.close()
+    for jersey, last in enumerate(LAST_NAMES, start=1):
+        db.add_player(team_id, "Pat", last, jersey)
+
+    team_data.prepare_player_stats(team_id)
+    return team_id
+
+
+@pytest.fixture
+def start_game(team_id):
+    """Start a live game the way the Gameday page does; returns its GameState."""
+
+    def start(game_date="2025-06-01", opponent="Sharks"):
+        state = game_state.GameState()
+        lineup = db.fetch_players(team_id)["player_id"].tolist()
+        game_state.start(
+            state,
+            team_id,
+            {"game_date": game_date, "opponent": opponent, "ltp_role": "Away", "lineup": lineup},
+        )
+        return state
+
+    return start
+
+
+@pytest.fixture
+def play_pa(team_id):
+    """
+    Record the current batter's PA the way the Gameday page does: store it
+    with its journal entry and update the season stats, then apply it.
+    """
+    roster = db.fetch_players(team_id).set_index("player_id")
+
+    def play(state, outcome, rbis=0, outs_added=0):
+        player_id = state.lineup[state.batter_index]
+        player = roster.loc[player_id]
+        event = {
+            "timestamp": "2025-06-01T19:00:00",
+            "live_game_id": state.live_game_id,
+            "game_date": state.game_date,
+            "opponent": state.opponent,
+            "inning": state.inning,
+            "half": state.half,
+            "player_id": int(player_id),
+            "first_name": player["first_name"],
+            "last_name": player["last_name"],
+            "jersey_number": int(player["jersey_number"]),
+            "outcome": outcome,
+            "rbis": rbis,
+        }
+        payload = {"outs_added": outs_added, "runs_scored": rbis, "bases": {}, "last_play": outcome}
+        _, seq = team_data.append_game_log(team_id, event, (state.live_game_id, payload))
+        game_state.dispatch(state, "pa", payload, seq=seq)
+
+    return play
+
+
+@pytest.fixture
+def undo(team_id):
+    """Take back the last play the way the Gameday page's Undo button does."""
+
+    def undo(state):
+        if state.last_pa is not None:
+            seq = team_data.undo_game_log(team_id, state.last_pa, state.live_game_id)
+            game_state.dispatch(state, "undo", seq=seq)
+        else:
+            game_state.dispatch(state, "undo")
+
+    return undo
@@ -0,0 +1,79 @@
+import db
+import game_state
+import team_data
+
+GAME_DAY = "2025-06-01"
+
+
+def end_game(team_id, game) -> int:
+    """Save a live game the way End Game does and return its game_id."""
+    ltp, opp = game.totals()
+    record = {
+        "date": game.game_date,
+        "opponent": game.opponent,
+        "ltp_runs": ltp,
+        "opp_runs": opp,
+        "result": "W" if ltp > opp else "L" if ltp < opp else "T",
+        "ltp_role": game.ltp_role,
+    }
+    game_id = db.insert_game(team_id, record, game.live_game_id)
+    game_state.finish(game, "ended")
+    team_data.build_box_score(team_id, game_id)
+    return game_id
+
+
+def box_pa(team_id, game_id) -> int:
+    return int(db.fetch_box_score(team_id, game_id)["PA"].sum())
+
+
+def doubleheader(team_id, start_game, play_pa):
+    """A discarded game, then two saved games, all on one date against one opponent."""
+    discarded = start_game(GAME_DAY, "Sharks")
+    play_pa(discarded, "Home Run", rbis=1)
+    game_state.finish(discarded, "discarded")
+
+    first = start_game(GAME_DAY, "Sharks")
+    for outcome in ["Single", "Walk", "Strikeout"]:
+        play_pa(first, outcome)
+    first_id = end_game(team_id, first)
+
+    second = start_game(GAME_DAY, "Sharks")
+    for outcome in ["Double", "Out"]:
+        play_pa(second, outcome)
+    second_id = end_game(team_id, second)
+    return first_id, second_id
+
+
+def test_each_game_of_a_doubleheader_gets_only_its_own_pas(team_id, start_game, play_pa):
+    first_id, second_id = doubleheader(team_id, start_game, play_pa)
+
+    assert box_pa(team_id, first_id) == 3
+    assert box_pa(team_id, second_id) == 2
+    # The discarded game's PA never reaches the season log
+    assert len(db.fetch_season_plate_appearances(team_id)) == 5
+
+
+def test_deleting_one_game_of_a_doubleheader_keeps_the_other(team_id, start_game, play_pa):
+    first_id, second_id = doubleheader(team_id, start_game, play_pa)
+
+    db.delete_game(team_id, second_id)
+    team_data.recompute_stats_from_log(team_id)
+
+    assert len(db.fetch_plate_appearances(team_id, first_id)) == 3
+    assert box_pa(team_id, first_id) == 3
+    assert len(db.fetch_season_plate_appearances(team_id)) == 3
+    assert int(team_data.load_player_stats(team_id)["PA"].sum()) == 4   # with the discarded PA
+
+
+def test_editing_one_game_of_a_doubleheader_moves_only_its_pas(team_id, start_game, play_pa):
+    first_id, second_id = doubleheader(team_id, start_game, play_pa)
+
+    db.update_game(team_id, second_id, "2025-06-02", "Marlins", 3, 1, "W")
+    team_data.build_box_score(team_id, second_id)
+
+    first = db.fetch_plate_appearances(team_id, first_id)
+    second = db.fetch_plate_appearances(team_id, second_id)
+    assert set(first["opponent"]) == {"Sharks"} and len(first) == 3
+    assert set(second["opponent"]) == {"Marlins"} and set(second["game_date"]) == {"2025-06-02"}
+    assert box_pa(team_id, first_id) == 3
+    assert box_pa(team_id, second_id) == 2
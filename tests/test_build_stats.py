@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+from benchmarks.build_stats_bench import legacy_build_stats, make_log
+from stats import build_stats
+
+
+@pytest.mark.parametrize("n_pas", [50, 5_000])
+def test_matches_reference_by_player_id(n_pas):
+    df = make_log(n_pas, n_players=40, n_games=30)
+    pd.testing.assert_frame_equal(build_stats(df), legacy_build_stats(df), check_dtype=False)
+
+
+@pytest.mark.parametrize("n_pas", [50, 5_000])
+def test_matches_reference_by_name(n_pas):
+    df = make_log(n_pas, n_players=40, n_games=30).drop(columns=["player_id", "game_id"])
+    pd.testing.assert_frame_equal(build_stats(df), legacy_build_stats(df), check_dtype=False)
+
+
+def test_players_sharing_a_name_keep_their_own_rows():
+    df = make_log(2_000, n_players=40, n_games=30)
+    board = build_stats(df).set_index("player_id")
+
+    assert board.loc[1, "Player"] == board.loc[2, "Player"]
+    for pid in (1, 2):
+        assert board.loc[pid, "PA"] == (df["player_id"] == pid).sum()
+
+
+def test_doubleheader_counts_as_two_games():
+    df = make_log(2_000, n_players=40, n_games=30)
+    board = build_stats(df).set_index("player_id")
+    played = df.groupby("player_id")["game_id"].nunique()
+
+    pd.testing.assert_series_equal(
+        board["G"].sort_index(), played.sort_index(), check_names=False, check_dtype=False
+    )
@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+
+import db
+import game_state
+
+
+def play_innings(game, play_pa, undo, innings: int) -> None:
+    """A few innings of mixed plays, opponent halves and undos."""
+    for inning in range(innings):
+        play_pa(game, "Single")
+        play_pa(game, "Home Run", rbis=2)
+        undo(game)
+        play_pa(game, "Double", rbis=1)
+        for _ in range(3):
+            play_pa(game, "Strikeout", outs_added=1)
+        game_state.dispatch(game, "opp_half", {"runs": inning % 3})
+
+
+def test_resume_replays_the_journal(team_id, start_game, play_pa, undo):
+    game = start_game()
+    play_innings(game, play_pa, undo, innings=2)
+
+    assert game_state.resume(team_id) == game
+
+
+def test_resume_from_a_snapshot_and_the_entries_after_it(team_id, start_game, play_pa, undo):
+    game = start_game()
+    play_innings(game, play_pa, undo, innings=6)   # past SNAPSHOT_EVERY journal entries
+    undo(game)
+
+    assert game_state.resume(team_id) == game
+
+
+def test_undo_after_resume_takes_back_the_same_play(team_id, start_game, play_pa, undo):
+    game = start_game()
+    play_pa(game, "Single")
+    play_pa(game, "Walk")
+
+    resumed = game_state.resume(team_id)
+    undo(game)
+    undo(resumed)
+
+    assert resumed == game
+    assert list(resumed.game_stats) == [game.lineup[0]]
+
+
+def test_finished_game_is_not_resumed(team_id, start_game, play_pa):
+    game = start_game()
+    play_pa(game, "Single")
+    game_state.finish(game, "discarded")
+
+    assert game_state.resume(team_id) is None
+
+
+def test_pa_is_not_stored_without_its_journal_entry(team_id, start_game, play_pa, monkeypatch):
+    game = start_game()
+
+    def fail(*args):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(db, "_append_live_event", fail)
+    with pytest.raises(sqlite3.OperationalError):
+        play_pa(game, "Single")
+
+    assert db.fetch_plate_appearances(team_id).empty
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+import db
+import stats
+import team_data
+
+OUTCOMES = ["Single", "Double", "Triple", "Home Run", "Walk", "Strikeout", "Out", "Double Play", "Bunt"]
+
+
+def make_log(n_pas: int, n_players: int = 9, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    player_id = rng.integers(1, n_players + 1, n_pas)
+    return pd.DataFrame(
+        {
+            "player_id": player_id,
+            "first_name": "Player",
+            "last_name": player_id.astype(str),
+            "jersey_number": player_id,
+            "outcome": rng.choice(OUTCOMES, n_pas),
+            "rbis": rng.integers(0, 4, n_pas),
+        }
+    )
+
+
+def assert_same_stats(actual: pd.DataFrame, expected: pd.DataFrame) -> None:
+    """Compare two stats tables indexed by player_id, ignoring row order and dtypes."""
+    cols = stats.STATS_COLUMNS[1:]
+    pd.testing.assert_frame_equal(
+        actual[cols].sort_index(), expected[cols].sort_index(), check_dtype=False, check_names=False
+    )
+
+
+def test_deltas_match_a_rebuild_from_the_log():
+    log = make_log(300)
+    season = stats.empty_stats_df().set_index("player_id")
+    for row in log.to_dict("records"):
+        season = stats.apply_pa_delta(season, row, stats.pa_delta(row["outcome"], row["rbis"]))
+
+    assert_same_stats(season, stats.compute_player_stats(log).set_index("player_id"))
+
+
+def test_undone_deltas_match_a_rebuild_without_those_pas():
+    log = make_log(300, seed=1)
+    season = stats.empty_stats_df().set_index("player_id")
+    for row in log.to_dict("records"):
+        season = stats.apply_pa_delta(season, row, stats.pa_delta(row["outcome"], row["rbis"]))
+
+    undone = log.sample(frac=0.3, random_state=0)
+    for row in undone.to_dict("records"):
+        season = stats.apply_pa_delta(
+            season, row, stats.pa_delta(row["outcome"], row["rbis"]), sign=-1
+        )
+
+    kept = log.drop(index=undone.index)
+    assert_same_stats(season, stats.compute_player_stats(kept).set_index("player_id"))
+
+
+def test_undoing_a_players_only_pa_drops_them():
+    log = make_log(1)
+    row = log.iloc[0].to_dict()
+    delta = stats.pa_delta(row["outcome"], row["rbis"])
+
+    season = stats.apply_pa_delta(stats.empty_stats_df().set_index("player_id"), row, delta)
+    season = stats.apply_pa_delta(season, row, delta, sign=-1)
+
+    assert season.empty
+
+
+def test_stats_file_matches_the_log_after_plays_and_undos(team_id, start_game, play_pa, undo):
+    game = start_game()
+    for i, outcome in enumerate(OUTCOMES * 4):
+        play_pa(game, outcome, rbis=i % 3)
+        if i % 5 == 4:
+            undo(game)
+
+    expected = stats.compute_player_stats(db.fetch_plate_appearances(team_id))
+    assert_same_stats(team_data.load_player_stats(team_id), expected.set_index("player_id"))
@@ -0,0 +1,270 @@
+"""
+Win-probability and leverage lookup table for the Gameday scoreboard.
+
+The table is built offline with `python win_expectancy.py` (optionally
+--team ID to use that team's season outcome rates) and saved as a single
+.npy array, so a rerun only does an index into it. Until it is built the
+scoreboard shows no win probability.
+"""
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+
+from simulator import INNINGS, N_BASE_STATES, NEXT_BASES, OUTS, RUNS, SIM_OUTCOMES
+
+TABLE_PATH = Path("win_prob_table.npy")
+
+# Run differential (home - away) is clamped to +/- MAX_DIFF
+MAX_DIFF = 20
+N_DIFFS = 2 * MAX_DIFF + 1
+N_STATES = 3 * N_BASE_STATES
+HALVES = ["Top", "Bottom"]
+
+# Most runs tracked for the rest of one half-inning; the tail is lumped in
+_MAX_HALF_RUNS = 30
+_MAX_PA_PER_HALF = 60
+
+# Rec-league outcome mix used when no team rates are given
+# (1B, 2B, 3B, HR, BB, K, Out)
+DEFAULT_RATES = np.array([0.22, 0.07, 0.015, 0.03, 0.07, 0.08, 0.515])
+
+
+def _half_inning_runs(rates: np.ndarray):
+    """P(r more runs before the third out | base-out state), as (24, R)."""
+    rates = np.asarray(rates, dtype=float)
+    rates = rates / rates.sum()
+
+    # mass[start, state, runs so far]
+    mass = np.zeros((N_STATES, N_STATES, _MAX_HALF_RUNS + 1))
+    mass[np.arange(N_STATES), np.arange(N_STATES), 0] = 1.0
+    done = np.zeros((N_STATES, _MAX_HALF_RUNS + 1))
+
+    outs = np.arange(N_STATES) // N_BASE_STATES
+    bases = np.arange(N_STATES) % N_BASE_STATES
+
+    for _ in range(_MAX_PA_PER_HALF):
+        stepped = np.zeros_like(mass)
+        for o, p in enumerate(rates):
+            new_outs = outs + OUTS[o]
+            runs = RUNS[bases, o]
+            target = new_outs * N_BASE_STATES + NEXT_BASES[bases, o]
+            for s in range(N_STATES):
+                shifted = np.roll(mass[:, s, :], runs[s], axis=1) * p
+                if runs[s]:
+                    # keep overflow in the top bucket instead of wrapping
+                    shifted[:, -1] += mass[:, s, -runs[s]:].sum(axis=1) * p
+                    shifted[:, : runs[s]] = 0.0
+                if new_outs[s] >= 3:
+                    done += shifted
+                else:
+                    stepped[:, target[s], :] += shifted
+        mass = stepped
+        if mass.sum() < 1e-10:
+            break
+
+    return done
+
+
+def _shift(values: np.ndarray, runs: int, sign: int) -> np.ndarray:
+    """values[d + sign * runs] along the diff axis, clamped at the ends."""
+    idx = np.clip(np.arange(N_DIFFS) + sign * runs, 0, N_DIFFS - 1)
+    return values[..., idx]
+
+
+def _push(mass: np.ndarray, step: int) -> np.ndarray:
+    """Move probability mass step places along the diff axis, piling up at the ends."""
+    if step == 0:
+        return mass.copy()
+    out = np.zeros_like(mass)
+    if step > 0:
+        out[step:] = mass[:-step]
+        out[-1] += mass[-step:].sum()
+    else:
+        out[:step] = mass[-step:]
+        out[0] += mass[:-step].sum()
+    return out
+
+
+def build_table(rates=DEFAULT_RATES, innings: int = INNINGS) -> np.ndarray:
+    """
+    Home win probability and leverage for every game state.
+
+    Returns float32 (2, innings, 2, 3, 8, N_DIFFS): [0] is P(home wins) with
+    ties counted as half a win, [1] the leverage index. Both teams hit with
+    the same outcome rates; a tie after regulation stands.
+    """
+    rates = np.asarray(rates, dtype=float)
+    rates = rates / rates.sum()
+    half_runs = _half_inning_runs(rates)
+
+    wp = np.zeros((innings, 2, N_STATES, N_DIFFS))
+    diffs = np.arange(N_DIFFS) - MAX_DIFF
+    final = np.where(diffs > 0, 1.0, np.where(diffs == 0, 0.5, 0.0))
+
+    # Backwards over half-innings: value at each state is the run
+    # distribution for the rest of the half applied to the next half's start
+    after = final
+    for inning in reversed(range(innings)):
+        for half in (1, 0):
+            sign = 1 if half == 1 else -1  # home bats in the bottom
+            wp[inning, half] = sum(
+                half_runs[:, r, None] * _shift(after, r, sign)[None, :]
+                for r in range(half_runs.shape[1])
+            )
+            after = wp[inning, half, 0]
+
+    # Leverage: expected |WP swing| of the next PA, relative to the average
+    # swing over the states a game actually passes through
+    swing = np.zeros_like(wp)
+    occupancy = np.zeros_like(wp)
+    outs = np.arange(N_STATES) // N_BASE_STATES
+    bases = np.arange(N_STATES) % N_BASE_STATES
+    start = np.zeros(N_DIFFS)
+    start[MAX_DIFF] = 1.0
+
+    for inning in range(innings):
+        for half in (0, 1):
+            sign = 1 if half == 1 else -1
+            if half == 0:
+                next_start = wp[inning, 1, 0]
+            elif inning + 1 < innings:
+                next_start = wp[inning + 1, 0, 0]
+            else:
+                next_start = final
+
+            # (next state or None for third out, runs) for each state/outcome
+            moves = [
+                [
+                    (
+                        None
+                        if outs[s] + OUTS[o] >= 3
+                        else (outs[s] + OUTS[o]) * N_BASE_STATES + NEXT_BASES[bases[s], o],
+                        int(RUNS[bases[s], o]),
+                    )
+                    for o in range(len(rates))
+                ]
+                for s in range(N_STATES)
+            ]
+
+            for s in range(N_STATES):
+                for o, (t, runs) in enumerate(moves[s]):
+                    nxt = _shift(next_start if t is None else wp[inning, half, t], runs, sign)
+                    swing[inning, half, s] += rates[o] * np.abs(nxt - wp[inning, half, s])
+
+            mass = np.zeros((N_STATES, N_DIFFS))
+            mass[0] = start
+            start = np.zeros(N_DIFFS)
+            for _ in range(_MAX_PA_PER_HALF):
+                occupancy[inning, half] += mass
+                stepped = np.zeros_like(mass)
+                for s in np.flatnonzero(mass.sum(axis=1) > 0):
+                    for o, (t, runs) in enumerate(moves[s]):
+                        moved = _push(mass[s], sign * runs) * rates[o]
+                        if t is None:
+                            start += moved
+                        else:
+                            stepped[t] += moved
+                mass = stepped
+                if mass.sum() < 1e-9:
+                    break
+
+    mean_swing = (swing * occupancy).sum() / occupancy.sum()
+    leverage = swing / mean_swing
+
+    table = np.stack([wp, leverage]).reshape(
+        2, innings, 2, 3, N_BASE_STATES, N_DIFFS
+    )
+    return table.astype(np.float32)
+
+
+# ---------- Lookup ----------
+_loaded = {}   # resolved path -> (mtime_ns, table)
+
+
+def load_table(path: Path = TABLE_PATH):
+    """
+    The saved table, or None if it hasn't been built yet (the page then
+    shows no win probability). Pages never build it. The array is kept per
+    process and read again only when the file's mtime changes, so a rebuilt
+    table (save_table swaps the file in) is picked up without a restart.
+    """
+    key = Path(path).resolve()
+    try:
+        mtime = key.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    cached = _loaded.get(key)
+    if cached is None or cached[0] != mtime:
+        cached = _loaded[key] = (mtime, np.load(key))
+    return cached[1]
+
+
+def lookup(
+    table: np.ndarray,
+    inning: int,
+    half: str,
+    outs: int,
+    bases: int,
+    ltp_runs: int,
+    opp_runs: int,
+    ltp_home: bool,
+):
+    """LTP's (win probability, leverage) in a game state; O(1)."""
+    n_innings = table.shape[1]
+    i = min(max(inning, 1), n_innings) - 1
+    h = HALVES.index(half)
+    diff = (ltp_runs - opp_runs) if ltp_home else (opp_runs - ltp_runs)
+    d = min(max(diff, -MAX_DIFF), MAX_DIFF) + MAX_DIFF
+    wp, lev = table[:, i, h, min(outs, 2), bases, d]
+    return (float(wp) if ltp_home else 1.0 - float(wp)), float(lev)
+
+
+def _team_rates(team_id: int) -> np.ndarray:
+    import db
+    import stats
+
+    totals = stats.compute_player_stats(db.fetch_season_plate_appearances(team_id))
+    counts = totals[["1B", "2B", "3B", "HR", "BB", "K"]].sum().to_numpy(dtype=float)
+    pa = float(totals["PA"].sum())
+    if pa <= 0:
+        return DEFAULT_RATES
+    return np.append(counts, max(pa - counts.sum(), 0.0)) / pa
+
+
+def save_table(table: np.ndarray, path: Path = TABLE_PATH) -> None:
+    """Write the table beside path and rename it in, so a page never reads half a file."""
+    import storage
+
+    path = Path(path)
+    tmp = storage.temp_path(path)
+    try:
+        with open(tmp, "wb") as f:
+            np.save(f, table)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--team", type=int, help="use this team's season outcome rates")
+    parser.add_argument("--out", type=Path, default=TABLE_PATH)
+    args = parser.parse_args(argv)
+
+    rates = DEFAULT_RATES if args.team is None else _team_rates(args.team)
+    table = build_table(rates)
+    save_table(table, args.out)
+    print(
+        f"Wrote {args.out} {table.shape} "
+        f"({', '.join(f'{o} {r:.3f}' for o, r in zip(SIM_OUTCOMES, rates))})"
+    )
+
+
+if __name__ == "__main__":
+    main()